@@ -0,0 +1,113 @@
+"""
+adapters.py — psycopg loaders that hand Sierra values to SQLite as text.
+
+psycopg parses dates and timestamps into datetime objects, numerics into
+Decimal and json/jsonb into Python lists and dicts — and load.py then turns
+every one of them straight back into an ISO string, a float or JSON text.
+The loaders here skip that round trip: registered on an extraction cursor,
+they return
+
+    date                the text Sierra sent ("2024-06-15" is already ISO)
+    timestamp[tz]       Sierra's text reshaped into datetime.isoformat() form
+    numeric             a float, parsed directly from the text
+    json / jsonb        the JSON text itself, unparsed
+
+so SQLite receives the same values as before, except in JSON columns.
+Those are now stored as PostgreSQL wrote them: with its own spacing, and
+with non-ASCII characters as UTF-8 ("Müller") where json.dumps wrote
+escapes ("M\\u00fcller").  The stored bytes differ; the decoded values,
+and anything read through SQLite's json functions, do not.
+
+Text-format results only (named cursors, keyset pages, COPY text) benefit
+fully; for binary COPY just numeric and json/jsonb are replaced,
+since psycopg's binary date loaders are already cheap.
+
+The loaders assume the ISO DateStyle, PostgreSQL's default.
+
+Usage:
+    from collection_analysis import adapters
+    with raw_conn.cursor() as cur:
+        adapters.register(cur)   # this cursor only
+"""
+
+from psycopg.adapt import Loader
+from psycopg.pq import Format
+from psycopg.types.numeric import NumericBinaryLoader
+
+
+class _TextLoader(Loader):
+    """Return the value as sent by the server, decoded to str."""
+
+    def load(self, data):
+        return bytes(data).decode()
+
+
+def _iso_timestamp(value: str) -> str:
+    """Reshape a PostgreSQL ISO timestamp into datetime.isoformat() form.
+
+    ``2024-06-15 12:30:00.12-05`` becomes ``2024-06-15T12:30:00.120000-05:00``:
+    a ``T`` separator, microseconds padded to six digits and the UTC offset
+    written with minutes.  Anything else (``infinity``, BC dates, years past
+    9999) is returned unchanged.
+    """
+    if len(value) < 19 or value[10] != " ":
+        return value
+    head, rest = f"{value[:10]}T{value[11:19]}", value[19:]
+    if rest.startswith("."):
+        end = 1
+        while end < len(rest) and rest[end].isdigit():
+            end += 1
+        head += "." + rest[1:end].ljust(6, "0")
+        rest = rest[end:]
+    if len(rest) == 3:  # "+05" -> "+05:00"
+        rest += ":00"
+    return head + rest
+
+
+class _TimestampTextLoader(Loader):
+    def load(self, data):
+        return _iso_timestamp(bytes(data).decode())
+
+
+class _NumericTextLoader(Loader):
+    def load(self, data):
+        return float(bytes(data))
+
+
+class _NumericBinaryLoader(NumericBinaryLoader):
+    def load(self, data):
+        return float(super().load(data))
+
+
+class _JsonbBinaryLoader(Loader):
+    format = Format.BINARY
+
+    def load(self, data):
+        # The binary jsonb format is a version byte followed by the JSON text.
+        return bytes(data[1:]).decode()
+
+
+class _JsonBinaryLoader(_TextLoader):
+    format = Format.BINARY
+
+
+TEXT_LOADERS = {
+    "date": _TextLoader,
+    "timestamp": _TimestampTextLoader,
+    "timestamptz": _TimestampTextLoader,
+    "numeric": _NumericTextLoader,
+    "json": _TextLoader,
+    "jsonb": _TextLoader,
+}
+
+BINARY_LOADERS = {
+    "numeric": _NumericBinaryLoader,
+    "json": _JsonBinaryLoader,
+    "jsonb": _JsonbBinaryLoader,
+}
+
+
+def register(context) -> None:
+    """Install the raw-value loaders on a psycopg cursor or connection."""
+    for type_name, loader in (*TEXT_LOADERS.items(), *BINARY_LOADERS.items()):
+        context.adapters.register_loader(type_name, loader)
@@ -0,0 +1,123 @@
+"""
+checkpoint.py — Resume a failed build where it stopped (``run --resume``).
+
+Rows are committed to the build database batch by batch, so after a failure
+the *.db.new file already holds everything extracted so far.  Checkpoints
+make that reusable:
+
+    - a table is marked done in _build_state (``done:<table>``) as soon as
+      its extraction finishes; --resume skips it
+    - a partially loaded keyset table resumes at its highest committed
+      cursor key — every keyset query's outer SELECT is ordered by that key,
+      so the loaded rows are a prefix of the result, except that the last
+      key's rows may be cut short (a key can span several rows, e.g. an
+      item on two bibs).  Those rows are deleted and fetched again
+    - key ranges of a partitioned table are saved (``ranges:<table>``) so a
+      resumed run splits the table identically and continues each range
+    - any other partially loaded table (lookups, circ_agg) is dropped and
+      extracted again
+    - the build records its mode (``build_mode``: full or incremental), and
+      only a build started in the same mode is resumed.  A build seeded
+      from the live database (--incremental) first clears the checkpoints
+      it inherited from the previous build
+
+Usage:
+    from collection_analysis import checkpoint
+    done = checkpoint.completed(db)
+    checkpoint.discard_partial(db, table_names, done)
+    # ... extract the remaining tables, calling checkpoint.mark_done() ...
+"""
+
+import json
+import logging
+import sqlite3
+
+from . import extract, load
+
+logger = logging.getLogger(__name__)
+
+BUILD_MODE = "build_mode"
+
+_DONE = "done:"
+_RANGES = "ranges:"
+
+
+def mark_done(db: sqlite3.Connection, table_name: str, rows: int) -> None:
+    """Record that *table_name* finished extracting with *rows* rows."""
+    load.write_state(db, f"{_DONE}{table_name}", str(rows))
+
+
+def completed(db: sqlite3.Connection) -> set[str]:
+    """Return the tables marked done in the build database."""
+    try:
+        keys = db.execute(
+            f"SELECT key FROM {load.STATE_TABLE} WHERE key LIKE ?", (f"{_DONE}%",)
+        ).fetchall()
+    except sqlite3.OperationalError:  # no state recorded yet
+        return set()
+    return {key[len(_DONE) :] for (key,) in keys}
+
+
+def clear(db: sqlite3.Connection) -> None:
+    """Forget every table checkpoint (``done:``, ``ranges:``) in the build database.
+
+    For a build seeded from a copy of the live database: the copy still
+    holds the previous build's checkpoints, which describe tables this build
+    is about to drop and reload.
+    """
+    try:
+        db.execute(
+            f"DELETE FROM {load.STATE_TABLE} WHERE key LIKE ? OR key LIKE ?",
+            (f"{_DONE}%", f"{_RANGES}%"),
+        )
+    except sqlite3.OperationalError:  # no state recorded yet
+        return
+    db.commit()
+
+
+def check_mode(db: sqlite3.Connection, mode: str) -> None:
+    """Raise ValueError if the build being resumed was started in another mode than *mode*."""
+    recorded = load.read_state(db, BUILD_MODE)
+    if recorded is not None and recorded != mode:
+        raise ValueError(
+            f"The build left by the failed run is a {recorded} build and cannot be "
+            f"resumed as a {mode} one; run again without --resume"
+        )
+
+
+def discard_partial(db: sqlite3.Connection, table_names, done: set[str]) -> None:
+    """Drop unfinished tables that cannot resume from a cursor key."""
+    partial = [n for n in table_names if n not in done and n not in extract.KEYSET_KEYS]
+    load.drop_tables(db, partial)
+
+
+def resume_options(db: sqlite3.Connection, table_name: str, options: dict) -> dict:
+    """Return *options* continuing from the last key already loaded for the task.
+
+    The rows of that key may be incomplete, so they are deleted and the task
+    restarts at the key itself (cursor keys are integer ids, so ``> last - 1``
+    is ``>= last``).  The task's ``id_range`` (default: the whole key space)
+    bounds the search, so each partition of a partitioned table resumes
+    independently.
+    """
+    key = extract.KEYSET_KEYS.get(table_name)
+    if key is None:
+        return options
+    after, upto = options.get("id_range") or (0, None)
+    last = load.max_key(db, table_name, key, after, upto)
+    if last is None:
+        return options
+    n = load.delete_key(db, table_name, key, last)
+    logger.info(f"  {table_name}: resuming at id {last} (reloading its {n} rows)")
+    return {**options, "id_range": (last - 1, upto)}
+
+
+def saved_ranges(db: sqlite3.Connection, table_name: str) -> list[tuple[int, int]] | None:
+    """Return the key ranges saved for *table_name*, or None."""
+    value = load.read_state(db, f"{_RANGES}{table_name}")
+    return [tuple(r) for r in json.loads(value)] if value else None
+
+
+def save_ranges(db: sqlite3.Connection, table_name: str, ranges: list[tuple[int, int]]) -> None:
+    """Save the key ranges *table_name* is being extracted in."""
+    load.write_state(db, f"{_RANGES}{table_name}", json.dumps(ranges))
@@ -0,0 +1,110 @@
+"""
+circ_cache.py — Carry circulation rows forward between runs.
+
+Both circulation tables are built from sierra_view.circ_trans, which only
+ever grows, so most of each night's result is already in the live
+current_collection.db.  Rather than re-scanning months of circ_trans, each
+build copies the still-valid rows from the live database into the build
+database and asks Sierra only for what is new.
+
+circ_agg (per-day aggregates):
+    1. Copy every *closed* day still inside the retention window
+       (CIRC_AGG_RETENTION_MONTHS before the start of the current month)
+    2. Extract only the days after the last closed day (normally yesterday
+       and today) and append them
+    3. Record the new last closed day — the day before Sierra's current
+       date — as ``circ_agg_closed_through`` in _build_state
+
+circ_leased_items (individual transactions, append-only by circ_trans.id):
+    1. Copy the rows still inside the LEASED_WINDOW_DAYS window
+    2. Extract only rows with an id above the stored watermark and append them
+    3. Record the highest id now loaded as ``circ_leased_items_watermark``
+
+Without a live database or a recorded mark the full window is extracted.
+
+Usage:
+    from collection_analysis import circ_cache
+    since = circ_cache.seed(db, output_dir, sierra_today, retention_months)
+    after = circ_cache.seed_leased_items(db, output_dir, sierra_today)
+    # ... extract circ_agg with since=since, circ_leased_items above after ...
+    load.write_state(db, circ_cache.CLOSED_THROUGH, circ_cache.closed_through(sierra_today))
+    load.write_state(db, circ_cache.LEASED_WATERMARK, str(circ_cache.leased_watermark(db, after)))
+"""
+
+import logging
+import sqlite3
+from datetime import date, timedelta
+
+from . import load
+
+logger = logging.getLogger(__name__)
+
+CLOSED_THROUGH = "circ_agg_closed_through"
+LEASED_WATERMARK = "circ_leased_items_watermark"
+
+# Window of sql/queries/circ_leased_items.sql (transaction_gmt > now - 180 days).
+LEASED_WINDOW_DAYS = 180
+
+
+def window_start(today: date, retention_months: int) -> date:
+    """Return the first day kept: the start of the month, *retention_months* back.
+
+    Mirrors the start_date computed in sql/queries/circ_agg.sql.
+    """
+    months = today.year * 12 + today.month - 1 - retention_months
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def closed_through(today: date) -> str:
+    """Return the last closed transaction_day (``YYYY-MM-DD``) as of *today*."""
+    return (today - timedelta(days=1)).isoformat()
+
+
+def seed(db: sqlite3.Connection, output_dir: str, today: date, retention_months: int) -> str | None:
+    """Copy closed circ_agg days from the live database into the build database.
+
+    Returns the first transaction_day still to extract from Sierra, or None
+    when nothing could be carried forward (extract the full window).
+    """
+    last_closed = load.read_live_state(output_dir, CLOSED_THROUGH)
+    if last_closed is None:
+        logger.info("circ_agg: no cached days — aggregating the full window")
+        return None
+
+    first = window_start(today, retention_months).isoformat()
+    n = load.copy_live_table(
+        db,
+        output_dir,
+        "circ_agg",
+        "transaction_day >= ? AND transaction_day <= ?",
+        (first, last_closed),
+    )
+    since = (date.fromisoformat(last_closed) + timedelta(days=1)).isoformat()
+    logger.info(f"circ_agg: reused {n:,} cached rows from {first} to {last_closed}")
+    return since
+
+
+def seed_leased_items(db: sqlite3.Connection, output_dir: str, today: date) -> int | None:
+    """Copy unexpired circ_leased_items rows from the live database.
+
+    Returns the circ_trans id to extract above, or None when nothing could
+    be carried forward (extract the full window).
+    """
+    mark = load.read_live_state(output_dir, LEASED_WATERMARK)
+    if mark is None:
+        logger.info("circ_leased_items: no watermark — extracting the full window")
+        return None
+
+    first = (today - timedelta(days=LEASED_WINDOW_DAYS)).isoformat()
+    n = load.copy_live_table(db, output_dir, "circ_leased_items", "transaction_day >= ?", (first,))
+    logger.info(f"circ_leased_items: reused {n:,} rows; fetching ids above {mark}")
+    return int(mark)
+
+
+def leased_watermark(db: sqlite3.Connection, previous: int | None) -> int:
+    """Return the highest circ_trans id loaded into circ_leased_items."""
+    try:
+        row = db.execute("SELECT max(id) FROM circ_leased_items").fetchone()
+    except sqlite3.OperationalError:  # no rows were ever loaded
+        row = (None,)
+    return max(row[0] or 0, previous or 0)
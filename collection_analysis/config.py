@@ -10,7 +10,46 @@ Environment variables (primary, preferred):
     OUTPUT_DIR     Directory for output databases    (required)
     PG_SSLMODE                SSL mode (default 'require')           (optional)
     PG_ITERSIZE               Cursor fetch size (default 15000)      (optional)
+    PG_KEYSET_TABLES          Comma-separated tables paged with keyset re-queries
+                              instead of one streamed cursor (default none)  (optional)
+    PG_COPY_TABLES            Comma-separated tables extracted with COPY TO
+                              STDOUT instead of a cursor (default none)  (optional)
+    PG_COPY_FORMAT            COPY format for PG_COPY_TABLES: text | binary
+                              (default 'binary')                     (optional)
+    PG_BIB_STRATEGY           How bib is queried: query (bib.sql) | sets
+                              (one query per attribute per page; default
+                              'query')                               (optional)
+    PG_ITEM_MESSAGE_MODE      How item_message is queried: query
+                              (item_message.sql) | raw (varfields only,
+                              parsed client-side; default 'query')   (optional)
+    PG_ID_DRIVEN_TABLES       Comma-separated tables (bib, item, volume_record)
+                              fetched by the record ids already loaded into
+                              record_metadata (default none)         (optional)
+    PG_PAGE_TARGET_SECONDS    Target duration of one keyset page; page sizes
+                              adapt per table toward it, 0 = fixed
+                              PG_ITERSIZE (default 5.0)              (optional)
+    PG_PREFETCH_PAGES         Pages fetched ahead of the SQLite insert in
+                              serial mode; 0 disables (default 2)    (optional)
+    PG_MAX_CONNECTIONS        Concurrent Sierra connections for parallel
+                              table extraction; 1 = serial (default 1)  (optional)
+    PG_PARTITIONS             Key ranges per large table when extracting in
+                              parallel, e.g. 'bib:4,item:2' (default none)  (optional)
     PG_SLEEP_BETWEEN_TABLES   Seconds to pause between tables (default 0.0)  (optional)
+    PG_THROTTLE_PROFILES      Pages/sec limits by local time of day, e.g.
+                              '06:00-22:00=2,22:00-06:00=50'; no limit
+                              outside the windows (default none)     (optional)
+    PG_THROTTLE_MAX_ACTIVE    Other active Sierra backends above which the
+                              throttle backs off; 0 = ignore (default 0)  (optional)
+    PG_SNAPSHOT               true = extract every table from one REPEATABLE
+                              READ snapshot, shared by parallel workers
+                              (default false)                        (optional)
+    PG_RECONNECT_ATTEMPTS     Consecutive reconnects to Sierra, with backoff,
+                              after a dropped connection before the build
+                              fails; 0 = fail at once (default 3)    (optional)
+    CIRC_AGG_RETENTION_MONTHS Months of daily circulation aggregates kept in
+                              circ_agg (default 6)                   (optional)
+    JSON_CHECK_EVERY          Parse 1 in N rows of JSON columns to check they
+                              are well-formed; 0 = off (default 0)   (optional)
     LOG_LEVEL                 DEBUG | INFO | WARNING                 (optional, default 'INFO')
     LOG_FILE                  Path to log file; unset disables       (optional)
     EXTRACT_LIMIT             Cap each table at N rows; 0 = no limit (optional, default 0)
@@ -21,12 +60,17 @@ raised whenever a JSON file is used so that callers can migrate to env vars.
 """
 
 import json
+import logging
 import os
 import warnings
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+from . import extract
+
+logger = logging.getLogger(__name__)
+
 # Mapping from env-var name to internal (lowercase) config key.
 _ENV_VARS: list[tuple[str, str]] = [
     ("PG_HOST", "pg_host"),
@@ -37,7 +81,23 @@ _ENV_VARS: list[tuple[str, str]] = [
     ("OUTPUT_DIR", "output_dir"),
     ("PG_SSLMODE", "pg_sslmode"),
     ("PG_ITERSIZE", "pg_itersize"),
+    ("PG_KEYSET_TABLES", "pg_keyset_tables"),
+    ("PG_COPY_TABLES", "pg_copy_tables"),
+    ("PG_COPY_FORMAT", "pg_copy_format"),
+    ("PG_BIB_STRATEGY", "pg_bib_strategy"),
+    ("PG_ITEM_MESSAGE_MODE", "pg_item_message_mode"),
+    ("PG_ID_DRIVEN_TABLES", "pg_id_driven_tables"),
+    ("PG_PAGE_TARGET_SECONDS", "pg_page_target_seconds"),
+    ("PG_PREFETCH_PAGES", "pg_prefetch_pages"),
+    ("PG_MAX_CONNECTIONS", "pg_max_connections"),
+    ("PG_PARTITIONS", "pg_partitions"),
     ("PG_SLEEP_BETWEEN_TABLES", "pg_sleep_between_tables"),
+    ("PG_THROTTLE_PROFILES", "pg_throttle_profiles"),
+    ("PG_THROTTLE_MAX_ACTIVE", "pg_throttle_max_active"),
+    ("PG_SNAPSHOT", "pg_snapshot"),
+    ("PG_RECONNECT_ATTEMPTS", "pg_reconnect_attempts"),
+    ("CIRC_AGG_RETENTION_MONTHS", "circ_agg_retention_months"),
+    ("JSON_CHECK_EVERY", "json_check_every"),
     ("LOG_LEVEL", "log_level"),
     ("LOG_FILE", "log_file"),
     ("EXTRACT_LIMIT", "extract_limit"),
@@ -138,6 +198,42 @@ def load(config_path: str | None = None) -> dict:
             f"PG_ITERSIZE must be an integer, got {cfg.get('pg_itersize')!r}"
         ) from exc
 
+    try:
+        cfg["pg_max_connections"] = int(cfg.get("pg_max_connections", 1))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(
+            f"PG_MAX_CONNECTIONS must be a positive integer, got {cfg.get('pg_max_connections')!r}"
+        ) from exc
+    if cfg["pg_max_connections"] < 1:
+        raise ValueError(
+            f"PG_MAX_CONNECTIONS must be a positive integer, got {cfg['pg_max_connections']!r}"
+        )
+
+    try:
+        cfg["pg_page_target_seconds"] = float(cfg.get("pg_page_target_seconds", 5.0))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(
+            f"PG_PAGE_TARGET_SECONDS must be a number, got {cfg.get('pg_page_target_seconds')!r}"
+        ) from exc
+    if cfg["pg_page_target_seconds"] < 0:
+        raise ValueError(
+            f"PG_PAGE_TARGET_SECONDS must be 0 (fixed page size) or positive, "
+            f"got {cfg['pg_page_target_seconds']!r}"
+        )
+
+    try:
+        cfg["pg_prefetch_pages"] = int(cfg.get("pg_prefetch_pages", 2))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(
+            f"PG_PREFETCH_PAGES must be a non-negative integer, got "
+            f"{cfg.get('pg_prefetch_pages')!r}"
+        ) from exc
+    if cfg["pg_prefetch_pages"] < 0:
+        raise ValueError(
+            f"PG_PREFETCH_PAGES must be 0 (disabled) or a positive integer, "
+            f"got {cfg['pg_prefetch_pages']!r}"
+        )
+
     try:
         cfg["pg_sleep_between_tables"] = float(cfg.get("pg_sleep_between_tables", 0.0))
     except (ValueError, TypeError) as exc:
@@ -146,6 +242,63 @@ def load(config_path: str | None = None) -> dict:
             f"{cfg.get('pg_sleep_between_tables')!r}"
         ) from exc
 
+    try:
+        cfg["pg_throttle_max_active"] = int(cfg.get("pg_throttle_max_active", 0))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(
+            f"PG_THROTTLE_MAX_ACTIVE must be a non-negative integer, got "
+            f"{cfg.get('pg_throttle_max_active')!r}"
+        ) from exc
+    if cfg["pg_throttle_max_active"] < 0:
+        raise ValueError(
+            f"PG_THROTTLE_MAX_ACTIVE must be 0 (ignore) or a positive integer, "
+            f"got {cfg['pg_throttle_max_active']!r}"
+        )
+    cfg["pg_throttle_profiles"] = _parse_profiles(cfg.get("pg_throttle_profiles"))
+
+    snapshot = str(cfg.get("pg_snapshot") or "false").strip().lower()
+    if snapshot not in ("true", "false", "1", "0", "yes", "no"):
+        raise ValueError(f"PG_SNAPSHOT must be true or false, got {cfg.get('pg_snapshot')!r}")
+    cfg["pg_snapshot"] = snapshot in ("true", "1", "yes")
+
+    try:
+        cfg["pg_reconnect_attempts"] = int(cfg.get("pg_reconnect_attempts", 3))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(
+            f"PG_RECONNECT_ATTEMPTS must be a non-negative integer, got "
+            f"{cfg.get('pg_reconnect_attempts')!r}"
+        ) from exc
+    if cfg["pg_reconnect_attempts"] < 0:
+        raise ValueError(
+            f"PG_RECONNECT_ATTEMPTS must be 0 (no reconnect) or a positive integer, "
+            f"got {cfg['pg_reconnect_attempts']!r}"
+        )
+
+    try:
+        cfg["circ_agg_retention_months"] = int(cfg.get("circ_agg_retention_months", 6))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(
+            f"CIRC_AGG_RETENTION_MONTHS must be a positive integer, got "
+            f"{cfg.get('circ_agg_retention_months')!r}"
+        ) from exc
+    if cfg["circ_agg_retention_months"] < 1:
+        raise ValueError(
+            f"CIRC_AGG_RETENTION_MONTHS must be a positive integer, "
+            f"got {cfg['circ_agg_retention_months']!r}"
+        )
+
+    try:
+        cfg["json_check_every"] = int(cfg.get("json_check_every", 0))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(
+            f"JSON_CHECK_EVERY must be a non-negative integer, got {cfg.get('json_check_every')!r}"
+        ) from exc
+    if cfg["json_check_every"] < 0:
+        raise ValueError(
+            f"JSON_CHECK_EVERY must be 0 (off) or a positive integer, "
+            f"got {cfg['json_check_every']!r}"
+        )
+
     try:
         cfg["extract_limit"] = int(cfg.get("extract_limit", 0))
     except (ValueError, TypeError) as exc:
@@ -159,9 +312,80 @@ def load(config_path: str | None = None) -> dict:
             f"got {cfg['extract_limit']!r}"
         )
 
+    cfg["pg_keyset_tables"] = _parse_list(cfg.get("pg_keyset_tables"))
+    unknown = set(cfg["pg_keyset_tables"]) - set(extract.KEYSET_KEYS)
+    if unknown:
+        raise ValueError(
+            f"PG_KEYSET_TABLES accepts {', '.join(sorted(extract.KEYSET_KEYS))}, "
+            f"got {sorted(unknown)!r}"
+        )
+    cfg["pg_copy_tables"] = _parse_list(cfg.get("pg_copy_tables"))
+    unknown = set(cfg["pg_copy_tables"]) - extract.STREAMED
+    if unknown:
+        raise ValueError(
+            f"PG_COPY_TABLES accepts {', '.join(sorted(extract.STREAMED))}, got {sorted(unknown)!r}"
+        )
+
+    cfg["pg_copy_format"] = str(cfg.get("pg_copy_format") or "binary").lower()
+    if cfg["pg_copy_format"] not in ("text", "binary"):
+        raise ValueError(
+            f"PG_COPY_FORMAT must be 'text' or 'binary', got {cfg['pg_copy_format']!r}"
+        )
+
+    cfg["pg_bib_strategy"] = str(cfg.get("pg_bib_strategy") or "query").lower()
+    if cfg["pg_bib_strategy"] not in ("query", "sets"):
+        raise ValueError(
+            f"PG_BIB_STRATEGY must be 'query' or 'sets', got {cfg['pg_bib_strategy']!r}"
+        )
+    if cfg["pg_bib_strategy"] == "sets" and "bib" in cfg["pg_copy_tables"]:
+        raise ValueError("PG_BIB_STRATEGY=sets cannot be combined with bib in PG_COPY_TABLES")
+
+    cfg["pg_item_message_mode"] = str(cfg.get("pg_item_message_mode") or "query").lower()
+    if cfg["pg_item_message_mode"] not in ("query", "raw"):
+        raise ValueError(
+            f"PG_ITEM_MESSAGE_MODE must be 'query' or 'raw', got {cfg['pg_item_message_mode']!r}"
+        )
+    if cfg["pg_item_message_mode"] == "raw":
+        logger.warning(
+            "PG_ITEM_MESSAGE_MODE=raw: item_message rows of items not in the item table "
+            "(campus_code <> '' or no bib link) get no item, bib or status columns"
+        )
+
+    cfg["pg_id_driven_tables"] = _parse_list(cfg.get("pg_id_driven_tables"))
+    unknown = set(cfg["pg_id_driven_tables"]) - {"bib", "item", "volume_record"}
+    if unknown:
+        raise ValueError(
+            f"PG_ID_DRIVEN_TABLES accepts bib, item and volume_record, got {sorted(unknown)!r}"
+        )
+    copied = set(cfg["pg_id_driven_tables"]) & set(cfg["pg_copy_tables"])
+    if copied:
+        raise ValueError(
+            f"PG_ID_DRIVEN_TABLES cannot be combined with PG_COPY_TABLES for {sorted(copied)!r}"
+        )
+
+    partitions = cfg.get("pg_partitions") or {}
+    if not isinstance(partitions, dict):
+        try:
+            partitions = {
+                table.strip(): int(n)
+                for table, n in (item.split(":") for item in _parse_list(partitions))
+            }
+        except ValueError as exc:
+            raise ValueError(
+                f"PG_PARTITIONS must look like 'bib:4,item:2', got {cfg.get('pg_partitions')!r}"
+            ) from exc
+    if any(n < 1 for n in partitions.values()):
+        raise ValueError(f"PG_PARTITIONS counts must be positive, got {partitions!r}")
+    cfg["pg_partitions"] = partitions
+
     cfg.setdefault("pg_sslmode", "require")
     cfg.setdefault("pg_itersize", 15000)
+    cfg.setdefault("pg_page_target_seconds", 5.0)
+    cfg.setdefault("pg_prefetch_pages", 2)
+    cfg.setdefault("pg_max_connections", 1)
     cfg.setdefault("pg_sleep_between_tables", 0.0)
+    cfg.setdefault("circ_agg_retention_months", 6)
+    cfg.setdefault("json_check_every", 0)
     cfg.setdefault("log_level", "INFO")
     cfg.setdefault("log_file", None)
     cfg.setdefault("extract_limit", 0)
@@ -169,6 +393,40 @@ def load(config_path: str | None = None) -> dict:
     return cfg
 
 
+def _parse_profiles(value) -> list[tuple[int, int, float]]:
+    """Parse PG_THROTTLE_PROFILES into ``(start_minute, end_minute, pages_per_sec)``."""
+    profiles = []
+    for item in _parse_list(value):
+        try:
+            window, rate = item.split("=")
+            start, end = (_minute_of_day(t) for t in window.split("-"))
+            profiles.append((start, end, float(rate)))
+        except ValueError as exc:
+            raise ValueError(
+                f"PG_THROTTLE_PROFILES must look like '06:00-22:00=2,22:00-06:00=50', got {value!r}"
+            ) from exc
+        if profiles[-1][2] <= 0:
+            raise ValueError(f"PG_THROTTLE_PROFILES rates must be positive, got {item!r}")
+    return profiles
+
+
+def _minute_of_day(value: str) -> int:
+    """Return the minutes past midnight of an ``HH:MM`` time."""
+    hours, minutes = (int(part) for part in value.strip().split(":"))
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(value)
+    return hours * 60 + minutes
+
+
+def _parse_list(value) -> list[str]:
+    """Split a comma-separated env value (or pass through a JSON list) into names."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
 def pg_connection_string(cfg: dict) -> str:
     """Build a SQLAlchemy-compatible PostgreSQL connection URL from config."""
     return (
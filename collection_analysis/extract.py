@@ -6,11 +6,11 @@ SQLAlchemy connection and yields rows as RowMapping dicts.
 
 Extraction functions:
     extract_record_metadata(pg_conn, itersize)
-    extract_bib(pg_conn, itersize)
+    extract_bib(pg_conn, itersize, strategy)
     extract_item(pg_conn, itersize)
     extract_bib_record(pg_conn, itersize)
     extract_volume_record(pg_conn, itersize)
-    extract_item_message(pg_conn, itersize)
+    extract_item_message(pg_conn, itersize, mode)
     extract_language_property(pg_conn, itersize)
     extract_bib_record_item_record_link(pg_conn, itersize)
     extract_volume_record_item_record_link(pg_conn, itersize)
@@ -23,293 +23,1112 @@ Extraction functions:
     extract_itype_property(pg_conn, itersize)
     extract_bib_level_property(pg_conn, itersize)
     extract_material_property(pg_conn, itersize)
+    extract_lookups(pg_conn, names)   — every LOOKUPS query in one round trip
+    lookup_fingerprints(pg_conn, names) — a digest of each LOOKUPS result, ditto
     extract_hold(pg_conn, itersize)
     extract_circ_agg(pg_conn, itersize)
     extract_circ_leased_items(pg_conn, itersize)
 
-All functions yield RowMapping objects (dict-like).
+All functions yield RowMapping objects (dict-like).  Paginated extractors
+accept the keyword options documented on _pages() (``keyset``, ``id_range``,
+``target_date``, ``copy_format``, ``page_size``).
+
+With ``tuples=True`` (every extractor), a function instead yields a tuple of
+column names first and then each row as a plain tuple read from a raw
+psycopg cursor — the pipeline's row protocol, which avoids building a
+RowMapping per row and lets the loader hand rows to executemany as-is.
+Those cursors use the loaders in adapters.py, so dates, timestamps and JSON
+arrive as the text SQLite stores and numerics as floats.
+
+Paginated queries (those listed in KEYSET_KEYS) are streamed by default: the
+query runs once, with no LIMIT, through a psycopg named server-side cursor
+and rows are fetched *itersize* at a time, so peak memory is bounded by the
+fetch size.  Passing ``keyset=True`` switches a table back to keyset
+pagination, re-executing the query per page with ``id > :id_val LIMIT
+:limit_val`` (shorter-lived queries, at the cost of one execution per
+page; on the tuple path each such repeated query is a server-side prepared
+statement, so Sierra parses it once per connection).
+Passing ``copy_format`` ('text' or 'binary') instead streams the query
+through ``COPY (...) TO STDOUT`` and psycopg's copy API, which skips
+SQLAlchemy's result and RowMapping layers entirely.
 """
 
+import contextlib
+import hashlib
+import json
 import logging
+import re
+import time
+from datetime import date
+from itertools import pairwise
 from pathlib import Path
 
+from psycopg import Pipeline
+from psycopg.errors import InsufficientPrivilege, QueryCanceled, ReadOnlySqlTransaction
 from sqlalchemy import text
 
+from . import adapters
+
 logger = logging.getLogger(__name__)
 
 # Full-rebuild target date: fetch all records regardless of update time.
 _TARGET_DATE = "1969-01-01 00:00:00"
 
 _SQL_DIR = Path(__file__).parent.parent / "sql" / "queries"
+_STAGING_DIR = Path(__file__).parent.parent / "sql" / "staging"
+
+# An id returned by pg_export_snapshot(), e.g. ``00000003-0000001B-1``.
+_SNAPSHOT_ID = re.compile(r"[0-9A-F]+(?:-[0-9A-F]+)+")
+
+# A SQLAlchemy-style ``:name`` bind parameter (but not a ``::type`` cast).
+_BIND_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+
+# Formats accepted by the copy_format option.
+COPY_FORMATS = ("text", "binary")
+
+# Upper cursor bound used when a query is not restricted to a key range.
+_MAX_ID = 2**63 - 1
+
+# Cursor column of each paginated query — the column the query orders by and
+# compares against :id_val.
+KEYSET_KEYS = {
+    "record_metadata": "record_id",
+    "bib": "bib_record_id",
+    "item": "item_record_id",
+    "bib_record": "id",
+    "volume_record": "volume_record_id",
+    "item_message": "varfield_id",
+    "bib_record_item_record_link": "id",
+    "volume_record_item_record_link": "id",
+    "hold": "hold_id",
+    "circ_leased_items": "id",
+}
+
+
+# Queries read through _pages(), and so accepting the copy_format option;
+# the remaining (lookup) queries are small and fetched in one round trip.
+STREAMED = {*KEYSET_KEYS, "circ_agg"}
+
+
+# Queries filtered on record_last_updated_gmt >= :target_date, so an
+# incremental rebuild can fetch only the records changed since a given time.
+DELTA_TABLES = {"record_metadata", "bib", "item", "bib_record", "volume_record"}
+
+
+# Columns built with json_agg.  On the tuple path they arrive as JSON text
+# (adapters.py) and are written to SQLite verbatim, so the only JSON work is
+# the optional spot check in _check_json().
+JSON_COLUMNS = {
+    "bib": ("control_numbers", "isbn_values", "indexed_subjects", "genres", "item_types"),
+}
+
+
+# Bib extraction strategies: "query" runs bib.sql, whose per-bib correlated
+# subqueries Sierra evaluates row by row; "sets" fetches each page's scalar
+# columns with bib_sets/base.sql and then every subquery's rows for the whole
+# page at once (bib_sets/<column>.sql, ``record_id = ANY(:ids)``), building
+# the JSON arrays client-side (see _bib_set_pages).
+BIB_STRATEGIES = ("query", "sets")
+
+# Columns of bib.sql, in order — the set-based strategy yields the same.
+BIB_COLUMNS = (
+    "bib_record_num",
+    "bib_record_id",
+    "control_numbers",
+    "isbn_values",
+    "best_author",
+    "best_title",
+    "publisher",
+    "publish_year",
+    "bib_level_callnumber",
+    "indexed_subjects",
+    "genres",
+    "item_types",
+    "cataloging_date",
+)
+
+# Columns the set-based strategy fetches per page, one bib_sets/<column>.sql
+# each.  The JSON array columns aggregate every (record_id, value) row; the
+# scalars take the query's single row per record.
+_BIB_SET_ATTRIBUTES = (
+    "control_numbers",
+    "isbn_values",
+    "publisher",
+    "bib_level_callnumber",
+    "indexed_subjects",
+    "genres",
+    "item_types",
+)
+_BIB_SET_SCALARS = ("publisher", "bib_level_callnumber")
+
+
+# item_message extraction modes: "query" runs item_message.sql (regexes and
+# nine joins on Sierra); "raw" fetches the message varfields with their call
+# number and checkout (item_message_raw.sql), parses them with the regexes
+# below and leaves the item, bib and status columns to
+# sql/enrich/04_item_message.sql.
+ITEM_MESSAGE_MODES = ("query", "raw")
+
+# Columns of item_message.sql, in order — the raw mode yields the same.
+ITEM_MESSAGE_COLUMNS = (
+    "item_barcode",
+    "campus_code",
+    "call_number",
+    "item_record_id",
+    "varfield_id",
+    "has_in_transit",
+    "in_transit_julianday",
+    "in_transit_days",
+    "transit_from",
+    "transit_to",
+    "has_in_transit_too_long",
+    "occ_num",
+    "field_content",
+    "publish_year",
+    "best_title",
+    "best_author",
+    "item_status_code",
+    "item_status_name",
+    "agency_code_num",
+    "location_code",
+    "itype_code_num",
+    "item_format",
+    "due_julianday",
+    "loanrule_code_num",
+    "checkout_julianday",
+    "renewal_count",
+    "overdue_count",
+    "overdue_julianday",
+)
+
+# The checkout columns item_message_raw.sql returns as they are.
+_ITEM_MESSAGE_CHECKOUT = ITEM_MESSAGE_COLUMNS[-6:]
+
+# The patterns of item_message.sql.  PostgreSQL's "." also matches newlines
+# (re.S), and the greedy leading ".*" makes the from/to match the message's
+# last transit, so neither regexp_matches(..., 'g') yields more than one row.
+_IN_TRANSIT = re.compile(r"IN\sTRANSIT", re.I | re.A)
+_IN_TRANSIT_TOO_LONG = re.compile(r"IN\sTRANSIT\sTOO\sLONG", re.I | re.A)
+_TRANSIT_FROM_TO = re.compile(
+    r".*IN\sTRANSIT\sfrom\s([0-9a-z]{1,})\sto\s([0-9a-z]{1,})", re.I | re.A | re.S
+)
+_TRANSIT_TIME = re.compile(
+    r"[a-z]{3}\s[a-z]{1,3}\s[0-9]{2}\s[0-9]{4}\s[0-9]{2}:[0-9]{2}[AP]M", re.I | re.A
+)
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"),
+        start=1,
+    )
+}
+
+# date.toordinal() + JULIAN_OFFSET is PostgreSQL's to_char(..., 'J').
+JULIAN_OFFSET = 1721425
+
+
+# Paginated queries that accept :max_id_val and have a key_bounds/ query, so
+# their id space can be split into ranges fetched on separate connections.
+PARTITIONABLE = {"record_metadata", "bib", "item"}
+
+
+# TEMP tables a query can join against instead of evaluating a subquery on
+# every page, created by sql/staging/<table>.sql before each extraction (see
+# stage).  The query then runs as sql/queries/staged/<name>.sql; <name>.sql
+# itself stays self-contained, for servers that refuse TEMP tables and for
+# running by hand.
+STAGING = {
+    "circ_leased_items": ("leased_item",),
+}
+
+
+# Queries that can fetch the rows of a known list of record ids (the ``ids``
+# option, ``rm.id = ANY(:ids)``) instead of scanning record_metadata for
+# them, with the record_type_code of those ids.
+ID_DRIVEN = {"bib": "b", "item": "i", "volume_record": "j"}
+
+
+# Small, unpaginated reference queries fetched together by extract_lookups().
+LOOKUPS = (
+    "language_property",
+    "location",
+    "location_name",
+    "branch_name",
+    "branch",
+    "country_property_myuser",
+    "item_status_property",
+    "itype_property",
+    "bib_level_property",
+    "material_property",
+)
+
+# Digest of a lookup query's whole result, computed on Sierra: the md5 of its
+# rows' text form in sorted order ('' for no rows).
+_FINGERPRINT_SQL = (
+    "SELECT md5(coalesce(string_agg(q::text, E'\\n' ORDER BY q::text), '')) FROM ({query}) AS q"
+)
 
 
 def _load_sql(name: str) -> str:
     return (_SQL_DIR / f"{name}.sql").read_text()
 
 
-def extract_record_metadata(pg_conn, itersize: int = 5000):
-    """Yield record_metadata rows for bib ('b'), item ('i'), and volume ('j') records."""
-    sql = text(_load_sql("record_metadata"))
-    id_val = 0
+def begin_snapshot(pg_conn, snapshot_id: str | None = None) -> str:
+    """Open a REPEATABLE READ transaction on *pg_conn*; return its snapshot id.
+
+    Without *snapshot_id*, the transaction's snapshot is exported with
+    pg_export_snapshot().  With one, the transaction adopts that exported
+    snapshot (SET TRANSACTION SNAPSHOT), so every connection reads Sierra as
+    of the same instant.  The exporting transaction must stay open until the
+    others have imported its snapshot.  Call before anything else runs on
+    *pg_conn*, and keep the transaction open for the whole extraction.
+    """
+    pg_conn.execution_options(isolation_level="REPEATABLE READ")
+    if snapshot_id is None:
+        snapshot_id = pg_conn.execute(text("SELECT pg_export_snapshot()")).scalar_one()
+    else:
+        if not _SNAPSHOT_ID.fullmatch(snapshot_id):
+            raise ValueError(f"not an exported snapshot id: {snapshot_id!r}")
+        # SET TRANSACTION SNAPSHOT takes a literal, not a bind parameter.
+        pg_conn.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"))
+    # TEMP tables staged in this transaction vanish with it (see stage).
+    pg_conn.info["snapshot"] = snapshot_id
+    return snapshot_id
+
+
+def stage(pg_conn, name: str) -> bool:
+    """(Re)create the STAGING tables of the query *name*; return whether it can use them.
+
+    The TEMP tables are rebuilt (with an index and ANALYZE) right before
+    each extraction, so the set is no older than the query joining it.
+    Outside a snapshot transaction (begin_snapshot) they are committed to
+    outlive the current transaction; inside one they are built from that
+    snapshot.  The statements run in a savepoint: a server that refuses
+    TEMP tables (no TEMP privilege, or a read-only hot standby) leaves the
+    transaction usable, is remembered in the connection's ``info`` dict, and
+    the caller runs the self-contained <name>.sql instead (False).
+    """
+    tables = STAGING.get(name, ())
+    if not tables or pg_conn.info.get("staging_refused"):
+        return False
+    raw = pg_conn.connection.driver_connection
+    t0 = time.perf_counter()
+    try:
+        with raw.transaction(), raw.cursor() as cur:
+            for table in tables:
+                cur.execute((_STAGING_DIR / f"{table}.sql").read_text())
+    except (InsufficientPrivilege, ReadOnlySqlTransaction) as exc:
+        pg_conn.info["staging_refused"] = True
+        logger.warning(f"  {name}: cannot create TEMP tables on Sierra ({exc}); running unstaged")
+        return False
+    if "snapshot" not in pg_conn.info:
+        raw.commit()  # keep the tables past the end of this transaction
+    logger.info(f"  staged {', '.join(tables)} for {name} ({time.perf_counter() - t0:.1f}s)")
+    return True
+
+
+def _params(id_range, target_date: str | None, query_params: dict | None) -> dict:
+    """Return the bind parameters shared by every paginated query."""
+    after, upto = id_range if id_range else (0, None)
+    return {
+        "target_date": target_date or _TARGET_DATE,
+        "id_val": after,
+        "max_id_val": _MAX_ID if upto is None else upto,
+        "limit_val": None,
+        "ids": None,
+        **(query_params or {}),
+    }
+
+
+def _pages(
+    pg_conn,
+    name: str,
+    itersize: int,
+    keyset: bool = False,
+    id_range=None,
+    target_date: str | None = None,
+    query_params: dict | None = None,
+    copy_format: str | None = None,
+    page_size: "AdaptivePageSize | None" = None,
+):
+    """Yield successive pages (lists of RowMapping) of the query *name*.
+
+    Options:
+        keyset: Re-execute the query per page (``id > :id_val LIMIT
+            :limit_val``) instead of streaming one server-side cursor.
+            Queries without a keyset cursor (see KEYSET_KEYS) always stream.
+        id_range: ``(after, upto)`` — restrict the query to cursor keys
+            ``after < key <= upto``; one of the ranges returned by
+            key_ranges().  Queries outside PARTITIONABLE honour only
+            ``after`` (e.g. an append-only watermark); ``upto=None`` leaves
+            the range open.
+        target_date: Only fetch records updated (or, for record_metadata,
+            deleted) at or after this timestamp; the default fetches every
+            record.  Meaningful for DELTA_TABLES only.
+        query_params: Extra bind parameters specific to the query.
+        copy_format: 'text' or 'binary' — stream the query with COPY TO
+            STDOUT in that format instead of a server-side cursor (see
+            _copy_pages).  Takes precedence over ``keyset``.
+        page_size: An AdaptivePageSize that sets ``limit_val`` for each
+            keyset page (instead of *itersize*) and learns from its timing.
+
+    Every query receives ``target_date``, ``id_val``, ``max_id_val`` and
+    ``limit_val``; a NULL ``limit_val`` is PostgreSQL's ``LIMIT ALL``.
+    """
+    sql = text(_load_sql(name))
+    key = KEYSET_KEYS.get(name)
+    params = _params(id_range, target_date, query_params)
     total = 0
-    while True:
-        rows = (
-            pg_conn.execute(
-                sql, {"target_date": _TARGET_DATE, "id_val": id_val, "limit_val": itersize}
-            )
-            .mappings()
-            .all()
-        )
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["record_id"]
-        logger.info(f"  record_metadata: {total} rows (cursor at id {id_val})")
-
-
-def extract_bib(pg_conn, itersize: int = 5000):
-    """Yield bib rows with aggregated JSON fields."""
-    sql = text(_load_sql("bib"))
-    id_val = 0
+
+    if copy_format:
+        for page in _copy_pages(pg_conn, name, itersize, params, copy_format):
+            yield page
+            total += len(page)
+            logger.info(f"  {name}: {total} rows (COPY {copy_format})")
+        return
+
+    if keyset and key:
+        while True:
+            limit = page_size.size if page_size else itersize
+            t0 = time.perf_counter()
+            page = pg_conn.execute(sql, {**params, "limit_val": limit}).mappings().all()
+            if page_size and page:
+                page_size.observe(len(page), time.perf_counter() - t0, _row_width(page[0]))
+            if not page:
+                break
+            yield page
+            total += len(page)
+            params["id_val"] = page[-1][key]
+            logger.info(f"  {name}: {total} rows (cursor at id {params['id_val']})")
+        return
+
+    result = pg_conn.execution_options(yield_per=itersize).execute(sql, params)
+    try:
+        for page in result.mappings().partitions(itersize):
+            yield page
+            total += len(page)
+            if key:
+                logger.info(f"  {name}: {total} rows (cursor at id {page[-1][key]})")
+            else:
+                logger.info(f"  {name}: {total} rows")
+    finally:
+        # Release the server-side cursor even if the consumer stops early
+        # (e.g. EXTRACT_LIMIT).
+        result.close()
+
+
+def _row_width(row) -> int:
+    """Roughly estimate the in-memory size of *row* in bytes from its text form."""
+    values = row.values() if hasattr(row, "values") else row
+    return sum(len(str(v)) for v in values) + 50 * len(row)
+
+
+class AdaptivePageSize:
+    """Grow or shrink a table's keyset page size toward a target page duration.
+
+    Sierra's per-page cost varies widely by table (item_message's first page
+    can take 10x as long as bib's), so a single PG_ITERSIZE is either too
+    small for cheap tables or too slow for expensive ones.  After every full
+    page, observe() scales ``size`` by target/actual duration — at most 2x
+    up or down per page — within [min_size, max_size] and never beyond
+    ``max_page_bytes`` of estimated row data.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        target_seconds: float,
+        min_size: int = 500,
+        max_size: int = 100_000,
+        max_page_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_page_bytes = max_page_bytes
+        self.size = self._clamp(initial, row_bytes=1)
+
+    def _clamp(self, size: float, row_bytes: int) -> int:
+        cap = min(self.max_size, max(self.min_size, self.max_page_bytes // max(row_bytes, 1)))
+        return int(min(cap, max(self.min_size, size)))
+
+    def observe(self, rows: int, seconds: float, row_bytes: int) -> None:
+        """Record that a page of *rows* rows of ~*row_bytes* each took *seconds*."""
+        if rows < self.size or seconds <= 0:
+            return  # a short (last) page says nothing about the cost of a full one
+        factor = min(2.0, max(0.5, self.target_seconds / seconds))
+        self.size = self._clamp(self.size * factor, row_bytes)
+
+
+def _pyformat_sql(name: str) -> str:
+    """Return the query *name* with ``:name`` binds rewritten for psycopg."""
+    return _BIND_PARAM.sub(r"%(\1)s", _load_sql(name))
+
+
+def _describe(cur, query: str, params: dict) -> tuple[tuple[str, ...], list[int]]:
+    """Return the column names and type OIDs of *query* from a ``LIMIT 0`` probe."""
+    cur.execute(f"SELECT * FROM ({query}) AS q LIMIT 0", params)
+    return tuple(d.name for d in cur.description), [d.type_code for d in cur.description]
+
+
+def _batches(rows, size: int):
+    """Yield lists of up to *size* items from *rows*."""
+    page = []
+    for row in rows:
+        page.append(row)
+        if len(page) == size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def _copy_pages(pg_conn, name: str, itersize: int, params: dict, copy_format: str):
+    """Yield pages of dict rows of the query *name* read through COPY TO STDOUT.
+
+    COPY carries no bind parameters or result types, so psycopg merges
+    *params* client-side and a ``LIMIT 0`` probe of the same query supplies
+    the column names and type OIDs.  Declaring those types lets psycopg's
+    loaders produce the same Python values (int, date, parsed JSON, …) as
+    the cursor path, so SQLite stores identical data.
+    """
+    pages = _copy_tuple_pages(pg_conn, name, itersize, params, copy_format, raw_values=False)
+    cols = next(pages)
+    for page in pages:
+        yield [dict(zip(cols, values, strict=True)) for values in page]
+
+
+def _copy_tuple_pages(
+    pg_conn, name: str, itersize: int, params: dict, copy_format: str, raw_values: bool = True
+):
+    """Like _copy_pages, but yield the column names first, then pages of tuples.
+
+    With *raw_values*, dates, timestamps, numerics and JSON arrive as the
+    strings and floats SQLite stores (see adapters.py).
+    """
+    if copy_format not in COPY_FORMATS:
+        raise ValueError(f"copy_format must be one of {COPY_FORMATS}, got {copy_format!r}")
+    query = _pyformat_sql(name)
+    raw = pg_conn.connection.driver_connection
+    with raw.cursor() as cur:
+        if raw_values:
+            adapters.register(cur)
+        cols, oids = _describe(cur, query, params)
+        yield cols
+        with cur.copy(f"COPY ({query}) TO STDOUT (FORMAT {copy_format})", params) as copy:
+            copy.set_types(oids)
+            yield from _batches(copy.rows(), itersize)
+
+
+def _tuple_pages(
+    pg_conn,
+    name: str,
+    itersize: int,
+    keyset: bool = False,
+    id_range=None,
+    target_date: str | None = None,
+    query_params: dict | None = None,
+    copy_format: str | None = None,
+    page_size: AdaptivePageSize | None = None,
+    sql_name: str | None = None,
+    ids=None,
+    events=None,
+):
+    """Yield the column names of the query *name*, then pages of plain tuples.
+
+    The tuple-native counterpart of _pages (same options): rows come straight
+    from a raw psycopg cursor — a named server-side cursor when streaming, a
+    plain one per keyset page, or COPY — without SQLAlchemy Row or
+    RowMapping objects, so per-row work is one tuple built in C.  Every
+    cursor carries the adapters.py loaders, so values need no conversion
+    before they are inserted.  *sql_name* runs a different query file in
+    place of ``<name>.sql``, paged on *name*'s cursor key.
+
+    *ids* (ID_DRIVEN queries only) is an ascending sequence of record ids:
+    each page is the query run for the next batch of them (``:ids``) rather
+    than the next slice of record_metadata, so Sierra looks the records up
+    by primary key.  The query's own filters still apply to every id.
+
+    Keyset and id pages run in a savepoint: a page cancelled by Sierra's
+    statement_timeout is retried from the same cursor with half the rows,
+    and the smaller size is kept for the rest of the table (see _split).
+    Each split is counted as ``page_splits`` in the *events* Counter.
+    """
+    key = KEYSET_KEYS.get(name)
+    params = _params(id_range, target_date, query_params)
+    sql_name = sql_name or name
     total = 0
-    while True:
-        rows = (
-            pg_conn.execute(
-                sql, {"target_date": _TARGET_DATE, "id_val": id_val, "limit_val": itersize}
+
+    if ids is not None:
+        if name not in ID_DRIVEN:
+            raise ValueError(f"{name!r} cannot be extracted from a list of ids")
+        if copy_format:
+            raise ValueError(f"{name}: ids cannot be read with COPY")
+        yield from _id_pages(pg_conn, name, itersize, params, sql_name, ids, page_size, events)
+        return
+
+    if copy_format:
+        pages = _copy_tuple_pages(pg_conn, sql_name, itersize, params, copy_format)
+        yield next(pages)
+        for page in pages:
+            yield page
+            total += len(page)
+            logger.info(f"  {name}: {total} rows (COPY {copy_format})")
+        return
+
+    query = _pyformat_sql(sql_name)
+    raw = pg_conn.connection.driver_connection
+
+    if keyset and key:
+        with raw.cursor() as cur:
+            adapters.register(cur)
+            cols = None
+            cap = None
+            while True:
+                limit = page_size.size if page_size else itersize
+                limit = min(limit, cap) if cap else limit
+                t0 = time.perf_counter()
+                try:
+                    page = _fetch_page(raw, cur, query, {**params, "limit_val": limit})
+                except QueryCanceled:
+                    if limit <= 1:
+                        raise
+                    cap = _split(name, limit, f"id {params['id_val']}", events)
+                    continue
+                if cols is None:
+                    cols = tuple(d.name for d in cur.description)
+                    key_index = cols.index(key)
+                    yield cols
+                if page_size and page:
+                    page_size.observe(len(page), time.perf_counter() - t0, _row_width(page[0]))
+                if not page:
+                    break
+                yield page
+                total += len(page)
+                params["id_val"] = page[-1][key_index]
+                logger.info(f"  {name}: {total} rows (cursor at id {params['id_val']})")
+        return
+
+    # Closing the named cursor (also on early exit) releases it server-side.
+    with raw.cursor(name=f"extract_{name}") as cur:
+        adapters.register(cur)
+        cur.itersize = itersize
+        cur.execute(query, params)
+        cols = tuple(d.name for d in cur.description)
+        yield cols
+        key_index = cols.index(key) if key else None
+        while page := cur.fetchmany(itersize):
+            yield page
+            total += len(page)
+            if key_index is not None:
+                logger.info(f"  {name}: {total} rows (cursor at id {page[-1][key_index]})")
+            else:
+                logger.info(f"  {name}: {total} rows")
+
+
+def _fetch_page(raw, cur, query: str, params: dict) -> list:
+    """Run one page query on *cur* inside a savepoint and return all its rows.
+
+    The query is prepared server-side on its first page (psycopg would
+    otherwise wait for its fifth), so every later page on the connection
+    skips parsing and analysis and may reuse a cached plan.
+
+    If the query fails (e.g. statement_timeout), only the savepoint is
+    rolled back: the session's transaction, its TEMP tables and any
+    snapshot (begin_snapshot) survive for the retry.
+    """
+    with raw.transaction():
+        cur.execute(query, params, prepare=True)
+        return cur.fetchall()
+
+
+def _split(name: str, rows: int, at: str, events) -> int:
+    """Return the page size to retry with after a page of *rows* rows (> 1) timed out."""
+    logger.warning(f"  {name}: page of {rows} rows at {at} timed out; retrying with {rows // 2}")
+    if events is not None:
+        events["page_splits"] += 1
+    return rows // 2
+
+
+def _id_pages(
+    pg_conn, name: str, itersize: int, params: dict, sql_name: str, ids, page_size, events=None
+):
+    """Yield the column names, then the rows of *sql_name* for each batch of *ids*."""
+    query = _pyformat_sql(sql_name)
+    total = start = 0
+    cap = None
+    raw = pg_conn.connection.driver_connection
+    with raw.cursor() as cur:
+        adapters.register(cur)
+        while True:
+            size = page_size.size if page_size else itersize
+            size = min(size, cap) if cap else size
+            batch = list(ids[start : start + size])
+            if start and not batch:
+                break
+            t0 = time.perf_counter()
+            try:
+                page = _fetch_page(raw, cur, query, {**params, "ids": batch})
+            except QueryCanceled:
+                if len(batch) <= 1:
+                    raise
+                cap = _split(name, len(batch), f"id {batch[0]}", events)
+                continue
+            if start == 0:
+                yield tuple(d.name for d in cur.description)
+                if not batch:  # no ids: the query ran only for its columns
+                    break
+            if page_size and page:
+                page_size.observe(len(batch), time.perf_counter() - t0, _row_width(page[0]))
+            if page:
+                yield page
+            total += len(page)
+            start += len(batch)
+            logger.info(f"  {name}: {total} rows ({start:,} of {len(ids):,} ids)")
+
+
+def _json_array(values: list) -> str:
+    """Encode *values* exactly as PostgreSQL's json_agg() prints them."""
+    # json_agg separates elements with ", " and, like ensure_ascii=False,
+    # escapes only quotes, backslashes and control characters.
+    return json.dumps(values, ensure_ascii=False)
+
+
+def _bib_set_pages(pg_conn, name: str, itersize: int, **options):
+    """Yield BIB_COLUMNS, then pages of bib tuples built from set-based queries.
+
+    The tuple-path equivalent of running bib.sql: bib_sets/base.sql pages
+    through the bibs (with every _tuple_pages option), and for each page
+    the sibling queries, prepared once per connection, fetch one attribute
+    for all of the page's ids.
+    The JSON arrays are assembled here, byte-identical to json_agg's text.
+    """
+    if options.get("copy_format"):
+        raise ValueError("the 'sets' bib strategy cannot read its pages with COPY")
+    pages = _tuple_pages(pg_conn, name, itersize, sql_name="bib_sets/base", **options)
+    base_cols = next(pages)
+    id_index = base_cols.index(KEYSET_KEYS[name])
+    queries = {c: _pyformat_sql(f"bib_sets/{c}") for c in _BIB_SET_ATTRIBUTES}
+    yield BIB_COLUMNS
+
+    with pg_conn.connection.driver_connection.cursor() as cur:
+        adapters.register(cur)
+        for page in pages:
+            ids = [row[id_index] for row in page]
+            values = {}
+            for column, query in queries.items():
+                cur.execute(query, {"ids": ids}, prepare=True)
+                if column in _BIB_SET_SCALARS:
+                    values[column] = dict(cur.fetchall())
+                    continue
+                grouped: dict[int, list] = {}
+                for record_id, value in cur.fetchall():
+                    grouped.setdefault(record_id, []).append(value)
+                values[column] = {k: _json_array(v) for k, v in grouped.items()}
+            rows = []
+            for row in page:
+                merged = dict(zip(base_cols, row, strict=True))
+                record_id = row[id_index]
+                for column in _BIB_SET_ATTRIBUTES:
+                    merged[column] = values[column].get(record_id)
+                rows.append(tuple(merged[c] for c in BIB_COLUMNS))
+            yield rows
+
+
+def _julian_day(time_string: str) -> int | None:
+    """Return the Julian day of a transit time such as ``MON JAN 02 2024 03:45PM``."""
+    _, month, day, year, _ = time_string.split()
+    try:
+        return date(int(year), _MONTHS[month[:3].lower()], int(day)).toordinal() + JULIAN_OFFSET
+    except (KeyError, ValueError):  # PostgreSQL would reject the string outright
+        return None
+
+
+def _parse_item_messages(cols: tuple[str, ...], page: list, today: int) -> list[tuple]:
+    """Turn raw message varfields into item_message rows, as item_message.sql would.
+
+    A varfield becomes a row only if its transit from/to or its transit time
+    matches (the two regexp_matches() calls are set-returning, so Sierra
+    drops fields matching neither).  *today* is the current Julian day, for
+    in_transit_days.  The call number and checkout columns are copied; the
+    item, bib and status columns are left NULL.
+    """
+    varfield_id, item_record_id, campus_code, occ_num, field_content, call_number = (
+        cols.index(c)
+        for c in (
+            "varfield_id",
+            "item_record_id",
+            "campus_code",
+            "occ_num",
+            "field_content",
+            "call_number",
+        )
+    )
+    checkout = [cols.index(c) for c in _ITEM_MESSAGE_CHECKOUT]
+    rows = []
+    for raw in page:
+        content = raw[field_content] or ""
+        from_to = _TRANSIT_FROM_TO.match(content)
+        time_match = _TRANSIT_TIME.match(content)
+        if not from_to and not time_match:
+            continue
+        julian = _julian_day(time_match.group()) if time_match else None
+        rows.append(
+            (
+                None,
+                raw[campus_code],
+                raw[call_number],
+                raw[item_record_id],
+                raw[varfield_id],
+                _IN_TRANSIT.search(content) is not None,
+                julian,
+                None if julian is None else today - julian,
+                from_to.group(1) if from_to else None,
+                from_to.group(2) if from_to else None,
+                _IN_TRANSIT_TOO_LONG.search(content) is not None,
+                raw[occ_num],
+                raw[field_content],
+                *(None,) * 9,
+                *(raw[i] for i in checkout),
             )
-            .mappings()
-            .all()
         )
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["bib_record_id"]
-        logger.info(f"  bib: {total} rows (cursor at id {id_val})")
+    return rows
+
+
+def _item_message_raw_pages(pg_conn, name: str, itersize: int, today: date, **options):
+    """Yield ITEM_MESSAGE_COLUMNS, then pages parsed from item_message_raw.sql.
+
+    The client-side counterpart of item_message.sql: Sierra returns only
+    the message varfields and every regex runs here, page by page.
+    in_transit_days counts up to *today*, Sierra's date for the run.
+    """
+    pages = _tuple_pages(pg_conn, name, itersize, sql_name="item_message_raw", **options)
+    cols = next(pages)
+    yield ITEM_MESSAGE_COLUMNS
+    julian_today = today.toordinal() + JULIAN_OFFSET
+    for page in pages:
+        yield _parse_item_messages(cols, page, julian_today)
+
+
+def _check_json(name: str, cols: tuple[str, ...], page: list, every: int) -> None:
+    """Parse the JSON columns of every *every*-th row of *page*.
+
+    Raises ValueError naming the table and column if a value is not
+    well-formed JSON text.
+    """
+    for column in JSON_COLUMNS.get(name, ()):
+        i = cols.index(column)
+        for row in page[::every]:
+            value = row[i]
+            if not isinstance(value, str):
+                continue
+            try:
+                json.loads(value)
+            except ValueError as exc:
+                raise ValueError(f"{name}.{column}: malformed JSON {value[:80]!r}") from exc
+
+
+def _paginated(
+    pg_conn,
+    name: str,
+    itersize: int,
+    tuples: bool = False,
+    json_check_every: int = 0,
+    page_source=None,
+    throttle=None,
+    events=None,
+    **options,
+):
+    """Yield the rows of every page of the query *name* (options as for _pages).
+
+    With *tuples*, yield the column names first and then each row as a plain
+    tuple (see _tuple_pages) — the row protocol the pipeline loads from.
+    There, *json_check_every* > 0 spot-checks the JSON_COLUMNS of one row in
+    that many (see _check_json); dict rows are parsed by psycopg anyway.
+    *page_source* replaces _tuple_pages as the generator of tuple pages.
+    An ``ids`` list (see _tuple_pages) likewise needs *tuples*.  With
+    *tuples*, a query with STAGING tables stages them and runs its staged/
+    variant when the server allows (see stage).  A *throttle*
+    (throttle.Throttle) is told how long each page took to fetch and paces
+    the next one.  An *events* Counter (tuples only) tallies the pages
+    split after a statement timeout (see _tuple_pages).
+    """
+    if page_source and not tuples:
+        raise ValueError(f"{name}: {page_source.__name__} requires tuples=True")
+    if options.get("ids") is not None and not tuples:
+        raise ValueError(f"{name}: ids requires tuples=True")
+    if tuples and stage(pg_conn, name):
+        options["sql_name"] = f"staged/{name}"
+    if tuples:
+        if events is not None:
+            options["events"] = events
+        pages = (page_source or _tuple_pages)(pg_conn, name, itersize, **options)
+        cols = next(pages)
+        yield cols
+    else:
+        pages = _pages(pg_conn, name, itersize, **options)
+    # Mid-COPY the connection cannot run the throttle's pg_stat_activity probe.
+    probe_conn = None if options.get("copy_format") else pg_conn
+    t0 = time.perf_counter()
+    for page in pages:
+        fetch_seconds = time.perf_counter() - t0
+        if tuples and json_check_every:
+            _check_json(name, cols, page, json_check_every)
+        yield from page
+        if throttle:
+            throttle.wait(probe_conn, name, fetch_seconds)
+        t0 = time.perf_counter()
+
+
+def key_ranges(pg_conn, name: str, n: int) -> list[tuple[int, int]]:
+    """Split the cursor-key space of table *name* into about *n* ranges.
+
+    Reads the key's min/max from ``sql/queries/key_bounds/<name>.sql`` (one
+    row per dense span of ids, e.g. one per record type) and cuts the spans
+    into ranges of equal id width.  Returns ``(after, upto)`` pairs suitable
+    for the ``id_range`` extractor option; together they cover every key.
+    """
+    if name not in PARTITIONABLE:
+        raise ValueError(f"{name!r} cannot be range-partitioned")
+    rows = pg_conn.execute(text(_load_sql(f"key_bounds/{name}"))).all()
+    spans = [(lo, hi) for lo, hi in rows if lo is not None]
+    ranges = _split_key_space(spans, n)
+    logger.info(f"  {name}: split into {len(ranges)} key ranges")
+    return ranges
+
+
+def _split_key_space(spans: list[tuple[int, int]], n: int) -> list[tuple[int, int]]:
+    """Cut inclusive id spans into at most *n* ``(after, upto]`` ranges.
+
+    Widths are measured over the spans only, so the gaps between them (e.g.
+    between the bib and item id blocks) do not produce empty ranges.
+    """
+    if not spans:
+        return [(0, _MAX_ID)]
+    total = sum(hi - lo + 1 for lo, hi in spans)
+    bounds = [spans[0][0] - 1]
+    for k in range(1, n):
+        offset = total * k // n
+        for lo, hi in spans:
+            width = hi - lo + 1
+            if offset < width:
+                bounds.append(lo + offset - 1)
+                break
+            offset -= width
+    bounds.append(spans[-1][1])
+    ranges = [(a, b) for a, b in pairwise(bounds) if b > a]
+    # Open both ends so rows created after the bounds were read still land
+    # in the first or last range.
+    ranges[0] = (0, ranges[0][1])
+    ranges[-1] = (ranges[-1][0], _MAX_ID)
+    return ranges
+
+
+def _lookup(pg_conn, name: str, tuples: bool = False):
+    """Yield the rows of a small, unpaginated lookup query in one round trip.
+
+    With *tuples*, yield the column names first, then plain tuples.
+    """
+    if tuples:
+        with pg_conn.connection.driver_connection.cursor() as cur:
+            adapters.register(cur)
+            cur.execute(_load_sql(name))
+            rows = cur.fetchall()
+            yield tuple(d.name for d in cur.description)
+    else:
+        rows = pg_conn.execute(text(_load_sql(name))).mappings().all()
+    logger.info(f"  {name}: {len(rows)} rows")
+    yield from rows
+
+
+def _pipelined(pg_conn, queries: dict[str, str]) -> dict[str, tuple[tuple[str, ...], list]]:
+    """Run *queries* (name -> SQL) in a single network round trip.
+
+    The queries are queued in psycopg pipeline mode and sent together, and
+    Sierra answers them all before the one sync.  Returns, per name, its
+    column names and rows as plain tuples, read with the adapters.py
+    loaders.  If the client's libpq lacks pipeline mode, the queries run one
+    after another.
+    """
+    raw = pg_conn.connection.driver_connection
+    pipeline = raw.pipeline() if Pipeline.is_supported() else contextlib.nullcontext()
+    cursors = {}
+    try:
+        with pipeline:
+            for name, query in queries.items():
+                cur = cursors[name] = raw.cursor()
+                adapters.register(cur)
+                cur.execute(query)
+        # Leaving the pipeline block synced it: every result has arrived.
+        return {
+            name: (tuple(d.name for d in cur.description), cur.fetchall())
+            for name, cur in cursors.items()
+        }
+    finally:
+        for cur in cursors.values():
+            cur.close()
+
+
+def extract_lookups(pg_conn, names=LOOKUPS) -> dict[str, tuple[tuple[str, ...], list]]:
+    """Fetch the lookup queries *names* in a single network round trip (see _pipelined)."""
+    results = _pipelined(pg_conn, {name: _load_sql(name) for name in names})
+    for name, (_, rows) in results.items():
+        logger.info(f"  {name}: {len(rows)} rows")
+    return results
 
 
-def extract_item(pg_conn, itersize: int = 5000):
+def lookup_fingerprints(pg_conn, names=LOOKUPS) -> dict[str, str]:
+    """Return a fingerprint of each lookup query's current result, in one round trip.
+
+    Sierra runs every query of *names* and sends back only an md5 of its
+    rows (see _FINGERPRINT_SQL), so the result never crosses the network.
+    The fingerprint also covers the query text: editing sql/queries/<name>.sql
+    changes it even when the rows happen not to.
+    """
+    sql = {name: _load_sql(name) for name in names}
+    results = _pipelined(
+        pg_conn, {name: _FINGERPRINT_SQL.format(query=query) for name, query in sql.items()}
+    )
+    return {
+        name: hashlib.md5(f"{sql[name]}\0{rows[0][0]}".encode()).hexdigest()
+        for name, (_, rows) in results.items()
+    }
+
+
+def extract_record_metadata(pg_conn, itersize: int = 5000, **options):
+    """Yield record_metadata rows for bib ('b'), item ('i'), and volume ('j') records."""
+    yield from _paginated(pg_conn, "record_metadata", itersize, **options)
+
+
+def extract_bib(pg_conn, itersize: int = 5000, strategy: str = "query", **options):
+    """Yield bib rows with aggregated JSON fields.
+
+    *strategy* is one of BIB_STRATEGIES; "sets" needs ``tuples=True``.
+    """
+    if strategy not in BIB_STRATEGIES:
+        raise ValueError(f"strategy must be one of {BIB_STRATEGIES}, got {strategy!r}")
+    if strategy == "sets":
+        options["page_source"] = _bib_set_pages
+    yield from _paginated(pg_conn, "bib", itersize, **options)
+
+
+def extract_item(pg_conn, itersize: int = 5000, **options):
     """Yield item rows with join to bib, checkout, volume, and format lookup."""
-    sql = text(_load_sql("item"))
-    id_val = 0
-    total = 0
-    while True:
-        rows = (
-            pg_conn.execute(
-                sql, {"target_date": _TARGET_DATE, "id_val": id_val, "limit_val": itersize}
-            )
-            .mappings()
-            .all()
-        )
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["item_record_id"]
-        logger.info(f"  item: {total} rows (cursor at id {id_val})")
+    yield from _paginated(pg_conn, "item", itersize, **options)
 
 
-def extract_bib_record(pg_conn, itersize: int = 5000):
+def extract_bib_record(pg_conn, itersize: int = 5000, **options):
     """Yield bib_record rows (MARC-level bib metadata)."""
-    sql = text(_load_sql("bib_record"))
-    id_val = 0
-    total = 0
-    while True:
-        rows = (
-            pg_conn.execute(
-                sql, {"target_date": _TARGET_DATE, "id_val": id_val, "limit_val": itersize}
-            )
-            .mappings()
-            .all()
-        )
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["id"]
-        logger.info(f"  bib_record: {total} rows (cursor at id {id_val})")
+    yield from _paginated(pg_conn, "bib_record", itersize, **options)
 
 
-def extract_volume_record(pg_conn, itersize: int = 5000):
+def extract_volume_record(pg_conn, itersize: int = 5000, **options):
     """Yield volume_record rows with bib linkage."""
-    sql = text(_load_sql("volume_record"))
-    id_val = 0
-    total = 0
-    while True:
-        rows = (
-            pg_conn.execute(
-                sql, {"target_date": _TARGET_DATE, "id_val": id_val, "limit_val": itersize}
-            )
-            .mappings()
-            .all()
-        )
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["volume_record_id"]
-        logger.info(f"  volume_record: {total} rows (cursor at id {id_val})")
-
-
-def extract_item_message(pg_conn, itersize: int = 5000):
-    """Yield item_message rows (in-transit and status message fields)."""
-    sql = text(_load_sql("item_message"))
-    id_val = 0
-    total = 0
-    while True:
-        rows = pg_conn.execute(sql, {"id_val": id_val, "limit_val": itersize}).mappings().all()
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["varfield_id"]
-        logger.info(f"  item_message: {total} rows (cursor at id {id_val})")
+    yield from _paginated(pg_conn, "volume_record", itersize, **options)
+
+
+def extract_item_message(
+    pg_conn, itersize: int = 5000, mode: str = "query", today: date | None = None, **options
+):
+    """Yield item_message rows (in-transit and status message fields).
 
+    *mode* is one of ITEM_MESSAGE_MODES; "raw" needs ``tuples=True`` and
+    computes in_transit_days against *today*.  Pass Sierra's date (as the
+    query mode uses Sierra's NOW()); it defaults to the local date.
+    """
+    if mode not in ITEM_MESSAGE_MODES:
+        raise ValueError(f"mode must be one of {ITEM_MESSAGE_MODES}, got {mode!r}")
+    if mode == "raw":
+        options["page_source"] = _item_message_raw_pages
+        options["today"] = today or date.today()
+    yield from _paginated(pg_conn, "item_message", itersize, **options)
 
-def extract_language_property(pg_conn, itersize: int = 5000):
+
+def extract_language_property(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield language_property lookup rows."""
-    sql = text(_load_sql("language_property"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  language_property: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "language_property", tuples)
 
 
-def extract_bib_record_item_record_link(pg_conn, itersize: int = 5000):
+def extract_bib_record_item_record_link(pg_conn, itersize: int = 5000, **options):
     """Yield bib_record_item_record_link rows."""
-    sql = text(_load_sql("bib_record_item_record_link"))
-    id_val = 0
-    total = 0
-    while True:
-        rows = pg_conn.execute(sql, {"id_val": id_val, "limit_val": itersize}).mappings().all()
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["id"]
-        logger.info(f"  bib_record_item_record_link: {total} rows (cursor at id {id_val})")
+    yield from _paginated(pg_conn, "bib_record_item_record_link", itersize, **options)
 
 
-def extract_volume_record_item_record_link(pg_conn, itersize: int = 5000):
+def extract_volume_record_item_record_link(pg_conn, itersize: int = 5000, **options):
     """Yield volume_record_item_record_link rows."""
-    sql = text(_load_sql("volume_record_item_record_link"))
-    id_val = 0
-    total = 0
-    while True:
-        rows = pg_conn.execute(sql, {"id_val": id_val, "limit_val": itersize}).mappings().all()
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["id"]
-        logger.info(f"  volume_record_item_record_link: {total} rows (cursor at id {id_val})")
+    yield from _paginated(pg_conn, "volume_record_item_record_link", itersize, **options)
 
 
-def extract_location(pg_conn, itersize: int = 5000):
+def extract_location(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield location rows."""
-    sql = text(_load_sql("location"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  location: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "location", tuples)
 
 
-def extract_location_name(pg_conn, itersize: int = 5000):
+def extract_location_name(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield location_name rows."""
-    sql = text(_load_sql("location_name"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  location_name: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "location_name", tuples)
 
 
-def extract_branch_name(pg_conn, itersize: int = 5000):
+def extract_branch_name(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield branch_name rows."""
-    sql = text(_load_sql("branch_name"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  branch_name: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "branch_name", tuples)
 
 
-def extract_branch(pg_conn, itersize: int = 5000):
+def extract_branch(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield branch rows."""
-    sql = text(_load_sql("branch"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  branch: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "branch", tuples)
 
 
-def extract_country_property_myuser(pg_conn, itersize: int = 5000):
+def extract_country_property_myuser(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield country_property_myuser lookup rows."""
-    sql = text(_load_sql("country_property_myuser"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  country_property_myuser: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "country_property_myuser", tuples)
 
 
-def extract_item_status_property(pg_conn, itersize: int = 5000):
+def extract_item_status_property(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield item_status_property lookup rows."""
-    sql = text(_load_sql("item_status_property"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  item_status_property: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "item_status_property", tuples)
 
 
-def extract_itype_property(pg_conn, itersize: int = 5000):
+def extract_itype_property(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield itype_property lookup rows (item format names)."""
-    sql = text(_load_sql("itype_property"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  itype_property: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "itype_property", tuples)
 
 
-def extract_bib_level_property(pg_conn, itersize: int = 5000):
+def extract_bib_level_property(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield bib_level_property lookup rows."""
-    sql = text(_load_sql("bib_level_property"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  bib_level_property: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "bib_level_property", tuples)
 
 
-def extract_material_property(pg_conn, itersize: int = 5000):
+def extract_material_property(pg_conn, itersize: int = 5000, tuples: bool = False):
     """Yield material_property lookup rows."""
-    sql = text(_load_sql("material_property"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  material_property: {len(rows)} rows")
-    yield from rows
+    yield from _lookup(pg_conn, "material_property", tuples)
 
 
-def extract_hold(pg_conn, itersize: int = 5000):
+def extract_hold(pg_conn, itersize: int = 5000, **options):
     """Yield hold rows with patron metadata."""
-    sql = text(_load_sql("hold"))
-    id_val = 0
-    total = 0
-    while True:
-        rows = pg_conn.execute(sql, {"id_val": id_val, "limit_val": itersize}).mappings().all()
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["hold_id"]
-        logger.info(f"  hold: {total} rows (cursor at id {id_val})")
-
-
-def extract_circ_agg(pg_conn, itersize: int = 5000):
-    """Yield circ_agg rows — aggregated circulation transactions for the last 6 months."""
-    sql = text(_load_sql("circ_agg"))
-    rows = pg_conn.execute(sql).mappings().all()
-    logger.info(f"  circ_agg: {len(rows)} rows")
-    yield from rows
+    yield from _paginated(pg_conn, "hold", itersize, **options)
 
 
-def extract_circ_leased_items(pg_conn, itersize: int = 5000):
+def extract_circ_agg(
+    pg_conn,
+    itersize: int = 5000,
+    since: str | None = None,
+    retention_months: int = 6,
+    **options,
+):
+    """Yield circ_agg rows — circulation transactions aggregated per day.
+
+    Covers the *retention_months* before the start of the current month,
+    restricted to days on or after *since* (``YYYY-MM-DD``) when given — see
+    circ_cache.py for how closed days are carried between runs.
+
+    The aggregate cannot be keyset-paginated, so it is always streamed
+    (server-side cursor or COPY) rather than materialized with ``.all()``.
+    """
+    params = {"since_date": since or _TARGET_DATE, "retention_months": retention_months}
+    yield from _paginated(pg_conn, "circ_agg", itersize, query_params=params, **options)
+
+
+def extract_circ_leased_items(pg_conn, itersize: int = 5000, **options):
     """Yield circ_leased_items rows — checkout/checkin activity for leased items (last 180 days)."""
-    sql = text(_load_sql("circ_leased_items"))
-    id_val = 0
-    total = 0
-    while True:
-        rows = pg_conn.execute(sql, {"id_val": id_val, "limit_val": itersize}).mappings().all()
-        if not rows:
-            break
-        yield from rows
-        total += len(rows)
-        id_val = rows[-1]["id"]
-        logger.info(f"  circ_leased_items: {total} rows (cursor at id {id_val})")
+    yield from _paginated(pg_conn, "circ_leased_items", itersize, **options)
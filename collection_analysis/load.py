@@ -6,10 +6,14 @@ Handles:
   - Bulk-inserting rows (executemany with plain sqlite3)
   - Deferring index creation until all tables are loaded
   - Building to a temp file (*.db.new) and atomically swapping on completion
+  - Starting a build from a copy of the live database (incremental rebuilds)
+  - Small key/value build state stored alongside the data (_build_state)
+  - Copying still-valid rows forward from the live database (copy_live_table)
 
 Typical usage:
     db = open_build_db(path)         # open temp file, apply fast-write PRAGMAs
     load_table(db, "item", rows)     # insert rows
+    append_rows(db, "item", more)    # add a further chunk (no summary log)
     ...
     finalize_db(db)                  # re-apply safe PRAGMAs, ANALYZE
     swap_db(path)                    # mv *.db.new -> *.db
@@ -21,7 +25,9 @@ import json
 import logging
 import os
 import sqlite3
+from array import array
 from datetime import date, datetime
+from decimal import Decimal
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -37,6 +43,10 @@ BUILD_PRAGMAS = {
     "locking_mode": "EXCLUSIVE",
 }
 
+# Key/value table in the build database recording pipeline state that must
+# travel with the data it describes (e.g. the incremental high-water mark).
+STATE_TABLE = "_build_state"
+
 # PRAGMAs applied after build is complete (before swap)
 FINAL_PRAGMAS = {
     "journal_mode": "WAL",
@@ -45,6 +55,80 @@ FINAL_PRAGMAS = {
 }
 
 
+# Types sqlite3 binds natively; columns holding only these are passed through.
+_PASSTHROUGH = frozenset({int, float, str, bytes, type(None)})
+
+# Converter for each Python type that sqlite3 cannot bind (or should not, for bool).
+_CONVERTERS = {
+    dict: json.dumps,
+    list: json.dumps,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    Decimal: float,
+    bool: int,
+}
+
+
+def _serialize(v):
+    """Convert one value to a type sqlite3 can bind (the generic, per-cell path)."""
+    if isinstance(v, (dict, list)):
+        return json.dumps(v)
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return float(v)
+    return v
+
+
+def _converter_for(types):
+    """Return the converter for a column holding *types*: None (identity),
+    one type-specific function, or _serialize when the types need different
+    conversions."""
+    if types <= _PASSTHROUGH:
+        return None
+    converters = {_CONVERTERS.get(t) for t in types}
+    if len(converters) == 1 and None not in converters:
+        return converters.pop()
+    return _serialize
+
+
+class _ColumnPlan:
+    """Per-column converters for one load, inferred from its first batch.
+
+    A column's Python type is fixed once the first page has been read, so
+    rather than calling _serialize() on every cell each batch is transposed
+    and each column converted in a single comprehension — or passed through
+    untouched when it only holds types sqlite3 binds natively.  A column
+    whose types turn out to vary is re-planned from the union of the types
+    seen, which falls back to _serialize() only when they need different
+    conversions.
+    """
+
+    def __init__(self, width: int):
+        self.types: list[frozenset | None] = [None] * width  # None: only NULLs so far
+        self.converters: list = [None] * width
+
+    def apply(self, batch: list) -> list:
+        """Return *batch* with every value converted for executemany."""
+        columns = list(zip(*batch, strict=True))
+        converted = []
+        changed = False
+        for i, column in enumerate(columns):
+            types = set(map(type, column))
+            types.discard(type(None))
+            known = self.types[i]
+            if types and (known is None or not types <= known):
+                self.types[i] = frozenset(types | (known or set()))
+                self.converters[i] = _converter_for(self.types[i])
+            convert = self.converters[i]
+            if convert is None:
+                converted.append(column)
+            else:
+                converted.append([v if v is None else convert(v) for v in column])
+                changed = True
+        return list(zip(*converted, strict=True)) if changed else batch
+
+
 def build_path(output_dir: str, db_name: str = "current_collection.db") -> Path:
     """Return the path for the in-progress (temp) database file."""
     return Path(output_dir) / (db_name + ".new")
@@ -55,12 +139,37 @@ def final_path(output_dir: str, db_name: str = "current_collection.db") -> Path:
     return Path(output_dir) / db_name
 
 
-def open_build_db(output_dir: str, db_name: str = "current_collection.db") -> sqlite3.Connection:
-    """Open the temp build database (always fresh) and apply fast-write PRAGMAs."""
+def open_build_db(
+    output_dir: str,
+    db_name: str = "current_collection.db",
+    base: Path | None = None,
+    resume: bool = False,
+) -> sqlite3.Connection:
+    """Open the temp build database and apply fast-write PRAGMAs.
+
+    The build normally starts fresh.  With *base*, it starts as a copy of
+    that database (taken with the SQLite backup API, so it is consistent even
+    while the live file is being read) — the starting point of an
+    incremental rebuild.  With *resume*, an existing build file left by a
+    failed run is kept as-is so extraction can continue where it stopped.
+    """
     path = build_path(output_dir, db_name)
     path.parent.mkdir(parents=True, exist_ok=True)
+    if resume and path.exists():
+        db = sqlite3.connect(path)
+        for pragma, value in BUILD_PRAGMAS.items():
+            db.execute(f"PRAGMA {pragma} = {value}")
+        logger.info(f"Resuming build database: {path}")
+        return db
     path.unlink(missing_ok=True)  # discard any stale/corrupt file from a previous failed run
     db = sqlite3.connect(path)
+    if base is not None:
+        src = sqlite3.connect(f"file:{base}?mode=ro", uri=True)
+        try:
+            src.backup(db)
+        finally:
+            src.close()
+        logger.info(f"Copied {base} into build database")
     for pragma, value in BUILD_PRAGMAS.items():
         db.execute(f"PRAGMA {pragma} = {value}")
     logger.info(f"Opened build database: {path}")
@@ -81,6 +190,7 @@ def load_table(
     table_name: str,
     rows,
     batch_size: int = 5000,
+    columns=None,
 ) -> int:
     """Insert an iterable of row dicts into *table_name*, creating it if needed.
 
@@ -88,37 +198,67 @@ def load_table(
       declarations — SQLite uses dynamic typing).
     - dict/list values are JSON-serialized to strings.
     - datetime/date values are converted to ISO-format strings.
+    - Decimal values are stored as floats and bools as integers.
+    - Conversions are planned per column from the first batch and applied
+      column by column (see _ColumnPlan).
     - Rows are inserted in batches of *batch_size* for efficiency.
+    - With *columns* (the tuple row protocol), rows are sequences of values
+      in that column order rather than dicts.
 
     Returns the total number of rows inserted.
     """
-    cols: list[str] | None = None
-    batch: list[list] = []
+    total = append_rows(db, table_name, rows, batch_size, columns)
+
+    if total:
+        logger.info(f"Loaded {total:,} rows into '{table_name}'")
+    else:
+        logger.warning(f"No rows loaded into '{table_name}'")
+
+    return total
+
+
+def append_rows(
+    db: sqlite3.Connection,
+    table_name: str,
+    rows,
+    batch_size: int = 5000,
+    columns=None,
+    commit: bool = True,
+) -> int:
+    """Insert rows into *table_name* like load_table, without the summary log.
+
+    For callers that feed one table in several chunks (e.g. the parallel
+    extraction writer), where a per-chunk "Loaded N rows" line would be noise.
+    With ``commit=False`` the rows are left in the open transaction, for a
+    caller loading several tables at once to commit together.
+
+    Returns the number of rows inserted.
+    """
+    cols: list[str] | None = list(columns) if columns is not None else None
+    batch: list = []
     total = 0
+    plan: _ColumnPlan | None = None
 
     def _flush(cols, batch):
         col_names = ", ".join(f'"{c}"' for c in cols)
         placeholders = ", ".join("?" for _ in cols)
         db.executemany(
             f'INSERT INTO "{table_name}" ({col_names}) VALUES ({placeholders})',
-            batch,
+            plan.apply(batch),
         )
-        db.commit()
-
-    def _serialize(v):
-        if isinstance(v, (dict, list)):
-            return json.dumps(v)
-        if isinstance(v, (datetime, date)):
-            return v.isoformat()
-        return v
+        if commit:
+            db.commit()
 
     for row in rows:
-        if cols is None:
-            cols = list(row.keys())
+        if plan is None:
+            if cols is None:
+                cols = list(row.keys())
             col_defs = ", ".join(f'"{c}"' for c in cols)
             db.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({col_defs})')
+            _add_missing_columns(db, table_name, cols)
+            plan = _ColumnPlan(len(cols))
 
-        batch.append([_serialize(row[c]) for c in cols])
+        batch.append(row if columns is not None else [row[c] for c in cols])
         total += 1
 
         if len(batch) >= batch_size:
@@ -128,17 +268,178 @@ def load_table(
     if batch and cols:
         _flush(cols, batch)
 
-    if total:
-        logger.info(f"Loaded {total:,} rows into '{table_name}'")
-    else:
-        logger.warning(f"No rows loaded into '{table_name}'")
-
     return total
 
 
+def _add_missing_columns(db: sqlite3.Connection, table_name: str, cols) -> None:
+    """Add any of *cols* that an existing *table_name* lacks.
+
+    A table carried over from a previous build (incremental runs, cached
+    circulation rows) predates columns added to its query since.
+    """
+    existing = {row[1] for row in db.execute(f'PRAGMA table_info("{table_name}")')}
+    for c in cols:
+        if c not in existing:
+            db.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{c}"')
+            logger.info(f"Added column '{c}' to '{table_name}'")
+
+
 def swap_db(output_dir: str, db_name: str = "current_collection.db") -> None:
     """Atomically replace the live database with the newly built one."""
     src = build_path(output_dir, db_name)
     dst = final_path(output_dir, db_name)
     os.replace(src, dst)
     logger.info(f"Swapped: {src} -> {dst}")
+
+
+def read_state(db: sqlite3.Connection, key: str) -> str | None:
+    """Return the value stored under *key* in the build-state table, or None."""
+    try:
+        row = db.execute(f"SELECT value FROM {STATE_TABLE} WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:  # table absent: database predates build state
+        return None
+    return row[0] if row else None
+
+
+def read_live_state(
+    output_dir: str, key: str, db_name: str = "current_collection.db"
+) -> str | None:
+    """Like read_state, against the live database (read-only); None if there is none."""
+    path = final_path(output_dir, db_name)
+    if not path.exists():
+        return None
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return read_state(db, key)
+    finally:
+        db.close()
+
+
+def copy_live_table(
+    db: sqlite3.Connection,
+    output_dir: str,
+    table_name: str,
+    where: str = "1",
+    params: tuple = (),
+    db_name: str = "current_collection.db",
+) -> int:
+    """Replace *table_name* in the build with the live database's rows matching *where*.
+
+    The live database is ATTACHed for the copy, so the rows never pass
+    through Python.  A table the live database lacks had no rows (load_table
+    creates none for an empty result) and is left absent here too.
+    Returns the number of rows copied.
+    """
+    db.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+    db.execute("ATTACH DATABASE ? AS prev", (str(final_path(output_dir, db_name)),))
+    try:
+        exists = db.execute(
+            "SELECT 1 FROM prev.sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).fetchone()
+        if exists:
+            db.execute(
+                f'CREATE TABLE "{table_name}" AS SELECT * FROM prev."{table_name}" WHERE {where}',
+                params,
+            )
+        db.commit()
+    finally:
+        db.execute("DETACH DATABASE prev")
+    if not exists:
+        return 0
+    return db.execute(f'SELECT count(*) FROM "{table_name}"').fetchone()[0]
+
+
+def write_state(db: sqlite3.Connection, key: str, value: str) -> None:
+    """Store *value* under *key* in the build-state table (insert or replace)."""
+    db.execute(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+    db.execute(f"INSERT OR REPLACE INTO {STATE_TABLE} (key, value) VALUES (?, ?)", (key, value))
+    db.commit()
+
+
+def drop_views(db: sqlite3.Connection) -> None:
+    """Drop every view so transform.create_views() recreates them from sql/views/."""
+    names = [r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'view'")]
+    for name in names:
+        db.execute(f'DROP VIEW "{name}"')
+    db.commit()
+
+
+def drop_tables(db: sqlite3.Connection, names) -> None:
+    """Drop the given tables (and with them their indexes) if they exist."""
+    for name in names:
+        db.execute(f'DROP TABLE IF EXISTS "{name}"')
+    db.commit()
+
+
+def max_rowid(db: sqlite3.Connection, table_name: str) -> int:
+    """Return the highest rowid in *table_name* (0 if it is empty or absent)."""
+    try:
+        row = db.execute(f'SELECT max(rowid) FROM "{table_name}"').fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def max_key(
+    db: sqlite3.Connection, table_name: str, key: str, after: int = 0, upto: int | None = None
+) -> int | None:
+    """Return the highest *key* in *table_name* with ``after < key <= upto``, or None."""
+    sql = f'SELECT max("{key}") FROM "{table_name}" WHERE "{key}" > ?'
+    params: tuple = (after,)
+    if upto is not None:
+        sql += f' AND "{key}" <= ?'
+        params += (upto,)
+    try:
+        return db.execute(sql, params).fetchone()[0]
+    except sqlite3.OperationalError:  # table not created yet
+        return None
+
+
+def delete_key(db: sqlite3.Connection, table_name: str, key: str, value) -> int:
+    """Delete the rows of *table_name* whose *key* equals *value*; return how many."""
+    n = db.execute(f'DELETE FROM "{table_name}" WHERE "{key}" = ?', (value,)).rowcount
+    db.commit()
+    return n
+
+
+def record_ids(
+    db: sqlite3.Connection,
+    record_type: str,
+    after: int = 0,
+    upto: int | None = None,
+    updated_since: int | None = None,
+) -> array:
+    """Return the ids of undeleted *record_type* records in record_metadata, ascending.
+
+    Only ids with ``after < id <= upto`` are returned and, given
+    *updated_since* (a Julian day), only records last updated on or after
+    that day.  Each id appears once even while an incremental build holds
+    an old and a new copy of its row.
+    """
+    sql = (
+        "SELECT DISTINCT record_id FROM record_metadata "
+        "WHERE record_type_code = ? AND deletion_julianday IS NULL AND record_id > ?"
+    )
+    params: tuple = (record_type, after)
+    if upto is not None:
+        sql += " AND record_id <= ?"
+        params += (upto,)
+    if updated_since is not None:
+        sql += " AND record_last_updated_julianday >= ?"
+        params += (updated_since,)
+    return array("q", (row[0] for row in db.execute(sql + " ORDER BY record_id", params)))
+
+
+def replace_older_rows(db: sqlite3.Connection, table_name: str, key: str, since_rowid: int) -> int:
+    """Upsert by *key*: delete rows at or below *since_rowid* that were re-appended after it.
+
+    Rows appended after *since_rowid* are the new versions; any earlier row
+    with the same *key* is the stale copy.  Returns the number of rows deleted.
+    """
+    cur = db.execute(
+        f'DELETE FROM "{table_name}" WHERE rowid <= ? AND "{key}" IN '
+        f'(SELECT "{key}" FROM "{table_name}" WHERE rowid > ?)',
+        (since_rowid, since_rowid),
+    )
+    db.commit()
+    return cur.rowcount
@@ -0,0 +1,54 @@
+"""
+lookup_cache.py — Reuse lookup tables that have not changed since the last build.
+
+The LOOKUPS tables (location, branch, itype_property, ...) change a few times
+a year, yet every build fetched and reloaded them.  Instead, each build first
+asks Sierra for a fingerprint of every lookup query's result
+(extract.lookup_fingerprints: an md5 computed server-side, all tables in one
+round trip) and compares it with the fingerprint the live
+current_collection.db recorded for that table:
+
+    - a matching table is copied from the live database with ATTACH and
+      marked done, so it is not extracted at all
+    - any other table (changed, new, or no live database) is extracted as
+      usual
+    - every fingerprint is recorded as ``fingerprint:<table>`` in the build's
+      _build_state, for the next build to compare against
+
+A fingerprint taken while Sierra is mid-change only ever causes a refetch:
+the rows loaded are at least as new as the fingerprint recorded with them.
+Sample builds (EXTRACT_LIMIT) neither reuse tables nor record fingerprints,
+so a capped table is never carried into a full build.
+
+Usage:
+    from collection_analysis import lookup_cache
+    fingerprints = extract.lookup_fingerprints(pg, names)
+    reused = lookup_cache.reuse(db, output_dir, fingerprints)   # {table: rows}
+"""
+
+import logging
+import sqlite3
+
+from . import load
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_PREFIX = "fingerprint:"
+
+
+def reuse(db: sqlite3.Connection, output_dir: str, fingerprints: dict[str, str]) -> dict[str, int]:
+    """Copy each table whose fingerprint matches the live build's into the build database.
+
+    Records every fingerprint of *fingerprints* in the build state.  Returns
+    ``{table: rows copied}`` for the tables reused; the rest must be
+    extracted.
+    """
+    reused = {}
+    for name, fingerprint in fingerprints.items():
+        key = FINGERPRINT_PREFIX + name
+        if load.read_live_state(output_dir, key) == fingerprint:
+            reused[name] = load.copy_live_table(db, output_dir, name)
+        load.write_state(db, key, fingerprint)
+    if reused:
+        logger.info(f"Lookup tables unchanged since the last build, reused: {', '.join(reused)}")
+    return reused
@@ -3,6 +3,8 @@ run.py — Main entry point for the collection analysis pipeline.
 
 Usage:
     python -m collection_analysis.run
+    python -m collection_analysis.run --incremental
+    python -m collection_analysis.run --resume
     python -m collection_analysis.run --config /path/to/config.json
 
 What it does:
@@ -10,8 +12,16 @@ What it does:
     2. Configure logging (level + optional file handler)
     3. Open persistent telemetry DB
     4. Connect to Sierra PostgreSQL
-    5. Open temp SQLite build database with fast-write PRAGMAs
-    6. Extract each table from Sierra and load into SQLite (with per-table timing)
+    5. Open temp SQLite build database with fast-write PRAGMAs; with
+       --incremental, start from a copy of the live database (see incremental.py);
+       with --resume, keep the build left by a failed run (see checkpoint.py)
+    6. Extract each table from Sierra and load into SQLite (with per-table timing);
+       with PG_MAX_CONNECTIONS > 1, tables are extracted concurrently and a
+       single writer loads them; incremental builds fetch only the records
+       changed since the previous run for the delta tables, then merge them;
+       circulation tables reuse the previous build's rows (circ_cache.py),
+       and lookup tables Sierra reports unchanged are copied (lookup_cache.py);
+       a dropped Sierra connection is re-established and the table resumed
     7. Create views (sql/views/)
     8. Create indexes (sql/indexes/)
     9. Finalize (ANALYZE, re-apply safe PRAGMAs)
@@ -21,15 +31,33 @@ What it does:
 """
 
 import argparse
+import bisect
+import contextlib
 import itertools
 import logging
+import queue
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import psycopg
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
 
+from . import (
+    checkpoint,
+    circ_cache,
+    extract,
+    incremental,
+    load,
+    lookup_cache,
+    telemetry,
+    throttle,
+    transform,
+)
 from . import config as cfg_module
-from . import extract, load, telemetry, transform
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,6 +67,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Tables in extraction order, with the extract function that produces each.
+_TABLES = [
+    ("record_metadata", extract.extract_record_metadata),
+    ("bib", extract.extract_bib),
+    ("item", extract.extract_item),
+    ("bib_record", extract.extract_bib_record),
+    ("volume_record", extract.extract_volume_record),
+    ("item_message", extract.extract_item_message),
+    ("language_property", extract.extract_language_property),
+    ("bib_record_item_record_link", extract.extract_bib_record_item_record_link),
+    ("volume_record_item_record_link", extract.extract_volume_record_item_record_link),
+    ("location", extract.extract_location),
+    ("location_name", extract.extract_location_name),
+    ("branch_name", extract.extract_branch_name),
+    ("branch", extract.extract_branch),
+    ("country_property_myuser", extract.extract_country_property_myuser),
+    ("item_status_property", extract.extract_item_status_property),
+    ("itype_property", extract.extract_itype_property),
+    ("bib_level_property", extract.extract_bib_level_property),
+    ("material_property", extract.extract_material_property),
+    ("hold", extract.extract_hold),
+    ("circ_agg", extract.extract_circ_agg),
+    ("circ_leased_items", extract.extract_circ_leased_items),
+]
+
+
 def _configure_logging(cfg: dict) -> None:
     """Set log level and optionally attach a file handler from config."""
     level = getattr(logging, cfg.get("log_level", "INFO").upper(), logging.INFO)
@@ -56,16 +110,653 @@ def _configure_logging(cfg: dict) -> None:
         logger.info(f"Logging to file: {log_file}")
 
 
-def _timed_load(db, name: str, rows) -> tuple[int, float]:
+def _extract_options(cfg: dict, name: str) -> dict:
+    """Return the keyword arguments to pass to the extractor for table *name*.
+
+    Every table is extracted with the tuple row protocol (``tuples=True``):
+    the extractor yields its column names, then plain row tuples.
+    """
+    options = {"tuples": True}
+    if name in extract.KEYSET_KEYS:
+        options["keyset"] = name in cfg.get("pg_keyset_tables", ())
+        if name in cfg.get("page_sizers", {}):
+            options["page_size"] = cfg["page_sizers"][name]
+    if name in extract.STREAMED and name in cfg.get("pg_copy_tables", ()):
+        options["copy_format"] = cfg.get("pg_copy_format", "binary")
+    since = cfg.get("incremental_since")
+    if since and name in extract.DELTA_TABLES:
+        options["target_date"] = since
+    if name == "circ_leased_items" and cfg.get("circ_leased_items_after") is not None:
+        options["id_range"] = (cfg["circ_leased_items_after"], None)
+    if name == "bib" and cfg.get("pg_bib_strategy", "query") != "query":
+        options["strategy"] = cfg["pg_bib_strategy"]
+    if name == "item_message" and cfg.get("pg_item_message_mode", "query") != "query":
+        options["mode"] = cfg["pg_item_message_mode"]
+        if cfg.get("sierra_today"):
+            options["today"] = cfg["sierra_today"]
+    if name in extract.STREAMED and cfg.get("throttle"):
+        options["throttle"] = cfg["throttle"]
+    if name in extract.JSON_COLUMNS and cfg.get("json_check_every"):
+        options["json_check_every"] = cfg["json_check_every"]
+    if name == "circ_agg":
+        options["since"] = cfg.get("circ_agg_since")
+        options["retention_months"] = cfg.get("circ_agg_retention_months", 6)
+    return options
+
+
+def _with_ids(db, cfg: dict, name: str, options: dict) -> dict:
+    """Add the record ids to fetch to *options* when *name* is in PG_ID_DRIVEN_TABLES.
+
+    The ids are those of the record_metadata rows already in the build
+    database, within the task's id_range.  An incremental build passes only
+    records updated since the day before its target_date (Julian days are
+    in Sierra's time zone); the query's own filter is the exact one.
+    """
+    if name not in cfg.get("pg_id_driven_tables", ()):
+        return options
+    after, upto = options.get("id_range") or (0, None)
+    since = options.get("target_date")
+    updated_since = None
+    if since:
+        updated_since = datetime.fromisoformat(since).toordinal() + extract.JULIAN_OFFSET - 1
+    ids = load.record_ids(db, extract.ID_DRIVEN[name], after, upto, updated_since)
+    logger.info(f"  {name}: fetching {len(ids):,} records by id from record_metadata")
+    return {**options, "ids": ids}
+
+
+def _timed_load(db, name: str, rows, columns=None) -> tuple[int, float]:
     """Load rows into *name* and return (row_count, elapsed_seconds)."""
     t0 = time.perf_counter()
-    n = load.load_table(db, name, rows)
+    n = load.load_table(db, name, rows, columns=columns)
     elapsed = time.perf_counter() - t0
     rate = n / elapsed if elapsed > 0 else 0.0
     logger.info(f"    -> {elapsed:.1f}s  ({rate:,.0f} rows/sec)")
     return n, elapsed
 
 
+def _table_stat(name: str, n: int, elapsed: float) -> dict:
+    """Return the stats entry for one extracted table."""
+    return {
+        "stage": name,
+        "rows": n,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_sec": round(n / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def _capped(rows, extract_limit: int):
+    """Apply EXTRACT_LIMIT (0 = no limit) to a row iterator."""
+    return itertools.islice(rows, extract_limit) if extract_limit > 0 else rows
+
+
+# Seconds before the first reconnect to Sierra; doubled for each further
+# consecutive attempt, up to _RECONNECT_MAX_DELAY.
+_RECONNECT_DELAY = 5.0
+_RECONNECT_MAX_DELAY = 120.0
+
+
+class _Sierra:
+    """One extraction thread's Sierra connection, replaceable after it drops.
+
+    Used as a context manager; every connection opened is closed on exit.
+    With *snapshot*, each connection imports that exported snapshot (see
+    extract.begin_snapshot), so a replacement reads the same point in time
+    as long as the exporting transaction is still open.  A connection that
+    exported its own snapshot (export_snapshot) cannot be replaced.
+    """
+
+    def __init__(self, engine, snapshot: str | None = None):
+        self.engine = engine
+        self.snapshot = snapshot
+        self.exported = False
+        self.conn = None
+
+    def __enter__(self):
+        self._stack = contextlib.ExitStack()
+        self.conn = self._open()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+    def _open(self):
+        conn = self._stack.enter_context(self.engine.connect())
+        if self.snapshot:
+            extract.begin_snapshot(conn, self.snapshot)
+        return conn
+
+    def export_snapshot(self) -> str:
+        """Start the snapshot transaction on this connection and return its id."""
+        self.exported = True
+        return extract.begin_snapshot(self.conn)
+
+    def lost(self, exc: Exception) -> bool:
+        """Return whether *exc* means the connection to Sierra is gone."""
+        if self.conn is None:  # failed to reconnect
+            return isinstance(exc, DBAPIError)
+        if isinstance(exc, DBAPIError):
+            return exc.connection_invalidated
+        # The extractors' raw psycopg cursors raise unwrapped errors.
+        return isinstance(exc, psycopg.OperationalError) and bool(
+            self.conn.connection.driver_connection.closed
+        )
+
+    def reconnect(self) -> None:
+        """Discard the dropped connection and open a new one."""
+        old, self.conn = self.conn, None
+        if old is not None:
+            old.invalidate()  # do not hand the dead connection back to the pool
+        self.conn = self._open()
+
+
+def _resumed(options: dict, last) -> dict:
+    """Return *options* restarting at cursor key *last* (and its id, if ids).
+
+    Cursor keys are integer ids, so ``> last - 1`` is ``>= last``.
+    """
+    _, upto = options.get("id_range") or (0, None)
+    resumed = {**options, "id_range": (last - 1, upto)}
+    ids = options.get("ids")
+    if ids is not None:
+        resumed["ids"] = ids[bisect.bisect_left(ids, last) :]
+    return resumed
+
+
+def _resilient(
+    sierra: _Sierra,
+    name: str,
+    extractor,
+    itersize: int,
+    options: dict,
+    attempts: int,
+    events: Counter,
+):
+    """Yield the column names, then the rows of one extraction task.
+
+    If the Sierra connection drops, the task starts over on a new one after
+    a backoff (_RECONNECT_DELAY seconds, doubling), up to *attempts* times in
+    a row.  A table with a cursor key (KEYSET_KEYS) restarts at the last key
+    it yielded — its rows arrive in key order, as for --resume — and skips
+    the rows of that key it already yielded, since a key can span several
+    rows.  Any other table is only retried if it had yielded no rows yet.
+    Each reconnect is counted as ``reconnects`` in *events*, which streamed
+    tables also pass to the extractor for ``page_splits``.
+    """
+    key = extract.KEYSET_KEYS.get(name)
+    if name in extract.STREAMED:
+        options = {**options, "events": events}
+    columns = key_index = last = None
+    held: list = []  # rows of key *last* yielded so far
+    yielded = False
+    failures = 0
+    while True:
+        progressed = False
+        replay = list(held)  # rows of *last* the restarted query sends again
+        try:
+            if failures:
+                sierra.reconnect()
+            task = options if last is None else _resumed(options, last)
+            gen = extractor(sierra.conn, itersize, **task)
+            try:
+                cols = next(gen)
+                if columns is None:
+                    columns = cols
+                    key_index = cols.index(key) if key in cols else None
+                    yield cols
+                for row in gen:
+                    if key_index is not None:
+                        if row[key_index] != last:
+                            last, held, replay = row[key_index], [], []
+                        elif row in replay:
+                            replay.remove(row)
+                            continue
+                        held.append(row)
+                    progressed = yielded = True
+                    yield row
+            finally:
+                gen.close()
+            return
+        except Exception as exc:
+            if progressed:
+                failures = 0
+            if key_index is None and yielded:
+                raise
+            where = f"at id {last}" if last is not None else "from the start"
+            failures = _backoff(sierra, name, exc, failures, attempts, events, where)
+
+
+def _backoff(
+    sierra: _Sierra,
+    name: str,
+    exc: Exception,
+    failures: int,
+    attempts: int,
+    events: Counter,
+    where: str,
+) -> int:
+    """Wait before reconnecting after *exc*, or re-raise it if that cannot help.
+
+    *exc* is re-raised unless it is a lost connection that may be replaced
+    and fewer than *attempts* reconnects have failed in a row.  Returns the
+    new count of consecutive failures.
+    """
+    if failures >= attempts or sierra.exported or not sierra.lost(exc):
+        raise exc
+    failures += 1
+    events["reconnects"] += 1
+    delay = min(_RECONNECT_MAX_DELAY, _RECONNECT_DELAY * 2 ** (failures - 1))
+    logger.warning(
+        f"  {name}: Sierra connection lost ({exc}); reconnecting in {delay:.0f}s "
+        f"and resuming {where} (attempt {failures} of {attempts})"
+    )
+    time.sleep(delay)
+    return failures
+
+
+def _fetch_lookups(sierra: _Sierra, names: list[str], attempts: int, events: Counter) -> dict:
+    """Return extract.extract_lookups() of *names*, reconnecting as _resilient does."""
+    failures = 0
+    while True:
+        try:
+            if failures:
+                sierra.reconnect()
+            return extract.extract_lookups(sierra.conn, names)
+        except Exception as exc:
+            failures = _backoff(
+                sierra, "lookup tables", exc, failures, attempts, events, "from the start"
+            )
+
+
+def _load_lookups(sierra: _Sierra, db, cfg: dict, names: list[str]) -> dict:
+    """Fetch the lookup tables *names* in one round trip and load them in one transaction.
+
+    Each table is marked done as usual; returns the single ``lookup_tables``
+    stats entry covering all of them.
+    """
+    t0 = time.perf_counter()
+    events: Counter = Counter()
+    results = _fetch_lookups(sierra, names, cfg.get("pg_reconnect_attempts", 0), events)
+    counts = {
+        name: load.append_rows(
+            db, name, _capped(rows, cfg.get("extract_limit", 0)), columns=columns, commit=False
+        )
+        for name, (columns, rows) in results.items()
+    }
+    db.commit()
+    for name, n in counts.items():
+        if n:
+            logger.info(f"Loaded {n:,} rows into '{name}'")
+        else:
+            logger.warning(f"No rows loaded into '{name}'")
+        checkpoint.mark_done(db, name, n)
+    elapsed = time.perf_counter() - t0
+    logger.info(f"    -> {len(counts)} lookup tables in {elapsed:.1f}s")
+    return {**_table_stat("lookup_tables", sum(counts.values()), elapsed), **events}
+
+
+def _reuse_lookups(engine, db, cfg: dict) -> dict | None:
+    """Copy the lookup tables Sierra reports unchanged from the live database.
+
+    The reused tables are marked done and added to ``cfg["completed"]`` so
+    neither extraction mode fetches them (see lookup_cache.py).  Returns the
+    ``lookup_cache`` stats entry, or None when every lookup table is already
+    loaded.
+    """
+    names = [n for n in extract.LOOKUPS if n not in cfg.get("completed", ())]
+    if not names:
+        return None
+    t0 = time.perf_counter()
+    with engine.connect() as pg:
+        fingerprints = extract.lookup_fingerprints(pg, names)
+    reused = lookup_cache.reuse(db, cfg["output_dir"], fingerprints)
+    for name, n in reused.items():
+        checkpoint.mark_done(db, name, n)
+    cfg["completed"] = set(cfg.get("completed", ())) | set(reused)
+    return _table_stat("lookup_cache", sum(reused.values()), time.perf_counter() - t0)
+
+
+def _extract_serial(engine, db, cfg: dict, stats: list[dict]) -> None:
+    """Extract every table in order over a single Sierra connection.
+
+    With PG_PREFETCH_PAGES > 0, each table's pages are fetched by a
+    background thread (see _prefetched) while this thread inserts them.
+    The LOOKUPS tables are fetched and loaded together when the first of
+    them comes up (see _load_lookups).
+    With PG_SNAPSHOT, the whole extraction is one REPEATABLE READ transaction;
+    otherwise a dropped connection is replaced (see _resilient).
+    """
+    itersize = cfg["pg_itersize"]
+    prefetch = cfg.get("pg_prefetch_pages", 0)
+    sleep_between = cfg.get("pg_sleep_between_tables", 0.0)
+    extract_limit = cfg.get("extract_limit", 0)
+    attempts = cfg.get("pg_reconnect_attempts", 0)
+
+    if cfg.get("pg_partitions"):
+        logger.info("PG_PARTITIONS only applies when PG_MAX_CONNECTIONS > 1; ignoring")
+
+    with _Sierra(engine) as sierra:
+        if cfg.get("pg_snapshot"):
+            snapshot = sierra.export_snapshot()
+            logger.info(f"Extracting from Sierra snapshot {snapshot}")
+        logger.info("Extracting tables from Sierra ...")
+
+        lookups = [n for n in extract.LOOKUPS if n not in cfg.get("completed", ())]
+        for name, extractor in _TABLES:
+            if name in cfg.get("completed", ()):
+                logger.info(f"  {name}: already loaded — skipping")
+                continue
+            if name in extract.LOOKUPS:
+                if name != lookups[0]:
+                    continue  # loaded with the first lookup table
+                stats.append(_load_lookups(sierra, db, cfg, lookups))
+            else:
+                options = checkpoint.resume_options(db, name, _extract_options(cfg, name))
+                options = _with_ids(db, cfg, name, options)
+                events: Counter = Counter()
+                gen = _resilient(sierra, name, extractor, itersize, options, attempts, events)
+                columns = next(gen)
+                if prefetch > 0:
+                    metrics: dict = {}
+                    rows = _prefetched(gen, extract_limit, itersize, prefetch, metrics)
+                    n, elapsed = _timed_load(db, name, rows, columns)
+                    stats.append({**_table_stat(name, n, elapsed), **metrics, **events})
+                else:
+                    n, elapsed = _timed_load(db, name, _capped(gen, extract_limit), columns)
+                    stats.append({**_table_stat(name, n, elapsed), **events})
+                checkpoint.mark_done(db, name, n)
+            if sleep_between > 0:
+                logger.debug("  sleeping %.1fs (PG_SLEEP_BETWEEN_TABLES) ...", sleep_between)
+                time.sleep(sleep_between)
+
+
+# Marker a worker queues after the last chunk of its table.
+_DONE = object()
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> None:
+    """Put *item* on a bounded queue, giving up once *stop* is set."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+
+def _prefetched(gen, extract_limit: int, chunk_size: int, depth: int, metrics: dict):
+    """Yield the rows of *gen*, fetched up to *depth* chunks ahead on a thread.
+
+    A background thread pulls *chunk_size* rows at a time from *gen* (capped
+    at EXTRACT_LIMIT) into a queue of *depth* chunks, so Sierra's network
+    round trips overlap SQLite's inserts.  On exit *metrics* holds:
+
+        wait_for_fetch_seconds  time the loader sat idle on an empty queue
+                                (Sierra is the bottleneck)
+        wait_for_load_seconds   time the fetcher sat blocked on a full queue
+                                (SQLite is the bottleneck)
+        avg_queue_depth         chunks queued, on average, when the loader
+                                asked for the next one
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    waits = {"fetch": 0.0, "load": 0.0}
+
+    def producer():
+        try:
+            rows = _capped(gen, extract_limit)
+            while not stop.is_set():
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                t0 = time.perf_counter()
+                _put(chunks, chunk, stop)
+                waits["load"] += time.perf_counter() - t0
+            _put(chunks, _DONE, stop)
+        except BaseException as exc:
+            _put(chunks, exc, stop)
+
+    thread = threading.Thread(target=producer, name="prefetch", daemon=True)
+    thread.start()
+    depths = []
+    try:
+        while True:
+            depths.append(chunks.qsize())
+            t0 = time.perf_counter()
+            item = chunks.get()
+            waits["fetch"] += time.perf_counter() - t0
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        stop.set()
+        thread.join()
+        gen.close()  # release the server-side cursor if the load stopped early
+        metrics["wait_for_fetch_seconds"] = round(waits["fetch"], 3)
+        metrics["wait_for_load_seconds"] = round(waits["load"], 3)
+        metrics["avg_queue_depth"] = round(sum(depths) / len(depths), 2) if depths else None
+
+
+def _extract_tasks(engine, db, cfg: dict) -> list[tuple[str, object, dict]]:
+    """Return the parallel work list: ``(table, extractor, options)`` per task.
+
+    Tables listed in PG_PARTITIONS are split into key ranges, one task per
+    range; every other table is a single task.  Completed tables are left
+    out and partial ones continue from their checkpoint (see checkpoint.py).
+    """
+    partitions = cfg.get("pg_partitions", {})
+    if partitions and cfg.get("extract_limit", 0) > 0:
+        logger.info("EXTRACT_LIMIT is set — ignoring PG_PARTITIONS")
+        partitions = {}
+
+    tasks = []
+    for name, extractor in _TABLES:
+        if name in cfg.get("completed", ()):
+            logger.info(f"  {name}: already loaded — skipping")
+            continue
+        options = _extract_options(cfg, name)
+        n = partitions.get(name, 1)
+        if n > 1 and name in extract.PARTITIONABLE:
+            ranges = checkpoint.saved_ranges(db, name)
+            if ranges is None:
+                with engine.connect() as pg:
+                    ranges = extract.key_ranges(pg, name, n)
+                checkpoint.save_ranges(db, name, ranges)
+            tasks.extend(
+                (name, extractor, checkpoint.resume_options(db, name, {**options, "id_range": r}))
+                for r in ranges
+            )
+        else:
+            if n > 1:
+                logger.warning(f"PG_PARTITIONS: '{name}' cannot be range-partitioned; ignoring")
+            tasks.append((name, extractor, checkpoint.resume_options(db, name, options)))
+    return tasks
+
+
+def _extract_parallel(engine, db, cfg: dict, stats: list[dict]) -> None:
+    """Extract tables concurrently over up to PG_MAX_CONNECTIONS connections.
+
+    Each worker thread owns one Sierra connection and pushes row chunks onto
+    a bounded queue.  The calling thread is the only SQLite writer: it drains
+    the queue and appends each chunk to its table, so SQLite never sees
+    concurrent writes and memory is bounded by the queue depth.  Key-range
+    partitions of one table (PG_PARTITIONS) are separate tasks whose chunks
+    are merged into the same SQLite table.
+
+    Tables in PG_ID_DRIVEN_TABLES are started once record_metadata has
+    been loaded, since their ids come from it (see _with_ids).  The LOOKUPS
+    tables are one task, fetched in a single round trip (extract_lookups).
+
+    With PG_SNAPSHOT, an extra connection exports a REPEATABLE READ snapshot
+    that every worker imports, so all tasks read the same point in time.
+    A worker whose connection drops reconnects (see _resilient), importing
+    the snapshot again.
+
+    Per table, the writer's idle time on an empty queue and the workers'
+    blocked time on a full queue are reported as for _prefetched().
+    """
+    max_connections = cfg["pg_max_connections"]
+    itersize = cfg["pg_itersize"]
+    sleep_between = cfg.get("pg_sleep_between_tables", 0.0)
+    extract_limit = cfg.get("extract_limit", 0)
+    attempts = cfg.get("pg_reconnect_attempts", 0)
+
+    chunks: queue.Queue = queue.Queue(maxsize=2 * max_connections)
+    stop = threading.Event()
+    started: dict[str, float] = {}
+    fetch_wait = dict.fromkeys((name for name, _ in _TABLES), 0.0)
+    load_wait = dict(fetch_wait)
+    depths: dict[str, list[int]] = {name: [] for name in fetch_wait}
+    wait_lock = threading.Lock()
+    # One Counter per task, summed once all of a table's tasks are done.
+    events: dict[str, list[Counter]] = {name: [] for name in fetch_wait}
+
+    def worker(name, extractor, options, task_events):
+        started.setdefault(name, time.perf_counter())
+        try:
+            with _Sierra(engine, snapshot) as sierra:
+                gen = _resilient(sierra, name, extractor, itersize, options, attempts, task_events)
+                columns = next(gen)
+                rows = _capped(gen, extract_limit)
+                while not stop.is_set():
+                    chunk = list(itertools.islice(rows, itersize))
+                    if not chunk:
+                        break
+                    t0 = time.perf_counter()
+                    _put(chunks, (name, (columns, chunk)), stop)
+                    with wait_lock:
+                        load_wait[name] += time.perf_counter() - t0
+                if sleep_between > 0 and not stop.is_set():
+                    time.sleep(sleep_between)
+            _put(chunks, (name, _DONE), stop)
+        except BaseException as exc:
+            _put(chunks, (name, exc), stop)
+
+    def lookup_worker(names, task_events):
+        for name in names:
+            started.setdefault(name, time.perf_counter())
+        try:
+            with _Sierra(engine, snapshot) as sierra:
+                results = _fetch_lookups(sierra, names, attempts, task_events)
+            for name, (columns, rows) in results.items():
+                rows = list(_capped(rows, extract_limit))
+                if rows:
+                    _put(chunks, (name, (columns, rows)), stop)
+                _put(chunks, (name, _DONE), stop)
+        except BaseException as exc:
+            _put(chunks, (names[0], exc), stop)
+
+    tasks = _extract_tasks(engine, db, cfg)
+    logger.info(
+        f"Extracting {len(_TABLES)} tables ({len(tasks)} tasks) from Sierra "
+        f"over up to {max_connections} connections ..."
+    )
+    counts = dict.fromkeys((name for name, _, _ in tasks), 0)
+    pending = dict.fromkeys(counts, 0)
+    for name, _, _ in tasks:
+        pending[name] += 1
+
+    # Id-driven tables read their ids from record_metadata, so while it is
+    # still being extracted their tasks wait for it to finish loading.
+    id_driven = set(cfg.get("pg_id_driven_tables", ())) if "record_metadata" in counts else set()
+    deferred = [task for task in tasks if task[0] in id_driven]
+
+    # The exporting transaction stays open, idle, until every worker is done.
+    exporter = engine.connect() if cfg.get("pg_snapshot") else None
+    snapshot = None
+
+    pool = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="extract")
+    try:
+        if exporter:
+            snapshot = extract.begin_snapshot(exporter)
+            logger.info(f"Workers share Sierra snapshot {snapshot}")
+        lookups = [name for name, _, _ in tasks if name in extract.LOOKUPS]
+        if lookups:
+            pool.submit(lookup_worker, lookups, _new_events(events, lookups[0]))
+        for name, extractor, options in tasks:
+            if name not in id_driven and name not in extract.LOOKUPS:
+                options = _with_ids(db, cfg, name, options)
+                pool.submit(worker, name, extractor, options, _new_events(events, name))
+
+        remaining = len(tasks)
+        while remaining:
+            queued = chunks.qsize()
+            t0 = time.perf_counter()
+            name, item = chunks.get()
+            fetch_wait[name] += time.perf_counter() - t0
+            depths[name].append(queued)
+            if item is _DONE:
+                remaining -= 1
+                pending[name] -= 1
+                if pending[name]:
+                    continue
+                n = counts[name]
+                elapsed = time.perf_counter() - started[name]
+                if n:
+                    logger.info(f"Loaded {n:,} rows into '{name}' ({elapsed:.1f}s)")
+                else:
+                    logger.warning(f"No rows loaded into '{name}'")
+                stats.append(
+                    {
+                        **_table_stat(name, n, elapsed),
+                        "wait_for_fetch_seconds": round(fetch_wait[name], 3),
+                        "wait_for_load_seconds": round(load_wait[name], 3),
+                        "avg_queue_depth": round(sum(depths[name]) / len(depths[name]), 2),
+                        **sum(events[name], Counter()),
+                    }
+                )
+                checkpoint.mark_done(db, name, n)
+                if name == "record_metadata":
+                    for task_name, extractor, options in deferred:
+                        options = _with_ids(db, cfg, task_name, options)
+                        pool.submit(
+                            worker, task_name, extractor, options, _new_events(events, task_name)
+                        )
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                columns, chunk = item
+                counts[name] += load.append_rows(db, name, chunk, columns=columns)
+    finally:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        if exporter:
+            exporter.close()
+
+
+def _new_events(events: dict[str, list[Counter]], name: str) -> Counter:
+    """Return a new event Counter for a task of table *name*, kept in *events*."""
+    counter: Counter = Counter()
+    events[name].append(counter)
+    return counter
+
+
+def _page_sizers(cfg: dict, learned: dict[str, int]) -> dict:
+    """Return an AdaptivePageSize per keyset table, starting from *learned* sizes."""
+    target = cfg.get("pg_page_target_seconds", 0)
+    if target <= 0:
+        return {}
+    return {
+        name: extract.AdaptivePageSize(learned.get(name, cfg["pg_itersize"]), target)
+        for name in cfg.get("pg_keyset_tables", ())
+        if name in extract.KEYSET_KEYS
+    }
+
+
+def _incremental_since(cfg: dict) -> str | None:
+    """Return the high-water mark to rebuild from, or None for a full rebuild."""
+    if cfg.get("extract_limit", 0) > 0:
+        logger.warning("EXTRACT_LIMIT is set — ignoring --incremental")
+        return None
+    since = incremental.previous_high_water_mark(cfg["output_dir"])
+    if since is None:
+        logger.warning("No previous build with a high-water mark — running a full rebuild")
+    else:
+        logger.info(f"Incremental build from high-water mark {since}")
+    return since
+
+
 def _write_run_stats(db, run_started: str, stats: list[dict]) -> None:
     """Write a snapshot of run stats into the build DB as _pipeline_run."""
     rows = ({"run_started": run_started, **s} for s in stats)
@@ -94,6 +785,19 @@ def main():
         default=None,
         help="(Deprecated) path to config.json; use .env or env vars instead",
     )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fetch only records changed since the previous run and merge them "
+        "into a copy of the live database (falls back to a full rebuild)",
+    )
+    mode.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the build left by a failed run, keeping the tables it "
+        "already extracted (starts fresh if there is none)",
+    )
     args = parser.parse_args()
 
     start = time.time()
@@ -110,9 +814,6 @@ def main():
     success = False
 
     try:
-        db = load.open_build_db(cfg["output_dir"])
-        itersize = cfg["pg_itersize"]
-        sleep_between = cfg.get("pg_sleep_between_tables", 0.0)
         extract_limit = cfg.get("extract_limit", 0)
         if extract_limit > 0:
             logger.warning(
@@ -121,67 +822,95 @@ def main():
                 extract_limit, extract_limit,
             )
 
-        engine = create_engine(cfg_module.pg_connection_string(cfg))
-        with engine.connect() as pg:
-            logger.info("Extracting tables from Sierra ...")
-
-            for name, gen in [
-                ("record_metadata", extract.extract_record_metadata(pg, itersize)),
-                ("bib", extract.extract_bib(pg, itersize)),
-                ("item", extract.extract_item(pg, itersize)),
-                ("bib_record", extract.extract_bib_record(pg, itersize)),
-                ("volume_record", extract.extract_volume_record(pg, itersize)),
-                ("item_message", extract.extract_item_message(pg, itersize)),
-                ("language_property", extract.extract_language_property(pg, itersize)),
-                (
-                    "bib_record_item_record_link",
-                    extract.extract_bib_record_item_record_link(pg, itersize),
-                ),
-                (
-                    "volume_record_item_record_link",
-                    extract.extract_volume_record_item_record_link(pg, itersize),
-                ),
-                ("location", extract.extract_location(pg, itersize)),
-                ("location_name", extract.extract_location_name(pg, itersize)),
-                ("branch_name", extract.extract_branch_name(pg, itersize)),
-                ("branch", extract.extract_branch(pg, itersize)),
-                (
-                    "country_property_myuser",
-                    extract.extract_country_property_myuser(pg, itersize),
-                ),
-                (
-                    "item_status_property",
-                    extract.extract_item_status_property(pg, itersize),
-                ),
-                ("itype_property", extract.extract_itype_property(pg, itersize)),
-                (
-                    "bib_level_property",
-                    extract.extract_bib_level_property(pg, itersize),
-                ),
-                (
-                    "material_property",
-                    extract.extract_material_property(pg, itersize),
-                ),
-                ("hold", extract.extract_hold(pg, itersize)),
-                ("circ_agg", extract.extract_circ_agg(pg, itersize)),
-                (
-                    "circ_leased_items",
-                    extract.extract_circ_leased_items(pg, itersize),
-                ),
-            ]:
-                capped = itertools.islice(gen, extract_limit) if extract_limit > 0 else gen
-                n, elapsed = _timed_load(db, name, capped)
-                stats.append(
-                    {
-                        "stage": name,
-                        "rows": n,
-                        "elapsed_seconds": round(elapsed, 3),
-                        "rows_per_sec": round(n / elapsed, 1) if elapsed > 0 else None,
-                    }
+        since = _incremental_since(cfg) if args.incremental else None
+        cfg["incremental_since"] = since
+        base = load.final_path(cfg["output_dir"]) if since else None
+        db = load.open_build_db(cfg["output_dir"], base=base, resume=args.resume)
+        marks = incremental.prepare(db, [name for name, _ in _TABLES]) if since else {}
+        high_water_mark = load.read_state(db, incremental.HIGH_WATER_MARK) if args.resume else None
+        mode = "incremental" if since else "full"
+        if high_water_mark is not None:
+            checkpoint.check_mode(db, mode)
+            cfg["completed"] = checkpoint.completed(db)
+            logger.info(f"Resuming: {len(cfg['completed'])} tables already extracted")
+            checkpoint.discard_partial(db, [name for name, _ in _TABLES], cfg["completed"])
+            load.drop_tables(db, ["_pipeline_run"])
+        load.write_state(db, checkpoint.BUILD_MODE, mode)
+
+        # Parallel snapshot builds hold one more connection: the exporter.
+        exporter = 1 if cfg.get("pg_snapshot") and cfg["pg_max_connections"] > 1 else 0
+        engine = create_engine(
+            cfg_module.pg_connection_string(cfg),
+            pool_size=cfg["pg_max_connections"] + exporter,
+            max_overflow=0,
+        )
+        if high_water_mark is None:
+            with engine.connect() as pg:
+                high_water_mark = incremental.sierra_now(pg)
+            # Recorded up front so that a resumed build keeps this run's mark.
+            load.write_state(db, incremental.HIGH_WATER_MARK, high_water_mark)
+        sierra_today = datetime.fromisoformat(high_water_mark).date()
+        cfg["sierra_today"] = sierra_today
+        completed = cfg.get("completed", set())
+        cfg["circ_leased_items_after"] = None
+        if extract_limit == 0 and "circ_agg" not in completed:
+            cfg["circ_agg_since"] = circ_cache.seed(
+                db, cfg["output_dir"], sierra_today, cfg["circ_agg_retention_months"]
+            )
+        if extract_limit == 0 and "circ_leased_items" not in completed:
+            cfg["circ_leased_items_after"] = circ_cache.seed_leased_items(
+                db, cfg["output_dir"], sierra_today
+            )
+        if extract_limit == 0:
+            stat = _reuse_lookups(engine, db, cfg)
+            if stat is not None:
+                stats.append(stat)
+        cfg["page_sizers"] = _page_sizers(cfg, telemetry.load_page_sizes(tel_db))
+        if cfg.get("pg_throttle_profiles"):
+            cfg["throttle"] = throttle.Throttle(
+                cfg["pg_throttle_profiles"], max_active=cfg.get("pg_throttle_max_active", 0)
+            )
+        try:
+            if cfg["pg_max_connections"] > 1:
+                _extract_parallel(engine, db, cfg, stats)
+            else:
+                _extract_serial(engine, db, cfg, stats)
+        finally:
+            learned = {name: sizer.size for name, sizer in cfg["page_sizers"].items()}
+            if learned:
+                logger.info(f"Keyset page sizes: {learned}")
+                telemetry.save_page_sizes(
+                    tel_db, learned, datetime.now().isoformat(timespec="seconds")
                 )
-                if sleep_between > 0:
-                    logger.debug("  sleeping %.1fs (PG_SLEEP_BETWEEN_TABLES) ...", sleep_between)
-                    time.sleep(sleep_between)
+
+        if since:
+            t0 = time.perf_counter()
+            logger.info(f"Merging changes since {since} ...")
+            removed = incremental.apply(db, marks)
+            stats.append(
+                {
+                    "stage": "incremental_merge",
+                    "rows": removed,
+                    "elapsed_seconds": round(time.perf_counter() - t0, 3),
+                    "rows_per_sec": None,
+                }
+            )
+        if extract_limit == 0:
+            load.write_state(db, circ_cache.CLOSED_THROUGH, circ_cache.closed_through(sierra_today))
+            watermark = circ_cache.leased_watermark(db, cfg["circ_leased_items_after"])
+            load.write_state(db, circ_cache.LEASED_WATERMARK, str(watermark))
+
+        t0 = time.perf_counter()
+        logger.info("Enriching tables ...")
+        transform.enrich(db)
+        stats.append(
+            {
+                "stage": "enrich",
+                "rows": None,
+                "elapsed_seconds": round(time.perf_counter() - t0, 3),
+                "rows_per_sec": None,
+            }
+        )
 
         t0 = time.perf_counter()
         logger.info("Creating views ...")
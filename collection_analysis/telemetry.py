@@ -6,7 +6,14 @@ run history across every pipeline execution and is never wiped or replaced.
 
 Tables:
     run    — one row per pipeline execution (success or failure)
-    stage  — one row per stage/table per run
+    stage  — one row per stage/table per run; extraction stages also record
+             how long the loader waited on Sierra (wait_for_fetch_seconds),
+             how long fetching waited on SQLite (wait_for_load_seconds), the
+             average number of pages queued between them, and how often a
+             page was split after a statement timeout (page_splits) or the
+             Sierra connection was re-established (reconnects)
+    page_size — keyset page size learned per table (AdaptivePageSize),
+                carried from one run to the next
 
 Views:
     v_stage_summary  — avg/min/max per stage across successful runs
@@ -34,8 +41,24 @@ CREATE TABLE IF NOT EXISTS stage (
     elapsed_seconds REAL    NOT NULL,
     rows_per_sec    REAL
 );
+
+CREATE TABLE IF NOT EXISTS page_size (
+    table_name  TEXT PRIMARY KEY,
+    page_size   INTEGER NOT NULL,
+    updated_at  TEXT    NOT NULL
+);
 """
 
+# Stage columns added after the original schema: (name, type).  Missing ones
+# are added to existing databases by open_telemetry_db().
+_STAGE_COLUMNS = [
+    ("wait_for_fetch_seconds", "REAL"),
+    ("wait_for_load_seconds", "REAL"),
+    ("avg_queue_depth", "REAL"),
+    ("page_splits", "INTEGER"),
+    ("reconnects", "INTEGER"),
+]
+
 _VIEWS = [
     """CREATE VIEW IF NOT EXISTS v_stage_summary AS
 SELECT
@@ -81,6 +104,10 @@ def open_telemetry_db(output_dir: str) -> sqlite3.Connection:
     path.parent.mkdir(parents=True, exist_ok=True)
     db = sqlite3.connect(path)
     db.executescript(_SCHEMA_SQL)
+    existing = {r[1] for r in db.execute("PRAGMA table_info(stage)")}
+    for name, sql_type in _STAGE_COLUMNS:
+        if name not in existing:
+            db.execute(f"ALTER TABLE stage ADD COLUMN {name} {sql_type}")
     for view_sql in _VIEWS:
         db.execute(view_sql)
     db.commit()
@@ -112,9 +139,11 @@ def finish_run(
            WHERE id = ?""",
         (completed_at, total_elapsed_seconds, int(success), run_id),
     )
+    extra = [name for name, _ in _STAGE_COLUMNS]
     db.executemany(
-        """INSERT INTO stage (run_id, stage, rows, elapsed_seconds, rows_per_sec)
-           VALUES (?, ?, ?, ?, ?)""",
+        f"""INSERT INTO stage (run_id, stage, rows, elapsed_seconds, rows_per_sec,
+                               {", ".join(extra)})
+            VALUES (?, ?, ?, ?, ?, {", ".join("?" for _ in extra)})""",
         [
             (
                 run_id,
@@ -122,8 +151,23 @@ def finish_run(
                 s.get("rows"),
                 s["elapsed_seconds"],
                 s.get("rows_per_sec"),
+                *(s.get(name) for name in extra),
             )
             for s in stats
         ],
     )
     db.commit()
+
+
+def load_page_sizes(db: sqlite3.Connection) -> dict[str, int]:
+    """Return the learned keyset page size of each table."""
+    return dict(db.execute("SELECT table_name, page_size FROM page_size"))
+
+
+def save_page_sizes(db: sqlite3.Connection, sizes: dict[str, int], updated_at: str) -> None:
+    """Insert or replace the learned page size of each table in *sizes*, then commit."""
+    db.executemany(
+        "INSERT OR REPLACE INTO page_size (table_name, page_size, updated_at) VALUES (?, ?, ?)",
+        [(name, size, updated_at) for name, size in sizes.items()],
+    )
+    db.commit()
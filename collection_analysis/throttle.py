@@ -0,0 +1,171 @@
+"""
+throttle.py — Pace page fetches to what Sierra can spare right now.
+
+Sierra is a shared production server: the nightly build can run flat out at
+3 a.m. but must stay out of the way during branch hours.  A Throttle is one
+token bucket of *pages per second* shared by every extraction connection:
+
+    - PG_THROTTLE_PROFILES sets the base rate by local time of day, e.g.
+      ``06:00-22:00=2,22:00-06:00=50``; outside every window there is no
+      limit
+    - every *sample_seconds* (default 30) the rate is halved, down to 1/16
+      of the base, while Sierra looks busy, and doubled back toward the base
+      once it recovers.  Busy means more than PG_THROTTLE_MAX_ACTIVE other
+      active backends in pg_stat_activity, or any table's recent page
+      latency above LATENCY_FACTOR times the fastest it has been this run
+
+The extractor calls wait() after each page; it blocks until the bucket has
+a token for the next one.
+
+Usage:
+    from collection_analysis import throttle
+    governor = throttle.Throttle(cfg["pg_throttle_profiles"], max_active=8)
+    # ... after each page fetched in *seconds* on *pg_conn*:
+    governor.wait(pg_conn, "bib", seconds)
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# A table's page latency (moving average) this many times its best so far
+# counts as Sierra being busy.
+LATENCY_FACTOR = 3.0
+
+# Lowest fraction of the profile rate the health backoff goes down to.
+MIN_FACTOR = 1 / 16
+
+# Weight of the newest page in a table's moving-average latency.
+_EWMA_WEIGHT = 0.2
+
+_ACTIVE_BACKENDS = (
+    "SELECT count(*) FROM pg_stat_activity WHERE state = 'active' AND pid <> pg_backend_pid()"
+)
+
+
+def profile_rate(profiles, minute: int) -> float | None:
+    """Return the pages/sec of the window containing *minute* past midnight, or None.
+
+    *profiles* is a list of ``(start_minute, end_minute, rate)``; a window
+    whose end is not after its start wraps past midnight.
+    """
+    for start, end, rate in profiles:
+        inside = start <= minute < end if start < end else minute >= start or minute < end
+        if inside:
+            return rate
+    return None
+
+
+class Throttle:
+    """Token bucket of pages/sec, shared across threads, with a health backoff."""
+
+    def __init__(
+        self,
+        profiles,
+        max_active: int = 0,
+        sample_seconds: float = 30.0,
+        clock=time.monotonic,
+        now=datetime.now,
+        sleep=time.sleep,
+    ):
+        self.profiles = profiles
+        self.max_active = max_active
+        self.sample_seconds = sample_seconds
+        self.factor = 1.0
+        self._clock = clock
+        self._now = now
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._refilled = clock()
+        self._sampled = clock()
+        self._latency: dict[str, float] = {}
+        self._best: dict[str, float] = {}
+        self._recent: set[str] = set()  # tables with pages since the last sample
+
+    def rate(self) -> float | None:
+        """Return the current pages/sec limit, or None when unlimited."""
+        now = self._now()
+        base = profile_rate(self.profiles, now.hour * 60 + now.minute)
+        return None if base is None else base * self.factor
+
+    def wait(self, pg_conn, name: str, seconds: float) -> None:
+        """Record that a page of *name* took *seconds*, then wait for the next token.
+
+        *pg_conn* is used to sample pg_stat_activity when a sample is due;
+        pass None while the connection is busy (e.g. mid-COPY).
+        """
+        with self._lock:
+            self._observe(name, seconds)
+            due = self._clock() - self._sampled >= self.sample_seconds
+            if due:
+                self._sampled = self._clock()
+        if due:
+            self._adjust(self._active_backends(pg_conn) if pg_conn is not None else None)
+        self._take()
+
+    def _observe(self, name: str, seconds: float) -> None:
+        previous = self._latency.get(name)
+        latency = seconds if previous is None else previous + _EWMA_WEIGHT * (seconds - previous)
+        self._latency[name] = latency
+        self._best[name] = min(latency, self._best.get(name, latency))
+        self._recent.add(name)
+
+    def _active_backends(self, pg_conn) -> int | None:
+        """Return how many other backends are running a query, or None on error.
+
+        The probe runs inside the extraction's open transaction, so it is
+        wrapped in a savepoint: a failure rolls back only the probe and the
+        next page is fetched as usual.
+        """
+        raw = pg_conn.connection.driver_connection
+        try:
+            with raw.transaction(), raw.cursor() as cur:
+                # Backend status is otherwise cached for the whole transaction.
+                cur.execute("SELECT pg_stat_clear_snapshot()")
+                cur.execute(_ACTIVE_BACKENDS)
+                return cur.fetchone()[0]
+        except Exception as exc:  # a failed probe must not fail the build
+            logger.debug("throttle: pg_stat_activity sample failed: %s", exc)
+            return None
+
+    def _adjust(self, active: int | None) -> None:
+        """Halve the rate while Sierra is busy; double it back once it is not."""
+        with self._lock:
+            slow = sorted(
+                name
+                for name in self._recent
+                if self._latency[name] > LATENCY_FACTOR * self._best[name]
+            )
+            self._recent.clear()
+            busy = bool(slow) or (
+                self.max_active > 0 and active is not None and active > self.max_active
+            )
+            factor = max(MIN_FACTOR, self.factor / 2) if busy else min(1.0, self.factor * 2)
+            if factor != self.factor:
+                logger.info(
+                    f"  throttle: {factor:.3g}x profile rate "
+                    f"(active backends {active}, slow pages {slow or 'none'})"
+                )
+            self.factor = factor
+
+    def _take(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                rate = self.rate()
+                now = self._clock()
+                if rate is None:
+                    self._tokens, self._refilled = 1.0, now
+                    return
+                capacity = max(1.0, rate)
+                self._tokens = min(capacity, self._tokens + (now - self._refilled) * rate)
+                self._refilled = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                delay = (1.0 - self._tokens) / rate
+            self._sleep(delay)
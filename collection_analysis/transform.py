@@ -2,8 +2,11 @@
 transform.py — Create views and indexes in the SQLite database.
 
 Reads SQL files from the sql/ directory and executes them in order:
-  1. sql/views/     — CREATE VIEW statements
-  2. sql/indexes/   — CREATE INDEX statements
+  1. sql/enrich/    — UPDATE statements filling in columns that the Sierra
+                      queries leave NULL (record numbers, itype names), from
+                      tables loaded in the same build
+  2. sql/views/     — CREATE VIEW statements
+  3. sql/indexes/   — CREATE INDEX statements
 
 Views and indexes are always created AFTER all base tables are loaded,
 which is significantly faster than maintaining indexes during inserts.
@@ -24,6 +27,18 @@ logger = logging.getLogger(__name__)
 SQL_DIR = Path(__file__).parent.parent / "sql"
 
 
+def enrich(db: sqlite3.Connection, sql_dir=None) -> None:
+    """Execute all .sql files in sql/enrich/ against the database.
+
+    Computes columns locally — with indexed joins against record_metadata,
+    the link tables and itype_property — that would otherwise cost a
+    correlated subquery per row on Sierra.  Must run after every table has
+    been loaded (and merged, for incremental builds) and before the views.
+    """
+    _execute_sql_dir(db, (Path(sql_dir) if sql_dir else SQL_DIR) / "enrich")
+    db.commit()
+
+
 def create_views(db: sqlite3.Connection, sql_dir=None) -> None:
     """Execute all .sql files in sql/views/ against the database."""
     _execute_sql_dir(db, (Path(sql_dir) if sql_dir else SQL_DIR) / "views")
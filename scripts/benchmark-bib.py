@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+benchmark-bib.py — Compare the bib extraction strategies on Sierra time.
+
+Runs the same pages of bibs through both PG_BIB_STRATEGY values:
+
+    query   sql/queries/bib.sql, one statement per page with per-bib
+            correlated subqueries
+    sets    sql/queries/bib_sets/base.sql per page, then one set-based
+            query per attribute for the page's ids
+
+For every page, each statement is run under EXPLAIN (ANALYZE) and its
+server-side "Execution Time" summed, so the figures are the work done on
+Sierra regardless of network latency.  Then both strategies are extracted
+for real and their rows compared value for value (the JSON columns must be
+byte-identical).
+
+Usage:
+    uv run python scripts/benchmark-bib.py
+    uv run python scripts/benchmark-bib.py --pages 20 --page-size 5000
+
+Reads Sierra credentials from .env / environment variables like the pipeline.
+"""
+
+import argparse
+import itertools
+import logging
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from collection_analysis import adapters, config, extract  # noqa: E402
+
+
+def _execution_ms(cur, query: str, params: dict) -> float:
+    """Return the server-side execution time of *query*, in milliseconds."""
+    cur.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}", params)
+    return cur.fetchone()[0][0]["Execution Time"]
+
+
+def _page_ids(cur, pages: int, page_size: int) -> list[list[int]]:
+    """Return the bib ids of the first *pages* pages, read with bib_sets/base.sql."""
+    query = extract._pyformat_sql("bib_sets/base")
+    params = extract._params(None, None, {"limit_val": page_size})
+    result = []
+    for _ in range(pages):
+        cur.execute(query, params)
+        ids = [row[1] for row in cur.fetchall()]
+        if not ids:
+            break
+        result.append(ids)
+        params["id_val"] = ids[-1]
+    return result
+
+
+def _server_time(cur, page_ids: list[list[int]]) -> dict[str, float]:
+    """Return the summed EXPLAIN ANALYZE execution time (ms) of each strategy."""
+    bib = extract._pyformat_sql("bib")
+    base = extract._pyformat_sql("bib_sets/base")
+    totals = {"query": 0.0, "sets": 0.0}
+    for ids in page_ids:
+        params = extract._params(None, None, {"id_val": ids[0] - 1, "limit_val": len(ids)})
+        totals["query"] += _execution_ms(cur, bib, params)
+        totals["sets"] += _execution_ms(cur, base, params)
+        for column in extract._BIB_SET_ATTRIBUTES:
+            query = extract._pyformat_sql(f"bib_sets/{column}")
+            totals["sets"] += _execution_ms(cur, query, {"ids": ids})
+    return totals
+
+
+def _extract(engine, strategy: str, rows: int, page_size: int) -> tuple[list[tuple], float]:
+    """Extract the first *rows* bibs with *strategy*; return (rows, seconds)."""
+    t0 = time.perf_counter()
+    with engine.connect() as pg:
+        gen = extract.extract_bib(pg, page_size, strategy=strategy, keyset=True, tuples=True)
+        next(gen)
+        result = list(itertools.islice(gen, rows))
+        gen.close()
+    return result, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bib extraction strategies")
+    parser.add_argument("--pages", type=int, default=10, help="pages of bibs to compare")
+    parser.add_argument("--page-size", type=int, default=5000, help="bibs per page")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    cfg = config.load()
+    engine = create_engine(config.pg_connection_string(cfg))
+
+    with engine.connect() as pg, pg.connection.driver_connection.cursor() as cur:
+        adapters.register(cur)
+        page_ids = _page_ids(cur, args.pages, args.page_size)
+        server = _server_time(cur, page_ids)
+    n = sum(len(ids) for ids in page_ids)
+
+    results = {}
+    print(f"{'strategy':<10} {'bibs':>10} {'sierra ms':>12} {'wall secs':>10} {'vs query':>10}")
+    for strategy in extract.BIB_STRATEGIES:
+        results[strategy], secs = _extract(engine, strategy, n, args.page_size)
+        ratio = f"{server[strategy] / server['query']:.2f}x" if server["query"] else "—"
+        print(f"{strategy:<10} {n:>10,} {server[strategy]:>12,.0f} {secs:>10.1f} {ratio:>10}")
+
+    mismatches = [
+        (a[1], column)
+        for a, b in zip(results["query"], results["sets"], strict=True)
+        for column, x, y in zip(extract.BIB_COLUMNS, a, b, strict=True)
+        if x != y
+    ]
+    if mismatches:
+        for bib_id, column in mismatches[:20]:
+            print(f"MISMATCH bib {bib_id}: {column}")
+        sys.exit(f"{len(mismatches)} values differ between strategies")
+    print(f"Rows identical across strategies ({n:,} bibs).")
+
+
+if __name__ == "__main__":
+    main()
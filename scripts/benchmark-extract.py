@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+benchmark-extract.py — Compare extraction backends on rows/sec.
+
+Extracts the same tables from Sierra once per backend and loads the rows
+into a throwaway in-memory SQLite database with load.load_table(), so the
+numbers include the per-row Python work that differs between backends.
+
+Backends:
+    cursor        one server-side cursor per table (the default)
+    keyset        keyset pagination, one query per page (PG_KEYSET_TABLES)
+    copy-text     COPY (...) TO STDOUT, text format   (PG_COPY_TABLES)
+    copy-binary   COPY (...) TO STDOUT, binary format (PG_COPY_TABLES)
+
+Each backend also runs with a ``-tuples`` suffix, which reads plain tuples
+from the raw psycopg cursor as the pipeline does, instead of dict rows.
+
+Usage:
+    uv run python scripts/benchmark-extract.py
+    uv run python scripts/benchmark-extract.py --tables item --limit 200000
+    uv run python scripts/benchmark-extract.py --backends cursor copy-binary
+
+Reads Sierra credentials from .env / environment variables like the pipeline.
+"""
+
+import argparse
+import itertools
+import logging
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from collection_analysis import config, extract, load  # noqa: E402
+
+BACKENDS = {
+    "cursor": {},
+    "keyset": {"keyset": True},
+    "copy-text": {"copy_format": "text"},
+    "copy-binary": {"copy_format": "binary"},
+}
+BACKENDS.update(
+    {f"{name}-tuples": {**opts, "tuples": True} for name, opts in list(BACKENDS.items())}
+)
+
+EXTRACTORS = {
+    "record_metadata": extract.extract_record_metadata,
+    "item": extract.extract_item,
+    "bib": extract.extract_bib,
+}
+
+
+def _run(engine, table: str, options: dict, itersize: int, limit: int) -> tuple[int, float]:
+    """Extract *table* with *options* into :memory: SQLite; return (rows, seconds)."""
+    db = sqlite3.connect(":memory:")
+    t0 = time.perf_counter()
+    with engine.connect() as pg:
+        rows = EXTRACTORS[table](pg, itersize, **options)
+        columns = next(rows) if options.get("tuples") else None
+        if limit > 0:
+            rows = itertools.islice(rows, limit)
+        n = load.load_table(db, table, rows, columns=columns)
+    elapsed = time.perf_counter() - t0
+    db.close()
+    return n, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Sierra extraction backends")
+    parser.add_argument(
+        "--tables", nargs="+", default=["record_metadata", "item"], choices=sorted(EXTRACTORS)
+    )
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument(
+        "--limit", type=int, default=100_000, help="rows per table; 0 = whole table"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    cfg = config.load()
+    engine = create_engine(config.pg_connection_string(cfg))
+
+    print(
+        f"{'table':<18} {'backend':<20} {'rows':>10} {'secs':>8} {'rows/sec':>12} {'vs cursor':>10}"
+    )
+    for table in args.tables:
+        baseline = None
+        for backend in args.backends:
+            n, secs = _run(engine, table, BACKENDS[backend], cfg["pg_itersize"], args.limit)
+            rate = n / secs if secs > 0 else 0.0
+            if backend == "cursor":
+                baseline = rate
+            speedup = f"{rate / baseline:.2f}x" if baseline else "—"
+            print(f"{table:<18} {backend:<20} {n:>10,} {secs:>8.1f} {rate:>12,.0f} {speedup:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+benchmark-prepare.py — Measure what prepared statements save on keyset pages.
+
+Runs the same keyset pages of each table twice, on a fresh connection each
+time:
+
+    unprepared  every page sent as a one-off statement (``prepare=False``),
+                so Sierra parses, analyses and plans the query per page
+    prepared    the query prepared on its first page (``prepare=True``), as
+                extract._fetch_page does
+
+and prints the wall time per page of each.  After the prepared run it reads
+pg_prepared_statements for the session to show how often Sierra reused a
+generic plan rather than planning each page again (the generic_plans and
+custom_plans columns need PostgreSQL 14; older servers print "n/a").  The
+rows of both runs are compared key for key.
+
+Usage:
+    uv run python scripts/benchmark-prepare.py
+    uv run python scripts/benchmark-prepare.py --tables bib item --pages 50 --page-size 2000
+
+Reads Sierra credentials from .env / environment variables like the pipeline.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+from psycopg.errors import UndefinedColumn
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from collection_analysis import adapters, config, extract  # noqa: E402
+
+_PLAN_COUNTS = (
+    "SELECT coalesce(sum(generic_plans), 0), coalesce(sum(custom_plans), 0) "
+    "FROM pg_prepared_statements"
+)
+
+
+def _plan_counts(raw) -> str:
+    """Return "generic/custom" plan counts of the session's prepared statements."""
+    try:
+        with raw.transaction(), raw.cursor() as cur:
+            cur.execute(_PLAN_COUNTS)
+            generic, custom = cur.fetchone()
+    except UndefinedColumn:  # PostgreSQL < 14
+        return "n/a"
+    return f"{generic}/{custom}"
+
+
+def _run(engine, table: str, pages: int, page_size: int, prepare: bool):
+    """Fetch up to *pages* keyset pages of *table*.
+
+    Returns (cursor keys read, pages read, seconds, plan counts).
+    """
+    params = extract._params(None, None, {"limit_val": page_size})
+    keys = []
+    fetched = 0
+    with engine.connect() as pg:
+        staged = extract.stage(pg, table)
+        query = extract._pyformat_sql(f"staged/{table}" if staged else table)
+        raw = pg.connection.driver_connection
+        with raw.cursor() as cur:
+            adapters.register(cur)
+            t0 = time.perf_counter()
+            for _ in range(pages):
+                cur.execute(query, params, prepare=prepare)
+                page = cur.fetchall()
+                if not page:
+                    break
+                fetched += 1
+                key_index = [d.name for d in cur.description].index(extract.KEYSET_KEYS[table])
+                keys.extend(row[key_index] for row in page)
+                params["id_val"] = keys[-1]
+            seconds = time.perf_counter() - t0
+        plans = _plan_counts(raw) if prepare else ""
+    return keys, fetched, seconds, plans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark prepared keyset page queries")
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        default=["record_metadata", "bib", "item", "hold"],
+        choices=sorted(extract.KEYSET_KEYS),
+    )
+    parser.add_argument("--pages", type=int, default=20, help="keyset pages per table")
+    parser.add_argument("--page-size", type=int, default=5000, help="rows per page")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    cfg = config.load()
+    # No pooling: each run starts on a session with no prepared statements.
+    engine = create_engine(config.pg_connection_string(cfg), poolclass=NullPool)
+
+    print(
+        f"{'table':<32} {'mode':<11} {'pages':>6} {'ms/page':>9} {'vs unprep':>10} "
+        f"{'generic/custom':>15}"
+    )
+    mismatched = []
+    for table in args.tables:
+        baseline_keys, baseline = None, None
+        for prepare in (False, True):
+            keys, n_pages, seconds, plans = _run(engine, table, args.pages, args.page_size, prepare)
+            per_page = seconds / max(n_pages, 1) * 1000
+            if baseline is None:
+                baseline_keys, baseline = keys, per_page
+            elif keys != baseline_keys:
+                mismatched.append(table)
+            ratio = f"{per_page / baseline:.2f}x" if baseline else "—"
+            mode = "prepared" if prepare else "unprepared"
+            print(f"{table:<32} {mode:<11} {n_pages:>6} {per_page:>9.1f} {ratio:>10} {plans:>15}")
+
+    if mismatched:
+        sys.exit(f"Rows differ between modes for: {', '.join(mismatched)}")
+    print("Rows identical with and without prepared statements.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+-- hold.bib_record_num for item and volume holds, resolved locally instead
+-- of with per-hold correlated subqueries on Sierra (bib holds already carry
+-- their own record_num).
+
+CREATE INDEX IF NOT EXISTS idx_bib_record_item_record_link_item_record_num ON bib_record_item_record_link (
+    item_record_num
+);
+
+UPDATE hold
+SET bib_record_num = (
+    SELECT l.bib_record_num
+    FROM bib_record_item_record_link AS l
+    WHERE l.item_record_num = hold.item_record_num
+    LIMIT 1
+)
+WHERE record_type_on_hold = 'i'
+    AND bib_record_num IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_volume_record_volume_record_num ON volume_record (volume_record_num);
+
+UPDATE hold
+SET bib_record_num = (
+    SELECT v.bib_record_num
+    FROM volume_record AS v
+    WHERE v.volume_record_num = hold.volume_record_num
+    LIMIT 1
+)
+WHERE record_type_on_hold = 'j'
+    AND bib_record_num IS NULL;
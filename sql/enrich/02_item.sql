@@ -0,0 +1,13 @@
+-- item.item_format: the itype name of item.itype_code_num.
+
+CREATE INDEX IF NOT EXISTS idx_itype_property_itype_code ON itype_property (itype_code);
+
+UPDATE item
+SET item_format = (
+    SELECT t.itype_name
+    FROM itype_property AS t
+    WHERE t.itype_code = item.itype_code_num
+    LIMIT 1
+)
+WHERE item_format IS NULL
+    AND itype_code_num IS NOT NULL;
@@ -0,0 +1,47 @@
+-- item_message rows extracted in raw mode (PG_ITEM_MESSAGE_MODE=raw) carry
+-- only the message, call number and checkout: copy the item, bib and status
+-- columns from the tables loaded in this build.  Rows from item_message.sql
+-- already have them.  Items not in the item table (campus_code <> '' or no
+-- bib link) keep NULLs.
+
+CREATE INDEX IF NOT EXISTS idx_item_item_record_id ON item (item_record_id);
+CREATE INDEX IF NOT EXISTS idx_bib_bib_record_num ON bib (bib_record_num);
+
+UPDATE item_message
+SET (
+    item_barcode,
+    item_status_code,
+    agency_code_num,
+    location_code,
+    itype_code_num,
+    item_format,
+    publish_year,
+    best_title,
+    best_author
+) = (
+    SELECT
+        i.barcode,
+        i.item_status_code,
+        i.agency_code_num,
+        i.location_code,
+        i.itype_code_num,
+        i.item_format,
+        b.publish_year,
+        b.best_title,
+        b.best_author
+    FROM item AS i
+    LEFT OUTER JOIN bib AS b ON b.bib_record_num = i.bib_record_num
+    WHERE i.item_record_id = item_message.item_record_id
+    LIMIT 1
+)
+WHERE item_status_code IS NULL;
+
+UPDATE item_message
+SET item_status_name = (
+    SELECT s.item_status_name
+    FROM item_status_property AS s
+    WHERE s.item_status_code = item_message.item_status_code
+    LIMIT 1
+)
+WHERE item_status_name IS NULL
+    AND item_status_code IS NOT NULL;
@@ -11,6 +11,7 @@ CREATE INDEX IF NOT EXISTS idx_item_item_status_code ON item (item_status_code);
 CREATE INDEX IF NOT EXISTS idx_item_location_code ON item (location_code);
 CREATE INDEX IF NOT EXISTS idx_item_bib_record_num ON item (bib_record_num);
 CREATE INDEX IF NOT EXISTS idx_item_item_record_num ON item (item_record_num);
+CREATE INDEX IF NOT EXISTS idx_item_item_record_id ON item (item_record_id);
 CREATE INDEX IF NOT EXISTS idx_item_barcode ON item (barcode);
 CREATE INDEX IF NOT EXISTS idx_item_item_format ON item (item_format);
 CREATE INDEX IF NOT EXISTS idx_item_creation_date ON item (creation_date);
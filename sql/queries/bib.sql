@@ -10,6 +10,8 @@ WITH r AS (
         AND rm.deletion_date_gmt IS NULL
         AND rm.record_last_updated_gmt >= :target_date :: timestamptz
         AND rm.id > :id_val
+        AND rm.id <= :max_id_val
+        AND (:ids :: bigint[] IS NULL OR rm.id = ANY(:ids :: bigint[]))
     ORDER BY rm.id ASC
     LIMIT :limit_val
 )
@@ -89,3 +91,4 @@ SELECT
 FROM r
 JOIN sierra_view.bib_record AS br ON br.record_id = r.id
 LEFT OUTER JOIN sierra_view.bib_record_property AS p ON p.bib_record_id = r.id
+ORDER BY r.id ASC
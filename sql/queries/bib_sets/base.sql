@@ -0,0 +1,30 @@
+-- Set-based bib strategy (extract.extract_bib(strategy="sets")): one page of
+-- bibs with their scalar columns.  The per-bib subqueries of bib.sql run as
+-- the sibling queries in this directory, once per page, for the page's ids.
+WITH r AS (
+    SELECT
+        rm.id,
+        rm.record_num AS bib_record_num
+    FROM sierra_view.record_metadata AS rm
+    WHERE
+        rm.record_type_code = 'b'
+        AND rm.campus_code = ''
+        AND rm.deletion_date_gmt IS NULL
+        AND rm.record_last_updated_gmt >= :target_date :: timestamptz
+        AND rm.id > :id_val
+        AND rm.id <= :max_id_val
+        AND (:ids :: bigint[] IS NULL OR rm.id = ANY(:ids :: bigint[]))
+    ORDER BY rm.id ASC
+    LIMIT :limit_val
+)
+SELECT
+    r.bib_record_num,
+    r.id AS bib_record_id,
+    p.best_author,
+    p.best_title,
+    p.publish_year,
+    br.cataloging_date_gmt :: date AS cataloging_date
+FROM r
+JOIN sierra_view.bib_record AS br ON br.record_id = r.id
+LEFT OUTER JOIN sierra_view.bib_record_property AS p ON p.bib_record_id = r.id
+ORDER BY r.id ASC
@@ -0,0 +1,8 @@
+SELECT DISTINCT ON (pc.record_id)
+    pc.record_id,
+    pc.index_entry
+FROM sierra_view.phrase_entry AS pc
+WHERE pc.record_id = ANY(:ids)
+    AND pc.index_tag = 'c'
+    AND pc.varfield_type_code = 'c'
+ORDER BY pc.record_id, pc.id
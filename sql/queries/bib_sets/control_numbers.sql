@@ -0,0 +1,8 @@
+SELECT
+    po.record_id,
+    po.index_entry
+FROM sierra_view.phrase_entry AS po
+WHERE po.record_id = ANY(:ids)
+    AND po.index_tag = 'o'
+    AND po.varfield_type_code = 'o'
+ORDER BY po.record_id, po.occurrence, po.id
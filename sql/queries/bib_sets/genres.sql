@@ -0,0 +1,11 @@
+-- bib.sql reaches the varfields through record_metadata by record_num; for a
+-- page of bib ids that is the same record, so join on record_id directly.
+SELECT
+    v.record_id,
+    s."content"
+FROM sierra_view.varfield AS v
+JOIN sierra_view.subfield AS s ON s.varfield_id = v.id
+WHERE v.record_id = ANY(:ids)
+    AND v.varfield_type_code = 'j'
+    AND s.tag = 'a'
+ORDER BY v.record_id, s.occ_num
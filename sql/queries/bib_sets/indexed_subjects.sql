@@ -0,0 +1,7 @@
+SELECT
+    p.record_id,
+    p.index_entry
+FROM sierra_view.phrase_entry AS p
+WHERE p.record_id = ANY(:ids)
+    AND p.index_tag = 'd'
+ORDER BY p.record_id, p.occurrence, p.id
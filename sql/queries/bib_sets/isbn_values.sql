@@ -0,0 +1,13 @@
+-- regexp_matches() without 'g' returns no row for a field without a match,
+-- so such fields are skipped exactly as in bib.sql.
+SELECT
+    v.record_id,
+    (regexp_matches(
+        v.field_content,
+        '[0-9]{9,10}[x]{0,1}|[0-9]{12,13}[x]{0,1}',
+        'i'
+    ))[1] AS isbn
+FROM sierra_view.varfield AS v
+WHERE v.record_id = ANY(:ids)
+    AND v.marc_tag || v.varfield_type_code = '020i'
+ORDER BY v.record_id, v.occ_num
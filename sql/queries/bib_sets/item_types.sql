@@ -0,0 +1,17 @@
+WITH attached_items AS (
+    SELECT
+        brirl.bib_record_id,
+        ir.itype_code_num,
+        count(*) AS count_items
+    FROM sierra_view.bib_record_item_record_link AS brirl
+    JOIN sierra_view.item_record AS ir ON ir.record_id = brirl.item_record_id
+    WHERE brirl.bib_record_id = ANY(:ids)
+    GROUP BY 1, 2
+)
+SELECT
+    attached_items.bib_record_id,
+    ipn."name"
+FROM attached_items
+JOIN sierra_view.itype_property AS ip ON ip.code_num = attached_items.itype_code_num
+JOIN sierra_view.itype_property_name AS ipn ON ipn.itype_property_id = ip.id
+ORDER BY attached_items.bib_record_id, attached_items.count_items DESC
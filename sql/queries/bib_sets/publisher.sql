@@ -0,0 +1,8 @@
+SELECT DISTINCT ON (s.record_id)
+    s.record_id,
+    s.content
+FROM sierra_view.subfield AS s
+WHERE s.record_id = ANY(:ids)
+    AND s.field_type_code = 'p'
+    AND s.tag = 'b'
+ORDER BY s.record_id, s.display_order
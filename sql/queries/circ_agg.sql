@@ -11,10 +11,11 @@ WITH circ_activity AS (
     (
         SELECT
             (to_char(date('now'), 'YYYY-mm') || '-01') :: timestamptz
-            - '6 months' :: INTERVAL AS start_date
+            - make_interval(months => :retention_months) AS start_date
     ) AS d
     WHERE
         c.transaction_gmt > d.start_date
+        AND c.transaction_gmt >= :since_date :: timestamptz
         AND c.op_code IN ('o', 'i', 'f')
     GROUP BY 1, 2, 3, 4, 5
 )
@@ -9,28 +9,16 @@ SELECT
     c.application_name,
     TO_CHAR(c.due_date_gmt, 'YYYY-mm-dd') AS due_date,
     c.item_record_id,
-    (
-        SELECT r.record_num
-        FROM sierra_view.record_metadata AS r
-        WHERE r.id = c.item_record_id
-    ) AS item_record_num,
+    irm.record_num AS item_record_num,
     (
         SELECT irp2.barcode
         FROM sierra_view.item_record_property AS irp2
         WHERE irp2.item_record_id = c.item_record_id
     ) AS barcode,
     c.bib_record_id,
-    (
-        SELECT r.record_num
-        FROM sierra_view.record_metadata AS r
-        WHERE r.id = c.bib_record_id
-    ) AS bib_record_num,
+    brm.record_num AS bib_record_num,
     c.volume_record_id,
-    (
-        SELECT r.record_num
-        FROM sierra_view.record_metadata AS r
-        WHERE r.id = c.volume_record_id
-    ) AS volume_record_num,
+    vrm.record_num AS volume_record_num,
     c.itype_code_num,
     c.item_location_code,
     c.ptype_code,
@@ -43,6 +31,11 @@ LEFT OUTER JOIN sierra_view.statistic_group_name AS sgn ON sgn.statistic_group_i
 LEFT OUTER JOIN sierra_view."location" AS loc ON loc.code = sg.location_code
 LEFT OUTER JOIN sierra_view.branch AS b ON b.code_num = loc.branch_code_num
 LEFT OUTER JOIN sierra_view.branch_name AS bn ON bn.branch_id = b.id
+-- Record numbers by primary key: the local record_metadata table holds only
+-- the filtered b/i/j records, so these are not resolved after loading.
+LEFT OUTER JOIN sierra_view.record_metadata AS irm ON irm.id = c.item_record_id
+LEFT OUTER JOIN sierra_view.record_metadata AS brm ON brm.id = c.bib_record_id
+LEFT OUTER JOIN sierra_view.record_metadata AS vrm ON vrm.id = c.volume_record_id
 WHERE c.item_record_id IN (
     SELECT irp.item_record_id
     FROM sierra_view.item_record_property AS irp
@@ -1,23 +1,8 @@
 SELECT
     h.id AS hold_id,
-    CASE
-        WHEN r.record_type_code = 'i' THEN (
-            SELECT br.record_num
-            FROM sierra_view.bib_record_item_record_link AS l
-            JOIN sierra_view.record_metadata AS br ON br.id = l.bib_record_id
-            WHERE l.item_record_id = h.record_id
-            LIMIT 1
-        )
-        WHEN r.record_type_code = 'j' THEN (
-            SELECT br.record_num
-            FROM sierra_view.bib_record_volume_record_link AS l
-            JOIN sierra_view.record_metadata AS br ON br.id = l.bib_record_id
-            WHERE l.volume_record_id = h.record_id
-            LIMIT 1
-        )
-        WHEN r.record_type_code = 'b' THEN r.record_num
-        ELSE NULL
-    END AS bib_record_num,
+    -- Item and volume holds get their bib_record_num after loading, from the
+    -- link tables (sql/enrich/01_hold.sql).
+    CASE WHEN r.record_type_code = 'b' THEN r.record_num ELSE NULL END AS bib_record_num,
     r.campus_code,
     r.record_type_code AS record_type_on_hold,
     CASE WHEN r.record_type_code = 'i' THEN r.record_num ELSE NULL END AS item_record_num,
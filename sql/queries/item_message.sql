@@ -69,3 +69,4 @@ LEFT OUTER JOIN sierra_view.bib_record_item_record_link AS brirl ON brirl.item_r
 LEFT OUTER JOIN sierra_view.bib_record_property AS brp ON brp.bib_record_id = brirl.bib_record_id
 LEFT OUTER JOIN sierra_view.itype_property AS ip ON ip.code_num = ir.itype_code_num
 LEFT OUTER JOIN sierra_view.itype_property_name AS ipn ON ipn.itype_property_id = ip.id
+ORDER BY item_messages.varfield_id ASC, item_messages.occ_num ASC
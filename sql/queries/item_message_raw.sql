@@ -0,0 +1,29 @@
+-- Raw-mode item_message (extract.extract_item_message(mode="raw")): the item
+-- message varfields, plus the call number and checkout columns, which have
+-- no local source, joined by primary key.  The in-transit regexes of
+-- item_message.sql run client-side (extract._parse_item_messages) and the
+-- item, bib and status columns are filled in locally
+-- (sql/enrich/04_item_message.sql).
+SELECT
+    v.id AS varfield_id,
+    v.record_id AS item_record_id,
+    r.campus_code,
+    v.occ_num,
+    v.field_content,
+    irp.call_number,
+    TO_CHAR(c.due_gmt, 'J') :: INTEGER AS due_julianday,
+    c.loanrule_code_num,
+    TO_CHAR(c.checkout_gmt, 'J') :: INTEGER AS checkout_julianday,
+    c.renewal_count,
+    c.overdue_count,
+    TO_CHAR(c.overdue_gmt, 'J') :: INTEGER AS overdue_julianday
+FROM sierra_view.varfield AS v
+JOIN sierra_view.record_metadata AS r ON r.id = v.record_id
+LEFT OUTER JOIN sierra_view.item_record_property AS irp ON irp.item_record_id = v.record_id
+LEFT OUTER JOIN sierra_view.checkout AS c ON c.item_record_id = v.record_id
+WHERE
+    v.varfield_type_code = 'm'
+    AND r.record_type_code = 'i'
+    AND v.id > :id_val
+ORDER BY v.id ASC, v.occ_num ASC
+LIMIT :limit_val
@@ -0,0 +1,7 @@
+SELECT
+    min(rm.id) AS lo,
+    max(rm.id) AS hi
+FROM sierra_view.record_metadata AS rm
+WHERE
+    rm.record_type_code = 'b'
+    AND rm.campus_code = ''
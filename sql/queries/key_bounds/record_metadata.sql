@@ -0,0 +1,9 @@
+SELECT
+    min(r.id) AS lo,
+    max(r.id) AS hi
+FROM sierra_view.record_metadata AS r
+WHERE
+    r.record_type_code IN ('b', 'i', 'j')
+    AND r.campus_code = ''
+GROUP BY r.record_type_code
+ORDER BY lo
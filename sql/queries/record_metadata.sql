@@ -8,6 +8,7 @@ WITH record_data AS (
         OR r.record_last_updated_gmt >= :target_date :: timestamptz
     )
     AND r.id > :id_val
+    AND r.id <= :max_id_val
     ORDER BY r.id ASC
     LIMIT :limit_val
 )
@@ -20,3 +21,4 @@ SELECT
     to_char(r.deletion_date_gmt, 'J') :: INTEGER AS deletion_julianday
 FROM record_data AS d
 JOIN sierra_view.record_metadata AS r ON r.id = d.id
+ORDER BY d.id ASC
@@ -0,0 +1,48 @@
+-- circ_leased_items.sql joined against the staged leased item set instead of
+-- evaluating it as a subquery; run by extract.stage() when TEMP tables can be
+-- created on Sierra.
+SELECT
+    c.id,
+    TO_CHAR(c.transaction_gmt, 'YYYY-mm-dd') AS transaction_day,
+    c.stat_group_code_num,
+    sgn."name" AS stat_group_name,
+    sg.location_code AS stat_group_location_code,
+    bn."name" AS stat_group_branch_name,
+    c.op_code,
+    c.application_name,
+    TO_CHAR(c.due_date_gmt, 'YYYY-mm-dd') AS due_date,
+    c.item_record_id,
+    irm.record_num AS item_record_num,
+    (
+        SELECT irp2.barcode
+        FROM sierra_view.item_record_property AS irp2
+        WHERE irp2.item_record_id = c.item_record_id
+    ) AS barcode,
+    c.bib_record_id,
+    brm.record_num AS bib_record_num,
+    c.volume_record_id,
+    vrm.record_num AS volume_record_num,
+    c.itype_code_num,
+    c.item_location_code,
+    c.ptype_code,
+    c.patron_home_library_code,
+    c.patron_agency_code_num,
+    c.loanrule_code_num
+FROM sierra_view.circ_trans AS c
+LEFT OUTER JOIN sierra_view.statistic_group AS sg ON sg.code_num = c.stat_group_code_num
+LEFT OUTER JOIN sierra_view.statistic_group_name AS sgn ON sgn.statistic_group_id = sg.id
+LEFT OUTER JOIN sierra_view."location" AS loc ON loc.code = sg.location_code
+LEFT OUTER JOIN sierra_view.branch AS b ON b.code_num = loc.branch_code_num
+LEFT OUTER JOIN sierra_view.branch_name AS bn ON bn.branch_id = b.id
+-- Record numbers by primary key: the local record_metadata table holds only
+-- the filtered b/i/j records, so these are not resolved after loading.
+LEFT OUTER JOIN sierra_view.record_metadata AS irm ON irm.id = c.item_record_id
+LEFT OUTER JOIN sierra_view.record_metadata AS brm ON brm.id = c.bib_record_id
+LEFT OUTER JOIN sierra_view.record_metadata AS vrm ON vrm.id = c.volume_record_id
+-- Leased item ids, staged just before this query (sql/staging/leased_item.sql).
+JOIN staged_leased_item AS li ON li.item_record_id = c.item_record_id
+WHERE c.transaction_gmt > date('NOW') - '180 days' :: INTERVAL
+AND c.op_code IN ('o', 'i')
+AND c.id > :id_val
+ORDER BY c.id ASC
+LIMIT :limit_val
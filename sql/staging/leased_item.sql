@@ -0,0 +1,15 @@
+-- Ids of leased items (barcodes L000000000000 to M), staged before each
+-- extraction of staged/circ_leased_items.sql (see extract.stage).
+DROP TABLE IF EXISTS staged_leased_item;
+
+CREATE TEMP TABLE staged_leased_item AS
+SELECT irp.item_record_id
+FROM sierra_view.item_record_property AS irp
+JOIN sierra_view.record_metadata AS rm ON rm.id = irp.item_record_id
+WHERE
+    rm.campus_code = ''
+    AND irp.barcode >= 'L000000000000'
+    AND irp.barcode < 'M';
+
+CREATE UNIQUE INDEX ON staged_leased_item (item_record_id);
+ANALYZE staged_leased_item;
@@ -0,0 +1,90 @@
+"""Unit tests for collection_analysis.adapters — no PostgreSQL needed."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import psycopg
+import pytest
+from psycopg.adapt import AdaptersMap, PyFormat, Transformer
+from psycopg.pq import Format
+
+from collection_analysis import adapters
+
+
+class _Context:
+    """Stand-in for a psycopg cursor: just an adapters map, no connection."""
+
+    def __init__(self):
+        self.adapters = AdaptersMap(psycopg.adapters)
+        self.connection = None
+
+
+@pytest.fixture
+def transformer():
+    context = _Context()
+    adapters.register(context)
+    return Transformer(context)
+
+
+def _load(transformer, type_name, data, fmt=Format.TEXT):
+    oid = psycopg.adapters.types[type_name].oid
+    return transformer.get_loader(oid, fmt).load(data)
+
+
+class TestIsoTimestamp:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (
+                "2024-06-15 12:30:00",
+                datetime(2024, 6, 15, 12, 30),
+            ),
+            (
+                "2024-06-15 12:30:00.12-05",
+                datetime(2024, 6, 15, 12, 30, 0, 120000, timezone(timedelta(hours=-5))),
+            ),
+            (
+                "2024-06-15 12:30:00+05:30",
+                datetime(2024, 6, 15, 12, 30, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+            ),
+        ],
+    )
+    def test_matches_datetime_isoformat(self, value, expected):
+        assert adapters._iso_timestamp(value) == expected.isoformat()
+
+    def test_special_values_unchanged(self):
+        assert adapters._iso_timestamp("infinity") == "infinity"
+
+
+class TestRegister:
+    def test_text_loaders(self, transformer):
+        assert _load(transformer, "date", b"2024-06-15") == "2024-06-15"
+        assert _load(transformer, "timestamptz", b"2024-06-15 12:30:00+00") == (
+            "2024-06-15T12:30:00+00:00"
+        )
+        assert _load(transformer, "numeric", b"12.50") == 12.5
+        assert _load(transformer, "json", b'[{"a":1}]') == '[{"a":1}]'
+        assert _load(transformer, "jsonb", b'{"a": 1}') == '{"a": 1}'
+
+    def test_binary_loaders(self, transformer):
+        numeric = transformer.get_dumper(Decimal("12.5"), PyFormat.BINARY).dump(Decimal("12.5"))
+        assert _load(transformer, "numeric", numeric, Format.BINARY) == 12.5
+        assert _load(transformer, "jsonb", b"\x01[1]", Format.BINARY) == "[1]"
+
+    def test_json_non_ascii_kept_as_utf8(self, transformer):
+        value = {"name": "Müller"}
+        data = json.dumps(value, ensure_ascii=False).encode()
+        loaded = _load(transformer, "jsonb", data)
+        assert loaded == '{"name": "Müller"}'
+        assert loaded != json.dumps(value)
+        assert json.loads(loaded) == json.loads(json.dumps(value))
+        assert _load(transformer, "jsonb", b"\x01" + data, Format.BINARY) == loaded
+
+    def test_other_types_untouched(self, transformer):
+        assert _load(transformer, "int4", b"7") == 7
+
+    def test_global_adapters_untouched(self, transformer):
+        oid = psycopg.adapters.types["date"].oid
+        loader = Transformer().get_loader(oid, Format.TEXT)
+        assert loader.load(b"2024-06-15") != "2024-06-15"
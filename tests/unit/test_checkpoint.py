@@ -0,0 +1,92 @@
+"""Unit tests for collection_analysis.checkpoint — SQLite only, no PostgreSQL."""
+
+import pytest
+
+from collection_analysis import checkpoint, load
+
+
+class TestCompleted:
+    def test_empty_build(self, empty_db):
+        assert checkpoint.completed(empty_db) == set()
+
+    def test_marked_tables(self, empty_db):
+        checkpoint.mark_done(empty_db, "bib", 10)
+        checkpoint.mark_done(empty_db, "location", 0)
+        load.write_state(empty_db, "high_water_mark", "x")
+        assert checkpoint.completed(empty_db) == {"bib", "location"}
+
+
+class TestClear:
+    def test_forgets_checkpoints_only(self, empty_db):
+        checkpoint.mark_done(empty_db, "bib", 10)
+        checkpoint.save_ranges(empty_db, "item", [(0, 10)])
+        load.write_state(empty_db, "high_water_mark", "x")
+        checkpoint.clear(empty_db)
+        assert checkpoint.completed(empty_db) == set()
+        assert checkpoint.saved_ranges(empty_db, "item") is None
+        assert load.read_state(empty_db, "high_water_mark") == "x"
+
+    def test_no_state_table(self, empty_db):
+        checkpoint.clear(empty_db)
+
+
+class TestCheckMode:
+    def test_same_or_unrecorded_mode_resumes(self, empty_db):
+        checkpoint.check_mode(empty_db, "full")
+        load.write_state(empty_db, checkpoint.BUILD_MODE, "full")
+        checkpoint.check_mode(empty_db, "full")
+
+    def test_other_mode_refused(self, empty_db):
+        load.write_state(empty_db, checkpoint.BUILD_MODE, "incremental")
+        with pytest.raises(ValueError, match="without --resume"):
+            checkpoint.check_mode(empty_db, "full")
+
+
+class TestDiscardPartial:
+    def test_drops_only_unfinished_non_keyset_tables(self, empty_db):
+        for name in ("location", "branch", "bib", "circ_agg"):
+            load.load_table(empty_db, name, iter([{"id": 1}]))
+        checkpoint.discard_partial(
+            empty_db, ["location", "branch", "bib", "circ_agg"], done={"branch"}
+        )
+        names = {r[0] for r in empty_db.execute("SELECT name FROM sqlite_master")}
+        assert names == {"branch", "bib"}
+
+
+class TestResumeOptions:
+    def test_restarts_at_last_committed_key(self, empty_db):
+        load.load_table(empty_db, "bib", iter([{"bib_record_id": 5}, {"bib_record_id": 9}]))
+        options = checkpoint.resume_options(empty_db, "bib", {"keyset": False})
+        assert options == {"keyset": False, "id_range": (8, None)}
+        assert [r[0] for r in empty_db.execute("SELECT bib_record_id FROM bib")] == [5]
+
+    def test_partial_key_group_is_reloaded(self, empty_db):
+        # Item 7 is linked to three bibs; only two of its rows were committed.
+        rows = [{"item_record_id": 3, "bib": 1}, *({"item_record_id": 7, "bib": b} for b in (1, 2))]
+        load.load_table(empty_db, "item", iter(rows))
+        options = checkpoint.resume_options(empty_db, "item", {})
+        assert options == {"id_range": (6, None)}
+        assert empty_db.execute("SELECT count(*) FROM item").fetchone()[0] == 1
+
+    def test_fresh_table_unchanged(self, empty_db):
+        assert checkpoint.resume_options(empty_db, "bib", {}) == {}
+
+    def test_each_range_resumes_independently(self, empty_db):
+        load.load_table(empty_db, "bib", iter({"bib_record_id": i} for i in (1, 2, 11, 12, 13)))
+        first = checkpoint.resume_options(empty_db, "bib", {"id_range": (0, 10)})
+        second = checkpoint.resume_options(empty_db, "bib", {"id_range": (10, 20)})
+        third = checkpoint.resume_options(empty_db, "bib", {"id_range": (20, 30)})
+        assert first["id_range"] == (1, 10)
+        assert second["id_range"] == (12, 20)
+        assert third["id_range"] == (20, 30)
+
+    def test_lookup_table_unchanged(self, empty_db):
+        load.load_table(empty_db, "location", iter([{"id": 1}]))
+        assert checkpoint.resume_options(empty_db, "location", {}) == {}
+
+
+class TestRanges:
+    def test_round_trip(self, empty_db):
+        assert checkpoint.saved_ranges(empty_db, "bib") is None
+        checkpoint.save_ranges(empty_db, "bib", [(0, 10), (10, 20)])
+        assert checkpoint.saved_ranges(empty_db, "bib") == [(0, 10), (10, 20)]
@@ -0,0 +1,79 @@
+"""Unit tests for collection_analysis.circ_cache — SQLite only, no PostgreSQL."""
+
+from datetime import date
+
+from collection_analysis import circ_cache, load
+
+
+def _live_db(output_dir, days, closed_through):
+    db = load.open_build_db(output_dir)
+    load.load_table(db, "circ_agg", iter({"transaction_day": d, "count_op_code": 1} for d in days))
+    load.write_state(db, circ_cache.CLOSED_THROUGH, closed_through)
+    db.close()
+    load.swap_db(output_dir)
+
+
+class TestWindowStart:
+    def test_six_months_before_start_of_month(self):
+        assert circ_cache.window_start(date(2026, 10, 17), 6) == date(2026, 4, 1)
+
+    def test_crosses_year_boundary(self):
+        assert circ_cache.window_start(date(2026, 2, 3), 6) == date(2025, 8, 1)
+
+
+class TestClosedThrough:
+    def test_is_previous_day(self):
+        assert circ_cache.closed_through(date(2026, 3, 1)) == "2026-02-28"
+
+
+class TestSeed:
+    def test_without_live_db_extracts_full_window(self, tmp_output_dir, empty_db):
+        assert circ_cache.seed(empty_db, tmp_output_dir, date(2026, 10, 17), 6) is None
+
+    def test_copies_closed_days_in_window(self, tmp_output_dir, empty_db):
+        _live_db(
+            tmp_output_dir,
+            ["2026-03-31", "2026-04-01", "2026-10-15", "2026-10-16"],
+            closed_through="2026-10-15",
+        )
+        since = circ_cache.seed(empty_db, tmp_output_dir, date(2026, 10, 17), 6)
+        assert since == "2026-10-16"
+        days = [r[0] for r in empty_db.execute("SELECT transaction_day FROM circ_agg ORDER BY 1")]
+        assert days == ["2026-04-01", "2026-10-15"]
+        attached = [r[1] for r in empty_db.execute("PRAGMA database_list")]
+        assert attached == ["main"]
+
+
+class TestSeedLeasedItems:
+    def _live(self, output_dir, rows, watermark):
+        db = load.open_build_db(output_dir)
+        load.load_table(db, "circ_leased_items", iter(rows))
+        load.write_state(db, circ_cache.LEASED_WATERMARK, watermark)
+        db.close()
+        load.swap_db(output_dir)
+
+    def test_without_watermark_extracts_full_window(self, tmp_output_dir, empty_db):
+        assert circ_cache.seed_leased_items(empty_db, tmp_output_dir, date(2026, 10, 17)) is None
+
+    def test_expires_old_rows_and_returns_watermark(self, tmp_output_dir, empty_db):
+        self._live(
+            tmp_output_dir,
+            [
+                {"id": 10, "transaction_day": "2026-04-01"},
+                {"id": 20, "transaction_day": "2026-10-16"},
+            ],
+            watermark="20",
+        )
+        after = circ_cache.seed_leased_items(empty_db, tmp_output_dir, date(2026, 10, 17))
+        assert after == 20
+        ids = [r[0] for r in empty_db.execute("SELECT id FROM circ_leased_items")]
+        assert ids == [20]
+
+
+class TestLeasedWatermark:
+    def test_highest_loaded_id(self, empty_db):
+        load.load_table(empty_db, "circ_leased_items", iter([{"id": 5}, {"id": 42}]))
+        assert circ_cache.leased_watermark(empty_db, 20) == 42
+
+    def test_keeps_previous_when_nothing_loaded(self, empty_db):
+        assert circ_cache.leased_watermark(empty_db, 20) == 20
@@ -212,6 +212,62 @@ class TestExtractLimit:
             config.load()
 
 
+class TestKeysetTables:
+    def test_default_is_empty(self, valid_config):
+        result = config.load()
+        assert result["pg_keyset_tables"] == []
+
+    def test_comma_separated(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_KEYSET_TABLES", "bib, item_message,")
+        result = config.load()
+        assert result["pg_keyset_tables"] == ["bib", "item_message"]
+
+    def test_unknown_table_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_KEYSET_TABLES", "bib, items")
+        with pytest.raises(ValueError, match=r"PG_KEYSET_TABLES .*\['items'\]"):
+            config.load()
+
+
+class TestMaxConnections:
+    def test_default_is_serial(self, valid_config):
+        result = config.load()
+        assert result["pg_max_connections"] == 1
+
+    def test_coerced_to_int(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_MAX_CONNECTIONS", "3")
+        result = config.load()
+        assert result["pg_max_connections"] == 3
+
+    def test_zero_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_MAX_CONNECTIONS", "0")
+        with pytest.raises(ValueError, match="PG_MAX_CONNECTIONS"):
+            config.load()
+
+    def test_invalid_value_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_MAX_CONNECTIONS", "many")
+        with pytest.raises(ValueError, match="PG_MAX_CONNECTIONS"):
+            config.load()
+
+
+class TestPartitions:
+    def test_default_is_empty(self, valid_config):
+        assert config.load()["pg_partitions"] == {}
+
+    def test_parsed_to_dict(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_PARTITIONS", "bib:4, item:2")
+        assert config.load()["pg_partitions"] == {"bib": 4, "item": 2}
+
+    def test_malformed_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_PARTITIONS", "bib=4")
+        with pytest.raises(ValueError, match="PG_PARTITIONS"):
+            config.load()
+
+    def test_zero_count_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_PARTITIONS", "bib:0")
+        with pytest.raises(ValueError, match="PG_PARTITIONS"):
+            config.load()
+
+
 class TestPgConnectionString:
     def test_pg_connection_string_format(self, valid_config):
         cfg = config.load()
@@ -235,3 +291,196 @@ class TestPgConnectionString:
         url = config.pg_connection_string(cfg)
         assert url.startswith("postgresql+psycopg://")
         assert "p%40ss" in url
+
+
+class TestCircAggRetention:
+    def test_default_is_six_months(self, valid_config):
+        assert config.load()["circ_agg_retention_months"] == 6
+
+    def test_coerced_to_int(self, valid_config, monkeypatch):
+        monkeypatch.setenv("CIRC_AGG_RETENTION_MONTHS", "24")
+        assert config.load()["circ_agg_retention_months"] == 24
+
+    def test_zero_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("CIRC_AGG_RETENTION_MONTHS", "0")
+        with pytest.raises(ValueError, match="CIRC_AGG_RETENTION_MONTHS"):
+            config.load()
+
+
+class TestBibStrategy:
+    def test_default_is_query(self, valid_config):
+        assert config.load()["pg_bib_strategy"] == "query"
+
+    def test_sets(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_BIB_STRATEGY", "SETS")
+        assert config.load()["pg_bib_strategy"] == "sets"
+
+    def test_unknown_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_BIB_STRATEGY", "join")
+        with pytest.raises(ValueError, match="PG_BIB_STRATEGY"):
+            config.load()
+
+    def test_sets_with_copy_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_BIB_STRATEGY", "sets")
+        monkeypatch.setenv("PG_COPY_TABLES", "bib")
+        with pytest.raises(ValueError, match="PG_COPY_TABLES"):
+            config.load()
+
+
+class TestItemMessageMode:
+    def test_default_is_query(self, valid_config):
+        assert config.load()["pg_item_message_mode"] == "query"
+
+    def test_raw(self, valid_config, monkeypatch, caplog):
+        monkeypatch.setenv("PG_ITEM_MESSAGE_MODE", "raw")
+        assert config.load()["pg_item_message_mode"] == "raw"
+        assert "not in the item table" in caplog.text
+
+    def test_query_does_not_warn(self, valid_config, caplog):
+        config.load()
+        assert "PG_ITEM_MESSAGE_MODE" not in caplog.text
+
+    def test_unknown_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_ITEM_MESSAGE_MODE", "regex")
+        with pytest.raises(ValueError, match="PG_ITEM_MESSAGE_MODE"):
+            config.load()
+
+
+class TestIdDrivenTables:
+    def test_default_is_none(self, valid_config):
+        assert config.load()["pg_id_driven_tables"] == []
+
+    def test_parsed_list(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_ID_DRIVEN_TABLES", "bib, item,volume_record")
+        assert config.load()["pg_id_driven_tables"] == ["bib", "item", "volume_record"]
+
+    def test_unsupported_table_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_ID_DRIVEN_TABLES", "bib,hold")
+        with pytest.raises(ValueError, match="PG_ID_DRIVEN_TABLES"):
+            config.load()
+
+    def test_copy_table_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_ID_DRIVEN_TABLES", "item")
+        monkeypatch.setenv("PG_COPY_TABLES", "item")
+        with pytest.raises(ValueError, match="PG_COPY_TABLES"):
+            config.load()
+
+
+class TestThrottle:
+    def test_default_is_off(self, valid_config):
+        cfg = config.load()
+        assert cfg["pg_throttle_profiles"] == []
+        assert cfg["pg_throttle_max_active"] == 0
+
+    def test_profiles_parsed_to_minutes(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_THROTTLE_PROFILES", "06:00-22:00=2, 22:00-06:00=50")
+        monkeypatch.setenv("PG_THROTTLE_MAX_ACTIVE", "8")
+        cfg = config.load()
+        assert cfg["pg_throttle_profiles"] == [(360, 1320, 2.0), (1320, 360, 50.0)]
+        assert cfg["pg_throttle_max_active"] == 8
+
+    def test_malformed_profile_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_THROTTLE_PROFILES", "06:00-25:00=2")
+        with pytest.raises(ValueError, match="PG_THROTTLE_PROFILES"):
+            config.load()
+
+    def test_non_positive_rate_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_THROTTLE_PROFILES", "06:00-22:00=0")
+        with pytest.raises(ValueError, match="positive"):
+            config.load()
+
+    def test_negative_max_active_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_THROTTLE_MAX_ACTIVE", "-1")
+        with pytest.raises(ValueError, match="PG_THROTTLE_MAX_ACTIVE"):
+            config.load()
+
+
+class TestSnapshot:
+    def test_default_is_off(self, valid_config):
+        assert config.load()["pg_snapshot"] is False
+
+    def test_true(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_SNAPSHOT", "True")
+        assert config.load()["pg_snapshot"] is True
+
+    def test_invalid_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_SNAPSHOT", "maybe")
+        with pytest.raises(ValueError, match="PG_SNAPSHOT"):
+            config.load()
+
+
+class TestReconnectAttempts:
+    def test_default(self, valid_config):
+        assert config.load()["pg_reconnect_attempts"] == 3
+
+    def test_zero_disables(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_RECONNECT_ATTEMPTS", "0")
+        assert config.load()["pg_reconnect_attempts"] == 0
+
+    @pytest.mark.parametrize("value", ["-1", "few"])
+    def test_invalid_raises(self, valid_config, monkeypatch, value):
+        monkeypatch.setenv("PG_RECONNECT_ATTEMPTS", value)
+        with pytest.raises(ValueError, match="PG_RECONNECT_ATTEMPTS"):
+            config.load()
+
+
+class TestJsonCheckEvery:
+    def test_default_is_off(self, valid_config):
+        assert config.load()["json_check_every"] == 0
+
+    def test_coerced_to_int(self, valid_config, monkeypatch):
+        monkeypatch.setenv("JSON_CHECK_EVERY", "500")
+        assert config.load()["json_check_every"] == 500
+
+    def test_negative_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("JSON_CHECK_EVERY", "-1")
+        with pytest.raises(ValueError, match="JSON_CHECK_EVERY"):
+            config.load()
+
+
+class TestCopyTables:
+    def test_defaults(self, valid_config):
+        result = config.load()
+        assert result["pg_copy_tables"] == []
+        assert result["pg_copy_format"] == "binary"
+
+    def test_parsed(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_COPY_TABLES", "record_metadata, item")
+        monkeypatch.setenv("PG_COPY_FORMAT", "TEXT")
+        result = config.load()
+        assert result["pg_copy_tables"] == ["record_metadata", "item"]
+        assert result["pg_copy_format"] == "text"
+
+    def test_unknown_table_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_COPY_TABLES", "item, location")
+        with pytest.raises(ValueError, match=r"PG_COPY_TABLES .*\['location'\]"):
+            config.load()
+
+    def test_invalid_format_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_COPY_FORMAT", "csv")
+        with pytest.raises(ValueError, match="PG_COPY_FORMAT"):
+            config.load()
+
+
+class TestPrefetchPages:
+    def test_default_is_two(self, valid_config):
+        assert config.load()["pg_prefetch_pages"] == 2
+
+    def test_zero_disables(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_PREFETCH_PAGES", "0")
+        assert config.load()["pg_prefetch_pages"] == 0
+
+    def test_negative_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_PREFETCH_PAGES", "-1")
+        with pytest.raises(ValueError, match="PG_PREFETCH_PAGES"):
+            config.load()
+
+
+class TestPageTargetSeconds:
+    def test_default(self, valid_config):
+        assert config.load()["pg_page_target_seconds"] == 5.0
+
+    def test_negative_raises(self, valid_config, monkeypatch):
+        monkeypatch.setenv("PG_PAGE_TARGET_SECONDS", "-2")
+        with pytest.raises(ValueError, match="PG_PAGE_TARGET_SECONDS"):
+            config.load()
@@ -1,10 +1,21 @@
 """Unit tests for collection_analysis.extract — uses mock PostgreSQL connections."""
 
+import contextlib
+import itertools
+from collections import Counter
+from datetime import date
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
+from psycopg.errors import (
+    InFailedSqlTransaction,
+    InsufficientPrivilege,
+    QueryCanceled,
+    ReadOnlySqlTransaction,
+)
 
-from collection_analysis import extract
+from collection_analysis import extract, throttle
 from collection_analysis.extract import _load_sql
 
 _ALL_QUERY_NAMES = [
@@ -50,6 +61,22 @@ class TestLoadSql:
         with pytest.raises(FileNotFoundError):
             _load_sql("nonexistent_query_xyz")
 
+    @pytest.mark.parametrize(
+        "name",
+        [
+            *sorted(extract.KEYSET_KEYS),
+            "item_message_raw",
+            "bib_sets/base",
+            "staged/circ_leased_items",
+        ],
+    )
+    def test_keyset_query_outer_select_ordered(self, name):
+        # Resuming at the last loaded key needs the rows in key order, so the
+        # outer SELECT (not only a CTE) must end with an ORDER BY.
+        lines = _load_sql(name).splitlines()
+        outer_from = max(i for i, line in enumerate(lines) if line.startswith("FROM "))
+        assert any(line.startswith("ORDER BY ") for line in lines[outer_from:])
+
 
 def _make_mock_conn(rows_per_call):
     """
@@ -58,6 +85,10 @@ def _make_mock_conn(rows_per_call):
 
     rows_per_call: list of lists-of-dicts, one per execute() call.
     The last call always returns [] to terminate the pagination loop.
+
+    The same batches are also served as partitions of a single streamed
+    result (``execution_options(yield_per=...).execute(...)``), so one mock
+    covers both the streaming default and ``keyset=True``.
     """
     conn = MagicMock()
     call_results = []
@@ -70,9 +101,499 @@ def _make_mock_conn(rows_per_call):
     empty.mappings.return_value.all.return_value = []
     call_results.append(empty)
     conn.execute.side_effect = call_results
+    stream = conn.execution_options.return_value.execute.return_value
+    stream.mappings.return_value.partitions.return_value = list(rows_per_call)
     return conn
 
 
+class TestStreamingEngine:
+    """The default (non-keyset) path: one query, one server-side cursor."""
+
+    def test_query_executes_once(self):
+        conn = _make_mock_conn([[{"record_id": 1}], [{"record_id": 2}]])
+        rows = list(extract.extract_record_metadata(conn, itersize=1))
+        assert [r["record_id"] for r in rows] == [1, 2]
+        stream_conn = conn.execution_options.return_value
+        stream_conn.execute.assert_called_once()
+        conn.execute.assert_not_called()
+
+    def test_fetch_size_is_itersize(self):
+        conn = _make_mock_conn([[{"bib_record_id": 1}]])
+        list(extract.extract_bib(conn, itersize=1234))
+        conn.execution_options.assert_called_once_with(yield_per=1234)
+        result = conn.execution_options.return_value.execute.return_value
+        result.mappings.return_value.partitions.assert_called_once_with(1234)
+
+    def test_no_limit_and_cursor_starts_at_zero(self):
+        conn = _make_mock_conn([[{"item_record_id": 1}]])
+        list(extract.extract_item(conn, itersize=10))
+        params = conn.execution_options.return_value.execute.call_args[0][1]
+        assert params["limit_val"] is None  # LIMIT NULL == LIMIT ALL
+        assert params["id_val"] == 0
+
+    def test_result_closed_when_consumer_stops_early(self):
+        conn = _make_mock_conn([[{"hold_id": 1}, {"hold_id": 2}], [{"hold_id": 3}]])
+        gen = extract.extract_hold(conn, itersize=2)
+        next(gen)
+        gen.close()
+        result = conn.execution_options.return_value.execute.return_value
+        result.close.assert_called_once()
+
+    def test_keyset_opt_in_pages_with_limit(self):
+        conn = _make_mock_conn([[{"hold_id": 5}]])
+        list(extract.extract_hold(conn, itersize=7, keyset=True))
+        conn.execution_options.assert_not_called()
+        first_params = conn.execute.call_args_list[0][0][1]
+        assert first_params["limit_val"] == 7
+
+
+def _make_raw_conn(columns, pages):
+    """Mock connection whose raw psycopg cursor returns *pages* of tuples."""
+    conn = MagicMock()
+    conn.info = {}
+    cur = conn.connection.driver_connection.cursor.return_value.__enter__.return_value
+    cur.description = [SimpleNamespace(name=name) for name in columns]
+    cur.fetchmany.side_effect = [*pages, []]
+    cur.fetchall.side_effect = [*pages, []]
+    return conn, cur
+
+
+class TestTupleRows:
+    def test_streams_columns_then_tuples_from_named_cursor(self):
+        conn, cur = _make_raw_conn(("bib_record_id", "best_title"), [[(1, "A"), (2, "B")]])
+        rows = list(extract.extract_bib(conn, itersize=500, tuples=True))
+        assert rows == [("bib_record_id", "best_title"), (1, "A"), (2, "B")]
+        conn.connection.driver_connection.cursor.assert_called_once_with(name="extract_bib")
+        assert cur.itersize == 500
+        query, params = cur.execute.call_args[0]
+        assert "%(id_val)s" in query
+        assert params["limit_val"] is None
+        conn.execute.assert_not_called()
+
+    def test_cursor_uses_raw_value_loaders(self):
+        conn, cur = _make_raw_conn(("bib_record_id",), [])
+        list(extract.extract_bib(conn, tuples=True))
+        registered = {c[0][0] for c in cur.adapters.register_loader.call_args_list}
+        assert registered == {"date", "timestamp", "timestamptz", "numeric", "json", "jsonb"}
+
+    def test_empty_result_still_yields_columns(self):
+        conn, _ = _make_raw_conn(("hold_id",), [])
+        assert list(extract.extract_hold(conn, tuples=True)) == [("hold_id",)]
+
+    def test_keyset_advances_on_tuple_key(self):
+        conn, cur = _make_raw_conn(("x", "item_record_id"), [[("a", 7)], [("b", 9)]])
+        rows = list(extract.extract_item(conn, itersize=1, keyset=True, tuples=True))
+        assert rows[1:] == [("a", 7), ("b", 9)]
+        id_vals = [c[0][1]["id_val"] for c in cur.execute.call_args_list]
+        assert id_vals == [0, 7, 9]
+
+    def test_repeated_page_queries_are_prepared(self):
+        conn, cur = _make_raw_conn(("x", "item_record_id"), [[("a", 7)]])
+        list(extract.extract_item(conn, itersize=1, keyset=True, tuples=True))
+        assert all(c.kwargs == {"prepare": True} for c in cur.execute.call_args_list)
+        conn, cur = _make_raw_conn(("x", "item_record_id"), [[("a", 1)]])
+        list(extract.extract_item(conn, itersize=2, tuples=True, ids=[1]))
+        assert cur.execute.call_args.kwargs == {"prepare": True}
+        # A streamed query runs once: nothing to reuse.
+        conn, cur = _make_raw_conn(("x", "item_record_id"), [[("a", 7)]])
+        list(extract.extract_item(conn, tuples=True))
+        assert cur.execute.call_args.kwargs == {}
+
+    def test_json_spot_check_passes_wire_text_through(self):
+        cols = ("bib_record_id", *extract.JSON_COLUMNS["bib"])
+        row = (1, '["a"]', None, "[]", '["g"]', '["x","y"]')
+        conn, _ = _make_raw_conn(cols, [[row]])
+        rows = list(extract.extract_bib(conn, tuples=True, json_check_every=1))
+        assert rows == [cols, row]
+
+    def test_json_spot_check_rejects_malformed_json(self):
+        cols = ("bib_record_id", *extract.JSON_COLUMNS["bib"])
+        rows = [(1, "[]", "[]", "[]", "[]", "[]"), (2, "[]", '["a"', "[]", "[]", "[]")]
+        conn, _ = _make_raw_conn(cols, [rows])
+        with pytest.raises(ValueError, match="bib.isbn_values"):
+            list(extract.extract_bib(conn, tuples=True, json_check_every=1))
+        conn, _ = _make_raw_conn(cols, [rows])
+        assert len(list(extract.extract_bib(conn, tuples=True, json_check_every=2))) == 3
+
+    def test_lookup_tuples(self):
+        conn, cur = _make_raw_conn(("code", "name"), [[("a", "Alpha")]])
+        rows = list(extract.extract_location(conn, tuples=True))
+        assert rows == [("code", "name"), ("a", "Alpha")]
+        conn.execute.assert_not_called()
+
+
+class TestIdDriven:
+    def test_one_query_per_batch_of_ids(self):
+        conn, cur = _make_raw_conn(("x", "item_record_id"), [[("a", 1), ("b", 2)], [("c", 5)]])
+        rows = list(extract.extract_item(conn, itersize=2, tuples=True, ids=[1, 2, 5]))
+        assert rows == [("x", "item_record_id"), ("a", 1), ("b", 2), ("c", 5)]
+        conn.connection.driver_connection.cursor.assert_called_once_with()
+        assert [c[0][1]["ids"] for c in cur.execute.call_args_list] == [[1, 2], [5]]
+        assert "= ANY(%(ids)s :: bigint[])" in cur.execute.call_args[0][0]
+
+    def test_no_ids_still_yields_columns(self):
+        conn, cur = _make_raw_conn(("volume_record_id",), [])
+        rows = list(extract.extract_volume_record(conn, tuples=True, ids=[]))
+        assert rows == [("volume_record_id",)]
+        assert cur.execute.call_count == 1
+
+    def test_default_queries_are_not_restricted(self):
+        conn, cur = _make_raw_conn(("bib_record_id",), [])
+        list(extract.extract_bib(conn, tuples=True))
+        assert cur.execute.call_args[0][1]["ids"] is None
+
+    def test_rejects_other_tables(self):
+        conn, _ = _make_raw_conn(("hold_id",), [])
+        with pytest.raises(ValueError, match="list of ids"):
+            list(extract.extract_hold(conn, tuples=True, ids=[1]))
+
+    def test_rejects_copy_and_dict_rows(self):
+        conn, _ = _make_raw_conn(("item_record_id",), [])
+        with pytest.raises(ValueError, match="COPY"):
+            list(extract.extract_item(conn, tuples=True, ids=[1], copy_format="binary"))
+        with pytest.raises(ValueError, match="tuples=True"):
+            list(extract.extract_item(conn, ids=[1]))
+
+
+class TestExtractLookups:
+    def _conn(self, results):
+        conn = MagicMock()
+        cursors = []
+        for columns, rows in results:
+            cur = MagicMock()
+            cur.description = [SimpleNamespace(name=name) for name in columns]
+            cur.fetchall.return_value = rows
+            cursors.append(cur)
+        conn.connection.driver_connection.cursor.side_effect = cursors
+        return conn, cursors
+
+    def test_queries_sent_in_one_pipeline(self, monkeypatch):
+        monkeypatch.setattr(extract.Pipeline, "is_supported", staticmethod(lambda: True))
+        conn, cursors = self._conn([(("code",), [("a",)]), (("id", "name"), [])])
+        result = extract.extract_lookups(conn, ["location", "branch"])
+        assert result == {"location": (("code",), [("a",)]), "branch": (("id", "name"), [])}
+        raw = conn.connection.driver_connection
+        raw.pipeline.assert_called_once_with()
+        assert "location" in cursors[0].execute.call_args[0][0]
+        assert all(cur.close.called for cur in cursors)
+        assert cursors[0].adapters.register_loader.called
+
+    def test_without_pipeline_support_runs_queries_in_turn(self, monkeypatch):
+        monkeypatch.setattr(extract.Pipeline, "is_supported", staticmethod(lambda: False))
+        conn, _ = self._conn([(("code",), [("a",)])])
+        assert extract.extract_lookups(conn, ["location"]) == {"location": (("code",), [("a",)])}
+        conn.connection.driver_connection.pipeline.assert_not_called()
+
+    def test_lookups_are_the_unpaginated_queries(self):
+        assert set(extract.LOOKUPS) == set(_ALL_QUERY_NAMES) - extract.STREAMED
+
+
+class TestLookupFingerprints:
+    def test_digests_computed_on_sierra_in_one_round_trip(self, monkeypatch):
+        monkeypatch.setattr(extract.Pipeline, "is_supported", staticmethod(lambda: True))
+        conn, cursors = TestExtractLookups()._conn([(("md5",), [("abc",)]), (("md5",), [("abc",)])])
+        prints = extract.lookup_fingerprints(conn, ["location", "branch"])
+        conn.connection.driver_connection.pipeline.assert_called_once_with()
+        query = cursors[0].execute.call_args[0][0]
+        assert query.startswith("SELECT md5(") and "sierra_view.location" in query
+        # Same rows, different query text: the fingerprints differ.
+        assert prints["location"] != prints["branch"]
+        assert len(prints["location"]) == 32
+
+    def test_fingerprint_follows_the_rows(self, monkeypatch):
+        monkeypatch.setattr(extract.Pipeline, "is_supported", staticmethod(lambda: False))
+        prints = []
+        for digest in ("abc", "abc", "def"):
+            conn, _ = TestExtractLookups()._conn([(("md5",), [(digest,)])])
+            prints.append(extract.lookup_fingerprints(conn, ["location"])["location"])
+        assert prints[0] == prints[1] != prints[2]
+
+
+class TestTimeoutSplit:
+    def test_keyset_page_retried_at_same_id_with_half_the_rows(self):
+        conn, cur = _make_raw_conn(("x", "item_record_id"), [[("a", 7)], [("b", 9)]])
+        cur.execute.side_effect = [QueryCanceled("statement timeout"), None, None, None]
+        events = Counter()
+        rows = list(extract.extract_item(conn, itersize=4, keyset=True, tuples=True, events=events))
+        assert rows[1:] == [("a", 7), ("b", 9)]
+        calls = [(c[0][1]["id_val"], c[0][1]["limit_val"]) for c in cur.execute.call_args_list]
+        assert calls == [(0, 4), (0, 2), (7, 2), (9, 2)]
+        assert events == {"page_splits": 1}
+        # Every page runs in its own savepoint.
+        assert conn.connection.driver_connection.transaction.call_count == 4
+
+    def test_single_row_page_timeout_is_raised(self):
+        conn, cur = _make_raw_conn(("item_record_id",), [])
+        cur.execute.side_effect = QueryCanceled("statement timeout")
+        with pytest.raises(QueryCanceled):
+            list(extract.extract_item(conn, itersize=1, keyset=True, tuples=True))
+
+    def test_id_batch_split(self):
+        conn, cur = _make_raw_conn(("x", "item_record_id"), [[("a", 1), ("b", 2)], [("c", 5)]])
+        cur.execute.side_effect = [QueryCanceled("statement timeout"), None, None]
+        events = Counter()
+        rows = list(
+            extract.extract_item(conn, itersize=4, tuples=True, ids=[1, 2, 5, 6], events=events)
+        )
+        assert len(rows) == 4
+        assert [c[0][1]["ids"] for c in cur.execute.call_args_list] == [
+            [1, 2, 5, 6],
+            [1, 2],
+            [5, 6],
+        ]
+        assert events == {"page_splits": 1}
+
+
+class TestStage:
+    def test_rebuilds_tables_for_every_extraction(self):
+        conn = MagicMock()
+        conn.info = {}
+        raw = conn.connection.driver_connection
+        cur = raw.cursor.return_value.__enter__.return_value
+        assert extract.stage(conn, "circ_leased_items")
+        assert extract.stage(conn, "circ_leased_items")
+        assert cur.execute.call_count == 2
+        sql = cur.execute.call_args[0][0]
+        assert "DROP TABLE IF EXISTS staged_leased_item" in sql
+        assert "CREATE TEMP TABLE staged_leased_item" in sql
+        assert raw.transaction.call_count == 2  # each time in a savepoint
+        assert raw.commit.call_count == 2
+
+    def test_queries_without_staging_do_nothing(self):
+        conn = MagicMock()
+        conn.info = {}
+        assert not extract.stage(conn, "bib")
+        conn.connection.driver_connection.cursor.assert_not_called()
+
+    @pytest.mark.parametrize("error", [InsufficientPrivilege, ReadOnlySqlTransaction])
+    def test_refused_temp_tables_fall_back_to_plain_query(self, error):
+        conn, cur = _make_raw_conn(("id",), [])
+        cur.execute.side_effect = [error("cannot create temp table"), None]
+        list(extract.extract_circ_leased_items(conn, tuples=True))
+        query = cur.execute.call_args[0][0]
+        assert "staged_leased_item" not in query
+        assert "sierra_view.item_record_property" in query
+        assert conn.info["staging_refused"]
+        # The server is not asked again on this connection.
+        assert not extract.stage(conn, "circ_leased_items")
+        assert cur.execute.call_count == 2
+
+    def test_extractor_stages_before_its_query(self):
+        conn, cur = _make_raw_conn(("id",), [])
+        list(extract.extract_circ_leased_items(conn, tuples=True))
+        queries = [c[0][0] for c in cur.execute.call_args_list]
+        assert "CREATE TEMP TABLE staged_leased_item" in queries[0]
+        assert "JOIN staged_leased_item" in queries[1]
+
+    def test_plain_queries_stand_alone(self):
+        for name in _ALL_QUERY_NAMES:
+            assert "staged_" not in _load_sql(name), name
+
+    def test_every_staging_file_exists(self):
+        for tables in extract.STAGING.values():
+            for table in tables:
+                assert (extract._STAGING_DIR / f"{table}.sql").exists()
+
+
+class TestSnapshot:
+    def test_exports_from_repeatable_read_transaction(self):
+        conn = MagicMock()
+        conn.info = {}
+        conn.execute.return_value.scalar_one.return_value = "00000003-0000001B-1"
+        assert extract.begin_snapshot(conn) == "00000003-0000001B-1"
+        conn.execution_options.assert_called_once_with(isolation_level="REPEATABLE READ")
+        assert "pg_export_snapshot()" in str(conn.execute.call_args[0][0])
+        assert conn.info == {"snapshot": "00000003-0000001B-1"}
+
+    def test_imports_given_snapshot(self):
+        conn = MagicMock()
+        conn.info = {}
+        extract.begin_snapshot(conn, "00000003-0000001B-1")
+        statement = str(conn.execute.call_args[0][0])
+        assert statement == "SET TRANSACTION SNAPSHOT '00000003-0000001B-1'"
+
+    def test_rejects_malformed_snapshot_id(self):
+        with pytest.raises(ValueError, match="snapshot id"):
+            extract.begin_snapshot(MagicMock(), "1'; DROP TABLE x; --")
+
+    def test_staging_inside_snapshot_is_not_committed(self):
+        conn = MagicMock()
+        conn.info = {"snapshot": "00000003-0000001B-1"}
+        assert extract.stage(conn, "circ_leased_items")
+        conn.connection.driver_connection.commit.assert_not_called()
+
+
+class TestThrottle:
+    def test_waits_after_every_page(self):
+        conn, _ = _make_raw_conn(("item_record_id",), [[(1,)], [(2,)]])
+        governor = MagicMock()
+        rows = list(extract.extract_item(conn, tuples=True, throttle=governor))
+        assert rows == [("item_record_id",), (1,), (2,)]
+        assert governor.wait.call_count == 2
+        probe_conn, name, seconds = governor.wait.call_args[0]
+        assert (probe_conn, name) == (conn, "item")
+        assert seconds >= 0
+
+    def test_failed_probe_does_not_abort_the_extraction(self):
+        conn, cur = _make_raw_conn(("item_record_id",), [[(1,)], [(2,)], [(3,)]])
+        pages = iter(cur.fetchmany.side_effect)
+        aborted = []
+
+        def execute(query, *args, **kwargs):
+            if aborted:
+                raise InFailedSqlTransaction("current transaction is aborted")
+            if "pg_stat_activity" in query:
+                aborted.append(True)
+                raise QueryCanceled("canceling statement due to statement timeout")
+
+        def fetch(*args):
+            if aborted:
+                raise InFailedSqlTransaction("current transaction is aborted")
+            return next(pages)
+
+        @contextlib.contextmanager
+        def savepoint():
+            try:
+                yield
+            except Exception:
+                aborted.clear()  # ROLLBACK TO SAVEPOINT
+                raise
+
+        cur.execute.side_effect = execute
+        cur.fetchmany.side_effect = cur.fetchall.side_effect = fetch
+        conn.connection.driver_connection.transaction.side_effect = savepoint
+        governor = throttle.Throttle([], max_active=1, sample_seconds=0)
+        rows = list(extract.extract_item(conn, tuples=True, throttle=governor))
+        assert rows == [("item_record_id",), (1,), (2,), (3,)]
+
+    def test_no_probe_connection_during_copy(self):
+        conn, _, _ = _make_copy_conn([("hold_id", 20)], [(1,)])
+        governor = MagicMock()
+        list(extract.extract_hold(conn, tuples=True, copy_format="text", throttle=governor))
+        assert governor.wait.call_args[0][0] is None
+
+
+class TestAdaptivePageSize:
+    def test_slow_page_shrinks(self):
+        sizer = extract.AdaptivePageSize(10_000, target_seconds=5.0)
+        sizer.observe(10_000, 10.0, row_bytes=100)
+        assert sizer.size == 5_000
+
+    def test_fast_page_grows_at_most_double(self):
+        sizer = extract.AdaptivePageSize(10_000, target_seconds=5.0)
+        sizer.observe(10_000, 0.1, row_bytes=100)
+        assert sizer.size == 20_000
+
+    def test_short_last_page_ignored(self):
+        sizer = extract.AdaptivePageSize(10_000, target_seconds=5.0)
+        sizer.observe(12, 0.01, row_bytes=100)
+        assert sizer.size == 10_000
+
+    def test_bounded_by_memory_and_limits(self):
+        sizer = extract.AdaptivePageSize(10_000, 5.0, max_page_bytes=1_000_000)
+        sizer.observe(10_000, 0.1, row_bytes=1_000)
+        assert sizer.size == 1_000
+        assert extract.AdaptivePageSize(10, 5.0).size == 500
+
+    def test_keyset_pages_use_learned_size(self):
+        conn = _make_mock_conn([[{"bib_record_id": 1}]])
+        sizer = extract.AdaptivePageSize(1234, target_seconds=5.0)
+        list(extract.extract_bib(conn, itersize=99, keyset=True, page_size=sizer))
+        assert conn.execute.call_args_list[0][0][1]["limit_val"] == 1234
+
+
+def _make_copy_conn(columns, rows):
+    """Mock connection whose raw psycopg cursor serves *rows* through copy()."""
+    conn = MagicMock()
+    cur = conn.connection.driver_connection.cursor.return_value.__enter__.return_value
+    cur.description = [SimpleNamespace(name=name, type_code=oid) for name, oid in columns]
+    copy = cur.copy.return_value.__enter__.return_value
+    copy.rows.return_value = iter(rows)
+    return conn, cur, copy
+
+
+class TestCopyBackend:
+    def test_rows_become_dicts_in_pages(self):
+        conn, _, _ = _make_copy_conn(
+            [("record_id", 20), ("record_num", 23)], [(1, 10), (2, 20), (3, 30)]
+        )
+        pages = list(extract._pages(conn, "record_metadata", 2, copy_format="binary"))
+        assert [len(p) for p in pages] == [2, 1]
+        assert pages[0][0] == {"record_id": 1, "record_num": 10}
+        conn.execute.assert_not_called()
+        conn.execution_options.assert_not_called()
+
+    def test_declares_probed_types_and_format(self):
+        conn, cur, copy = _make_copy_conn([("record_id", 20)], [])
+        list(extract.extract_item(conn, copy_format="text"))
+        copy.set_types.assert_called_once_with([20])
+        statement, params = cur.copy.call_args[0]
+        assert statement.startswith("COPY (")
+        assert statement.endswith("TO STDOUT (FORMAT text)")
+        assert "%(id_val)s" in statement
+        assert ":id_val" not in statement
+        assert params["id_val"] == 0
+
+    def test_casts_are_not_bind_params(self):
+        converted = extract._BIND_PARAM.sub(r"%(\1)s", "x = :a :: timestamptz, y::INTEGER")
+        assert converted == "x = %(a)s :: timestamptz, y::INTEGER"
+
+    def test_unknown_format_raises(self):
+        conn, _, _ = _make_copy_conn([], [])
+        with pytest.raises(ValueError, match="copy_format"):
+            list(extract.extract_bib(conn, copy_format="csv"))
+
+
+class TestKeyRanges:
+    def test_ranges_cover_the_whole_key_space(self):
+        ranges = extract._split_key_space([(1, 100)], 4)
+        assert len(ranges) == 4
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == extract._MAX_ID
+        for (_, upto), (after, _) in itertools.pairwise(ranges):
+            assert upto == after  # contiguous, non-overlapping
+
+    def test_equal_width(self):
+        ranges = extract._split_key_space([(1, 100)], 4)
+        assert [upto for _, upto in ranges[:-1]] == [25, 50, 75]
+
+    def test_gaps_between_spans_are_skipped(self):
+        # Two dense blocks of 100 ids each, far apart: a 2-way split must give
+        # each range one block, not cut the first block in half by width.
+        ranges = extract._split_key_space([(1, 100), (1_000_001, 1_000_100)], 2)
+        assert ranges == [(0, 1_000_000), (1_000_000, extract._MAX_ID)]
+
+    def test_no_spans_is_one_open_range(self):
+        assert extract._split_key_space([], 3) == [(0, extract._MAX_ID)]
+
+    def test_more_ranges_than_ids_are_deduplicated(self):
+        ranges = extract._split_key_space([(10, 11)], 8)
+        assert len(ranges) == 2
+
+    def test_key_ranges_reads_bounds_query(self):
+        conn = MagicMock()
+        conn.execute.return_value.all.return_value = [(1, 10), (None, None)]
+        ranges = extract.key_ranges(conn, "bib", 2)
+        assert ranges == [(0, 5), (5, extract._MAX_ID)]
+        sql = str(conn.execute.call_args[0][0])
+        assert "min(rm.id)" in sql
+
+    def test_key_ranges_rejects_unpartitionable_table(self):
+        with pytest.raises(ValueError, match="hold"):
+            extract.key_ranges(MagicMock(), "hold", 2)
+
+    def test_all_partitionable_tables_have_bounds_sql(self):
+        for name in extract.PARTITIONABLE:
+            assert ":max_id_val" in _load_sql(name)
+            assert "AS lo" in _load_sql(f"key_bounds/{name}")
+
+    def test_id_range_bounds_the_query(self):
+        conn = _make_mock_conn([[{"bib_record_id": 7}]])
+        list(extract.extract_bib(conn, itersize=10, id_range=(5, 9)))
+        params = conn.execution_options.return_value.execute.call_args[0][1]
+        assert (params["id_val"], params["max_id_val"]) == (5, 9)
+
+
 class TestExtractRecordMetadata:
     def test_yields_all_rows(self):
         batch1 = [
@@ -110,7 +631,7 @@ class TestExtractRecordMetadata:
             },
         ]
         conn = _make_mock_conn([batch1])
-        rows = list(extract.extract_record_metadata(conn, itersize=2))
+        rows = list(extract.extract_record_metadata(conn, itersize=2, keyset=True))
         assert len(rows) == 2
         # Second call should use id_val=20 (last row's record_id)
         second_call_kwargs = conn.execute.call_args_list[1][0][1]
@@ -137,7 +658,7 @@ class TestExtractRecordMetadata:
         batch1 = [_row(1), _row(2)]
         batch2 = [_row(3), _row(4)]
         conn = _make_mock_conn([batch1, batch2])
-        rows = list(extract.extract_record_metadata(conn, itersize=2))
+        rows = list(extract.extract_record_metadata(conn, itersize=2, keyset=True))
         assert len(rows) == 4
         assert [r["record_id"] for r in rows] == [1, 2, 3, 4]
         # Third execute call should use cursor id from last row of batch2 (id=4)
@@ -191,7 +712,7 @@ class TestExtractBib:
             },
         ]
         conn = _make_mock_conn([batch])
-        list(extract.extract_bib(conn, itersize=1))
+        list(extract.extract_bib(conn, itersize=1, keyset=True))
         second_call_kwargs = conn.execute.call_args_list[1][0][1]
         assert second_call_kwargs["id_val"] == 42
 
@@ -215,12 +736,86 @@ class TestExtractBib:
             }
         ]
         conn = _make_mock_conn([batch])
-        rows = list(extract.extract_bib(conn, itersize=10))
+        rows = list(extract.extract_bib(conn, itersize=10, keyset=True))
         assert len(rows) == 1
         # First call returns 1 row (< itersize=10), second call returns [] → stop
         assert conn.execute.call_count == 2
 
 
+def _make_bib_sets_conn(base_pages, attributes):
+    """Mock connection for the 'sets' strategy.
+
+    *base_pages* are pages of bib_sets/base.sql tuples; *attributes* maps an
+    attribute column to the ``(record_id, value)`` rows its query returns.
+    """
+    base_cols = (
+        "bib_record_num",
+        "bib_record_id",
+        "best_author",
+        "best_title",
+        "publish_year",
+        "cataloging_date",
+    )
+    conn, cur = _make_raw_conn(base_cols, base_pages)
+
+    def execute(query, params=None, prepare=None):
+        # _pyformat_sql is patched to return the query's file name.
+        cur.last = query.removeprefix("bib_sets/")
+
+    cur.execute.side_effect = execute
+    cur.fetchall.side_effect = lambda: attributes.get(cur.last, [])
+    return conn, cur
+
+
+class TestBibSetStrategy:
+    def _run(self, monkeypatch, base_pages, attributes, **options):
+        monkeypatch.setattr(extract, "_pyformat_sql", lambda name: name)
+        conn, cur = _make_bib_sets_conn(base_pages, attributes)
+        return list(extract.extract_bib(conn, tuples=True, strategy="sets", **options)), cur
+
+    def test_assembles_rows_in_bib_sql_column_order(self, monkeypatch):
+        attributes = {
+            "control_numbers": [(10, "ocm1"), (10, 'say "hi"'), (11, "ocm2")],
+            "isbn_values": [(11, "9780000000000")],
+            "publisher": [(10, "Press")],
+            "bib_level_callnumber": [],
+            "indexed_subjects": [(10, "Café")],
+            "genres": [(10, None)],
+            "item_types": [(11, "Book"), (11, "DVD")],
+        }
+        base = [[(1, 10, "Doe", "T1", 2020, "2020-01-15"), (2, 11, None, "T2", None, None)]]
+        rows, cur = self._run(monkeypatch, base, attributes)
+        assert rows[0] == extract.BIB_COLUMNS
+        first, second = (dict(zip(extract.BIB_COLUMNS, row, strict=True)) for row in rows[1:])
+        assert first["control_numbers"] == '["ocm1", "say \\"hi\\""]'
+        assert first["publisher"] == "Press"
+        assert first["indexed_subjects"] == '["Café"]'
+        assert first["genres"] == "[null]"
+        assert first["isbn_values"] is None
+        assert first["cataloging_date"] == "2020-01-15"
+        assert second["isbn_values"] == '["9780000000000"]'
+        assert second["item_types"] == '["Book", "DVD"]'
+        assert second["publisher"] is None
+        calls = cur.execute.call_args_list
+        ids = {tuple(c[0][1]["ids"]) for c in calls if c[0][1].get("ids") is not None}
+        assert ids == {(10, 11)}
+        attribute_calls = [c for c in calls if set(c[0][1]) == {"ids"}]
+        assert len(attribute_calls) == len(extract._BIB_SET_ATTRIBUTES)
+        assert all(c.kwargs == {"prepare": True} for c in attribute_calls)
+
+    def test_requires_tuple_rows(self):
+        with pytest.raises(ValueError, match="tuples=True"):
+            list(extract.extract_bib(MagicMock(), strategy="sets"))
+
+    def test_rejects_copy(self, monkeypatch):
+        with pytest.raises(ValueError, match="COPY"):
+            self._run(monkeypatch, [], {}, copy_format="binary")
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError, match="strategy"):
+            list(extract.extract_bib(MagicMock(), strategy="join"))
+
+
 class TestExtractItem:
     def test_yields_expected_columns(self):
         batch = [
@@ -285,7 +880,7 @@ class TestExtractItem:
             },
         ]
         conn = _make_mock_conn([batch])
-        list(extract.extract_item(conn, itersize=1))
+        list(extract.extract_item(conn, itersize=1, keyset=True))
         second_call_kwargs = conn.execute.call_args_list[1][0][1]
         assert second_call_kwargs["id_val"] == 77
 
@@ -507,14 +1102,24 @@ class TestExtractCircAgg:
                 "branch_name": "Anderson",
             },
         ]
-        conn = MagicMock()
-        result = MagicMock()
-        result.mappings.return_value.all.return_value = rows
-        conn.execute.return_value = result
+        conn = _make_mock_conn([rows])
         result = list(extract.extract_circ_agg(conn))
         assert len(result) == 1
         assert result[0]["op_code"] == "o"
 
+    def test_streams_instead_of_fetching_all(self):
+        conn = _make_mock_conn([[{"op_code": "o"}]])
+        list(extract.extract_circ_agg(conn, itersize=250))
+        conn.execution_options.assert_called_once_with(yield_per=250)
+        conn.execute.assert_not_called()
+
+    def test_since_and_retention_bound(self):
+        conn = _make_mock_conn([[{"op_code": "o"}]])
+        list(extract.extract_circ_agg(conn, since="2026-10-16", retention_months=12))
+        params = conn.execution_options.return_value.execute.call_args[0][1]
+        assert params["since_date"] == "2026-10-16"
+        assert params["retention_months"] == 12
+
 
 class TestExtractItemMessage:
     def test_yields_expected_columns(self):
@@ -557,6 +1162,96 @@ class TestExtractItemMessage:
         assert rows[0]["item_status_code"] == "-"
 
 
+_RAW_COLS = (
+    "varfield_id",
+    "item_record_id",
+    "campus_code",
+    "occ_num",
+    "field_content",
+    "call_number",
+    "due_julianday",
+    "loanrule_code_num",
+    "checkout_julianday",
+    "renewal_count",
+    "overdue_count",
+    "overdue_julianday",
+)
+_NO_CHECKOUT = ("FIC DOE", None, None, None, None, None, None)
+
+
+class TestParseItemMessages:
+    def _parse(self, *contents, today=2460400):
+        page = [(i, 100 + i, "", 1, c, *_NO_CHECKOUT) for i, c in enumerate(contents)]
+        return [
+            dict(zip(extract.ITEM_MESSAGE_COLUMNS, row, strict=True))
+            for row in extract._parse_item_messages(_RAW_COLS, page, today)
+        ]
+
+    def test_transit_message(self):
+        (row,) = self._parse("MON JAN 02 2024 03:45PM: IN TRANSIT from 2anf to 3ra")
+        assert row["in_transit_julianday"] == 2460312  # to_char('2024-01-02', 'J')
+        assert row["in_transit_days"] == 88
+        assert (row["transit_from"], row["transit_to"]) == ("2anf", "3ra")
+        assert row["has_in_transit"] is True
+        assert row["has_in_transit_too_long"] is False
+        assert row["item_record_id"] == 100
+        assert row["call_number"] == "FIC DOE"
+        assert row["item_status_code"] is None
+
+    def test_call_number_and_checkout_copied(self):
+        raw = (1, 100, "", 1, "IN TRANSIT from a to b", "FIC DOE", 10, 3, 4, 1, 2, 11)
+        (row,) = (
+            dict(zip(extract.ITEM_MESSAGE_COLUMNS, r, strict=True))
+            for r in extract._parse_item_messages(_RAW_COLS, [raw], 2460400)
+        )
+        assert row["call_number"] == "FIC DOE"
+        assert [row[c] for c in extract.ITEM_MESSAGE_COLUMNS[-6:]] == [10, 3, 4, 1, 2, 11]
+        assert row["best_title"] is None
+
+    def test_fields_matching_neither_pattern_are_dropped(self):
+        assert self._parse("Damaged cover", "in transit, no route") == []
+
+    def test_time_only_and_route_only_rows_are_kept(self):
+        time_only, route_only = self._parse(
+            "tue mar 05 2024 10:00am: note", "IN TRANSIT TOO LONG\nIN TRANSIT from a1 to b2"
+        )
+        assert time_only["in_transit_julianday"] == 2460375
+        assert time_only["transit_from"] is None
+        assert route_only["in_transit_julianday"] is None
+        assert route_only["in_transit_days"] is None
+        assert route_only["has_in_transit_too_long"] is True
+
+    def test_last_route_wins(self):
+        (row,) = self._parse("IN TRANSIT from a1 to b2 then IN TRANSIT from c3 to d4")
+        assert (row["transit_from"], row["transit_to"]) == ("c3", "d4")
+
+    def test_impossible_date_has_no_julian_day(self):
+        (row,) = self._parse("FRI FEB 30 2024 10:00AM: IN TRANSIT from a to b")
+        assert row["in_transit_julianday"] is None
+
+    def test_raw_mode_reads_varfields_only(self):
+        conn, cur = _make_raw_conn(
+            _RAW_COLS, [[(7, 70, "", 0, "IN TRANSIT from a to b", *_NO_CHECKOUT)]]
+        )
+        rows = list(extract.extract_item_message(conn, tuples=True, mode="raw"))
+        assert rows[0] == extract.ITEM_MESSAGE_COLUMNS
+        assert rows[1][4] == 7
+        assert "regexp_matches" not in cur.execute.call_args[0][0]
+
+    def test_raw_mode_counts_days_to_the_given_date(self):
+        content = "MON JAN 02 2024 03:45PM: IN TRANSIT from a to b"
+        conn, _ = _make_raw_conn(_RAW_COLS, [[(7, 70, "", 0, content, *_NO_CHECKOUT)]])
+        rows = list(
+            extract.extract_item_message(conn, tuples=True, mode="raw", today=date(2024, 1, 12))
+        )
+        row = dict(zip(extract.ITEM_MESSAGE_COLUMNS, rows[1], strict=True))
+        assert row["in_transit_days"] == 10
+
+    def test_raw_mode_requires_tuples(self):
+        with pytest.raises(ValueError, match="tuples=True"):
+            list(extract.extract_item_message(MagicMock(), mode="raw"))
+
+
 class TestExtractBibRecordItemRecordLink:
     def test_yields_expected_columns(self):
         batch = [
@@ -629,3 +1324,10 @@ class TestExtractCircLeasedItems:
         assert len(rows) == 1
         assert rows[0]["op_code"] == "o"
         assert rows[0]["barcode"] == "L000000123456"
+
+    def test_open_id_range_fetches_above_watermark(self):
+        conn = _make_mock_conn([[{"id": 901}]])
+        list(extract.extract_circ_leased_items(conn, id_range=(900, None)))
+        params = conn.execution_options.return_value.execute.call_args[0][1]
+        assert params["id_val"] == 900
+        assert params["max_id_val"] == extract._MAX_ID
@@ -0,0 +1,94 @@
+"""Unit tests for collection_analysis.incremental — SQLite only, no PostgreSQL."""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from collection_analysis import checkpoint, incremental, load
+
+
+def _seed(db):
+    load.load_table(
+        db,
+        "record_metadata",
+        iter(
+            [
+                {"record_id": 1, "deletion_julianday": None},
+                {"record_id": 2, "deletion_julianday": None},
+            ]
+        ),
+    )
+    load.load_table(
+        db,
+        "bib",
+        iter([{"bib_record_id": 1, "title": "old"}, {"bib_record_id": 2, "title": "two"}]),
+    )
+    load.load_table(db, "hold", iter([{"hold_id": 9}]))
+    db.execute("CREATE VIEW v AS SELECT * FROM bib")
+    load.load_table(db, "_pipeline_run", iter([{"stage": "x"}]))
+
+
+class TestPrepare:
+    def test_drops_full_reload_tables_views_and_run_stats(self, empty_db):
+        _seed(empty_db)
+        marks = incremental.prepare(empty_db, ["record_metadata", "bib", "hold"])
+        names = {r[0] for r in empty_db.execute("SELECT name FROM sqlite_master")}
+        assert names == {"record_metadata", "bib"}
+        assert marks == {"record_metadata": 2, "bib": 2}
+
+    def test_failed_incremental_build_is_not_resumed_as_done(self, tmp_output_dir):
+        live = load.open_build_db(tmp_output_dir)
+        _seed(live)
+        for name in ("record_metadata", "bib", "hold"):
+            checkpoint.mark_done(live, name, 2)
+        load.write_state(live, checkpoint.BUILD_MODE, "full")
+        live.close()
+        load.swap_db(tmp_output_dir)
+
+        db = load.open_build_db(tmp_output_dir, base=load.final_path(tmp_output_dir))
+        incremental.prepare(db, ["record_metadata", "bib", "hold"])
+        load.write_state(db, checkpoint.BUILD_MODE, "incremental")
+        assert checkpoint.completed(db) == set()
+        db.close()  # the incremental run fails here
+
+        db = load.open_build_db(tmp_output_dir, resume=True)
+        assert checkpoint.completed(db) == set()
+        with pytest.raises(ValueError, match="incremental build"):
+            checkpoint.check_mode(db, "full")
+        db.close()
+
+
+class TestApply:
+    def test_upserts_and_removes_deleted_records(self, empty_db):
+        _seed(empty_db)
+        marks = incremental.prepare(empty_db, ["record_metadata", "bib", "hold"])
+        load.append_rows(
+            empty_db,
+            "record_metadata",
+            [
+                {"record_id": 1, "deletion_julianday": None},
+                {"record_id": 2, "deletion_julianday": 2461000},
+            ],
+        )
+        load.append_rows(empty_db, "bib", [{"bib_record_id": 1, "title": "new"}])
+
+        incremental.apply(empty_db, marks)
+
+        bibs = empty_db.execute("SELECT bib_record_id, title FROM bib").fetchall()
+        assert bibs == [(1, "new")]
+        assert empty_db.execute("SELECT count(*) FROM record_metadata").fetchone()[0] == 2
+
+
+class TestSierraNow:
+    def test_returns_iso_timestamp(self):
+        conn = MagicMock()
+        conn.execute.return_value.scalar_one.return_value = datetime(
+            2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc
+        )
+        assert incremental.sierra_now(conn) == "2026-01-02T03:04:05+00:00"
+
+
+class TestPreviousHighWaterMark:
+    def test_none_without_live_db(self, tmp_output_dir):
+        assert incremental.previous_high_water_mark(tmp_output_dir) is None
@@ -4,6 +4,7 @@ import json
 import logging
 import sqlite3
 from datetime import date, datetime
+from decimal import Decimal
 
 import pytest
 
@@ -72,6 +73,168 @@ class TestOpenBuildDb:
         db.close()
         assert result < 0  # negative value = size in kilobytes
 
+    def test_open_build_db_copies_base(self, tmp_output_dir, tmp_path):
+        base = tmp_path / "live.db"
+        src = sqlite3.connect(base)
+        src.execute("CREATE TABLE t (id INTEGER)")
+        src.execute("INSERT INTO t VALUES (7)")
+        src.commit()
+        src.close()
+        db = load.open_build_db(tmp_output_dir, base=base)
+        assert db.execute("SELECT id FROM t").fetchall() == [(7,)]
+        assert db.execute("PRAGMA synchronous").fetchone()[0] == 0
+        db.close()
+
+    def test_open_build_db_resume_keeps_existing_build(self, tmp_output_dir):
+        db = load.open_build_db(tmp_output_dir)
+        load.load_table(db, "t", iter([{"id": 1}]))
+        db.close()
+        db = load.open_build_db(tmp_output_dir, resume=True)
+        assert db.execute("SELECT id FROM t").fetchall() == [(1,)]
+        db.close()
+        db = load.open_build_db(tmp_output_dir)
+        assert db.execute("SELECT name FROM sqlite_master").fetchall() == []
+        db.close()
+
+
+class TestMaxKey:
+    def test_bounded_by_range(self, empty_db):
+        load.load_table(empty_db, "t", iter({"k": k} for k in (3, 7, 12)))
+        assert load.max_key(empty_db, "t", "k") == 12
+        assert load.max_key(empty_db, "t", "k", after=0, upto=10) == 7
+        assert load.max_key(empty_db, "t", "k", after=12) is None
+        assert load.max_key(empty_db, "missing", "k") is None
+
+
+class TestRecordIds:
+    def test_live_ids_of_one_type_in_order(self, empty_db):
+        cols = (
+            "record_id",
+            "record_type_code",
+            "record_last_updated_julianday",
+            "deletion_julianday",
+        )
+        rows = [
+            (9, "b", 2460400, None),
+            (3, "b", 2460300, None),
+            (4, "i", 2460400, None),
+            (5, "b", 2460400, 2460401),
+            (9, "b", 2460410, None),  # incremental: old and new copy
+        ]
+        load.load_table(empty_db, "record_metadata", iter(rows), columns=cols)
+        assert list(load.record_ids(empty_db, "b")) == [3, 9]
+        assert list(load.record_ids(empty_db, "b", after=3)) == [9]
+        assert list(load.record_ids(empty_db, "b", upto=8)) == [3]
+        assert list(load.record_ids(empty_db, "b", updated_since=2460400)) == [9]
+        assert list(load.record_ids(empty_db, "j")) == []
+
+
+class TestTupleRows:
+    def test_columns_given_separately(self, empty_db):
+        rows = [(1, {"a": 1}, date(2024, 1, 2)), (2, None, None)]
+        n = load.load_table(empty_db, "t", iter(rows), columns=("id", "meta", "day"))
+        assert n == 2
+        assert empty_db.execute("SELECT * FROM t ORDER BY id").fetchall() == [
+            (1, '{"a": 1}', "2024-01-02"),
+            (2, None, None),
+        ]
+
+    def test_adds_columns_missing_from_existing_table(self, empty_db):
+        empty_db.execute("CREATE TABLE t (id)")
+        empty_db.execute("INSERT INTO t VALUES (1)")
+        load.append_rows(empty_db, "t", iter([(2, "x")]), columns=("id", "extra"))
+        assert empty_db.execute("SELECT id, extra FROM t ORDER BY id").fetchall() == [
+            (1, None),
+            (2, "x"),
+        ]
+
+    def test_no_rows_creates_no_table(self, empty_db):
+        assert load.append_rows(empty_db, "t", iter([]), columns=("id",)) == 0
+        assert empty_db.execute("SELECT name FROM sqlite_master").fetchall() == []
+
+
+class TestColumnPlan:
+    def test_passthrough_batch_is_returned_unchanged(self):
+        batch = [(1, "a", None), (2, "b", 1.5)]
+        assert load._ColumnPlan(3).apply(batch) is batch
+
+    def test_converts_each_column_by_type(self):
+        plan = load._ColumnPlan(4)
+        batch = [(Decimal("1.5"), True, {"a": 1}, date(2024, 1, 2)), (None, False, [1], None)]
+        assert plan.apply(batch) == [
+            (1.5, 1, '{"a": 1}', "2024-01-02"),
+            (None, 0, "[1]", None),
+        ]
+
+    def test_null_column_is_planned_when_values_appear(self):
+        plan = load._ColumnPlan(1)
+        assert plan.apply([(None,)]) == [(None,)]
+        assert plan.apply([(date(2024, 1, 2),)]) == [("2024-01-02",)]
+
+    def test_column_with_varying_types_falls_back_to_serialize(self):
+        plan = load._ColumnPlan(1)
+        assert plan.apply([(date(2024, 1, 2),)]) == [("2024-01-02",)]
+        assert plan.converters[0] is date.isoformat
+        assert plan.apply([("text",), ({"a": 1},)]) == [("text",), ('{"a": 1}',)]
+        assert plan.converters[0] is load._serialize
+
+    def test_dict_and_list_share_json_converter(self):
+        plan = load._ColumnPlan(1)
+        assert plan.apply([({"a": 1},), ([2],)]) == [('{"a": 1}',), ("[2]",)]
+        assert plan.converters[0] is json.dumps
+
+
+class TestBuildState:
+    def test_missing_table_returns_none(self, empty_db):
+        assert load.read_state(empty_db, "high_water_mark") is None
+
+    def test_write_then_read(self, empty_db):
+        load.write_state(empty_db, "k", "v1")
+        load.write_state(empty_db, "k", "v2")
+        assert load.read_state(empty_db, "k") == "v2"
+
+    def test_read_live_state(self, tmp_output_dir):
+        assert load.read_live_state(tmp_output_dir, "k") is None
+        db = load.open_build_db(tmp_output_dir)
+        load.write_state(db, "k", "v")
+        db.close()
+        load.swap_db(tmp_output_dir)
+        assert load.read_live_state(tmp_output_dir, "k") == "v"
+
+
+class TestCopyLiveTable:
+    def _live(self, output_dir):
+        db = load.open_build_db(output_dir)
+        load.load_table(db, "t", iter([{"k": 1}, {"k": 2}, {"k": 3}]))
+        db.close()
+        load.swap_db(output_dir)
+
+    def test_replaces_build_table_with_matching_live_rows(self, tmp_output_dir, empty_db):
+        self._live(tmp_output_dir)
+        load.load_table(empty_db, "t", iter([{"k": 99}]))
+        assert load.copy_live_table(empty_db, tmp_output_dir, "t", "k >= ?", (2,)) == 2
+        assert [r[0] for r in empty_db.execute("SELECT k FROM t ORDER BY k")] == [2, 3]
+
+    def test_table_missing_from_live_db_is_left_absent(self, tmp_output_dir, empty_db):
+        self._live(tmp_output_dir)
+        load.load_table(empty_db, "other", iter([{"k": 1}]))
+        assert load.copy_live_table(empty_db, tmp_output_dir, "other") == 0
+        tables = [r[0] for r in empty_db.execute("SELECT name FROM sqlite_master")]
+        assert tables == []
+
+
+class TestReplaceOlderRows:
+    def test_keeps_newest_copy_per_key(self, empty_db):
+        load.load_table(empty_db, "t", iter([{"id": 1, "v": "a"}, {"id": 2, "v": "b"}]))
+        mark = load.max_rowid(empty_db, "t")
+        load.append_rows(empty_db, "t", [{"id": 2, "v": "B"}, {"id": 3, "v": "C"}])
+        assert load.replace_older_rows(empty_db, "t", "id", mark) == 1
+        rows = empty_db.execute("SELECT id, v FROM t ORDER BY id").fetchall()
+        assert rows == [(1, "a"), (2, "B"), (3, "C")]
+
+    def test_max_rowid_of_missing_table(self, empty_db):
+        assert load.max_rowid(empty_db, "nope") == 0
+
 
 class TestFinalizeDb:
     def test_finalize_db_sets_wal(self, tmp_output_dir):
@@ -242,3 +405,22 @@ class TestLoadTable:
         val = db.execute("SELECT ts FROM items").fetchone()[0]
         db.close()
         assert val == "2024-06-15T12:30:00.123456"
+
+    def test_append_rows_adds_chunks_without_summary_log(self, caplog):
+        db = self._mem_db()
+        with caplog.at_level(logging.INFO, logger="collection_analysis.load"):
+            assert load.append_rows(db, "items", iter([{"id": 1}, {"id": 2}])) == 2
+            assert load.append_rows(db, "items", iter([{"id": 3}])) == 1
+        count = db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        db.close()
+        assert count == 3
+        assert "Loaded" not in caplog.text
+
+    def test_append_rows_without_commit_leaves_transaction_open(self):
+        db = self._mem_db()
+        load.append_rows(db, "a", iter([(1,)]), columns=("id",), commit=False)
+        load.append_rows(db, "b", iter([(2,)]), columns=("id",), commit=False)
+        assert db.in_transaction
+        db.commit()
+        assert db.execute("SELECT COUNT(*) FROM a").fetchone()[0] == 1
+        db.close()
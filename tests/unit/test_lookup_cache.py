@@ -0,0 +1,38 @@
+"""Unit tests for collection_analysis.lookup_cache — SQLite only, no PostgreSQL."""
+
+from collection_analysis import load, lookup_cache
+
+
+def _live_db(output_dir, fingerprints):
+    db = load.open_build_db(output_dir)
+    load.load_table(db, "location", iter([{"code": "a"}, {"code": "b"}]))
+    load.load_table(db, "branch", iter([{"id": 1}]))
+    for name, fingerprint in fingerprints.items():
+        load.write_state(db, lookup_cache.FINGERPRINT_PREFIX + name, fingerprint)
+    db.close()
+    load.swap_db(output_dir)
+
+
+class TestReuse:
+    def test_without_live_db_reuses_nothing(self, tmp_output_dir, empty_db):
+        assert lookup_cache.reuse(empty_db, tmp_output_dir, {"location": "f1"}) == {}
+        assert load.read_state(empty_db, "fingerprint:location") == "f1"
+
+    def test_copies_only_unchanged_tables(self, tmp_output_dir, empty_db):
+        _live_db(tmp_output_dir, {"location": "f1", "branch": "f2"})
+        reused = lookup_cache.reuse(
+            empty_db, tmp_output_dir, {"location": "f1", "branch": "changed"}
+        )
+        assert reused == {"location": 2}
+        codes = [r[0] for r in empty_db.execute("SELECT code FROM location ORDER BY 1")]
+        assert codes == ["a", "b"]
+        tables = {r[0] for r in empty_db.execute("SELECT name FROM sqlite_master")}
+        assert "branch" not in tables
+        assert load.read_state(empty_db, "fingerprint:branch") == "changed"
+        attached = [r[1] for r in empty_db.execute("PRAGMA database_list")]
+        assert attached == ["main"]
+
+    def test_unchanged_empty_table_stays_absent(self, tmp_output_dir, empty_db):
+        _live_db(tmp_output_dir, {"material_property": "empty"})
+        reused = lookup_cache.reuse(empty_db, tmp_output_dir, {"material_property": "empty"})
+        assert reused == {"material_property": 0}
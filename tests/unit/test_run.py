@@ -3,15 +3,34 @@
 import itertools
 import logging
 import sqlite3
+import threading
+import time
+from array import array
+from collections import Counter
+from datetime import date
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+import psycopg
 import pytest
+from sqlalchemy.exc import DBAPIError
 
+from collection_analysis import checkpoint, extract, load, lookup_cache
 from collection_analysis.run import (
+    _TABLES,
     _configure_logging,
+    _extract_options,
+    _extract_parallel,
+    _load_lookups,
     _log_summary,
+    _page_sizers,
+    _prefetched,
+    _resilient,
+    _resumed,
+    _reuse_lookups,
+    _Sierra,
     _timed_load,
+    _with_ids,
     _write_run_stats,
 )
 
@@ -212,3 +231,581 @@ class TestExtractLimitIslice:
         n, _ = _timed_load(db, "t", itertools.islice(rows, 0))
         assert n == 0
         db.close()
+
+
+class TestExtractOptions:
+    def test_paginated_table_streams_by_default(self):
+        assert _extract_options({"pg_keyset_tables": []}, "bib") == {
+            "tuples": True,
+            "keyset": False,
+        }
+
+    def test_keyset_opt_in(self):
+        assert _extract_options({"pg_keyset_tables": ["bib"]}, "bib") == {
+            "tuples": True,
+            "keyset": True,
+        }
+
+    def test_incremental_target_date_for_delta_tables_only(self):
+        cfg = {"pg_keyset_tables": [], "incremental_since": "2026-01-01T00:00:00+00:00"}
+        assert _extract_options(cfg, "item")["target_date"] == cfg["incremental_since"]
+        assert "target_date" not in _extract_options(cfg, "hold")
+
+    def test_circ_agg_gets_cache_window(self):
+        cfg = {"circ_agg_since": "2026-10-16", "circ_agg_retention_months": 12}
+        assert _extract_options(cfg, "circ_agg") == {
+            "tuples": True,
+            "since": "2026-10-16",
+            "retention_months": 12,
+        }
+
+    def test_bib_strategy(self):
+        cfg = {"pg_keyset_tables": [], "pg_bib_strategy": "sets"}
+        assert _extract_options(cfg, "bib")["strategy"] == "sets"
+        assert "strategy" not in _extract_options(cfg, "item")
+        assert "strategy" not in _extract_options({"pg_keyset_tables": []}, "bib")
+
+    def test_item_message_mode(self):
+        cfg = {"pg_keyset_tables": [], "pg_item_message_mode": "raw"}
+        assert _extract_options(cfg, "item_message")["mode"] == "raw"
+        assert "mode" not in _extract_options({"pg_keyset_tables": []}, "item_message")
+
+    def test_item_message_raw_mode_uses_sierra_date(self):
+        cfg = {"pg_item_message_mode": "raw", "sierra_today": date(2024, 6, 15)}
+        assert _extract_options(cfg, "item_message")["today"] == date(2024, 6, 15)
+        cfg["pg_item_message_mode"] = "query"
+        assert "today" not in _extract_options(cfg, "item_message")
+
+    def test_json_check_for_tables_with_json_columns(self):
+        cfg = {"pg_keyset_tables": [], "json_check_every": 100}
+        assert _extract_options(cfg, "bib")["json_check_every"] == 100
+        assert "json_check_every" not in _extract_options(cfg, "item")
+        assert "json_check_every" not in _extract_options({"pg_keyset_tables": []}, "bib")
+
+    def test_circ_leased_items_fetches_above_watermark(self):
+        cfg = {"pg_keyset_tables": [], "circ_leased_items_after": 900}
+        options = _extract_options(cfg, "circ_leased_items")
+        assert options == {"tuples": True, "keyset": False, "id_range": (900, None)}
+
+    def test_copy_tables_get_copy_format(self):
+        cfg = {
+            "pg_keyset_tables": [],
+            "pg_copy_tables": ["item", "location"],
+            "pg_copy_format": "text",
+        }
+        assert _extract_options(cfg, "item") == {
+            "tuples": True,
+            "keyset": False,
+            "copy_format": "text",
+        }
+        assert _extract_options(cfg, "location") == {"tuples": True}
+
+    def test_page_sizer_passed_for_keyset_table(self):
+        sizer = object()
+        cfg = {"pg_keyset_tables": ["bib"], "page_sizers": {"bib": sizer}}
+        assert _extract_options(cfg, "bib")["page_size"] is sizer
+
+    def test_page_sizers_start_from_learned_sizes(self):
+        cfg = {
+            "pg_keyset_tables": ["bib", "hold"],
+            "pg_itersize": 5000,
+            "pg_page_target_seconds": 5.0,
+        }
+        sizers = _page_sizers(cfg, {"bib": 20000})
+        assert {n: s.size for n, s in sizers.items()} == {"bib": 20000, "hold": 5000}
+        assert _page_sizers({**cfg, "pg_page_target_seconds": 0}, {}) == {}
+
+    def test_throttle_passed_to_streamed_tables_only(self):
+        governor = object()
+        cfg = {"throttle": governor}
+        assert _extract_options(cfg, "bib")["throttle"] is governor
+        assert _extract_options(cfg, "circ_agg")["throttle"] is governor
+        assert "throttle" not in _extract_options(cfg, "location")
+
+    def test_lookup_table_gets_only_row_protocol(self):
+        cfg = {"pg_keyset_tables": ["location"]}
+        assert _extract_options(cfg, "location") == {"tuples": True}
+
+    def test_table_list_covers_all_21_tables(self):
+        names = [name for name, _ in _TABLES]
+        assert len(names) == 21
+        assert len(set(names)) == 21
+
+
+class TestWithIds:
+    def _db(self):
+        db = sqlite3.connect(":memory:")
+        cols = (
+            "record_id",
+            "record_type_code",
+            "record_last_updated_julianday",
+            "deletion_julianday",
+        )
+        rows = [(1, "b", 2460480, None), (2, "b", 2460476, None), (3, "i", 2460480, None)]
+        load.load_table(db, "record_metadata", iter(rows), columns=cols)
+        return db
+
+    def test_only_configured_tables(self):
+        assert _with_ids(self._db(), {}, "bib", {"tuples": True}) == {"tuples": True}
+
+    def test_ids_of_the_table_record_type(self):
+        cfg = {"pg_id_driven_tables": ["bib", "item"]}
+        assert list(_with_ids(self._db(), cfg, "bib", {})["ids"]) == [1, 2]
+        assert list(_with_ids(self._db(), cfg, "item", {})["ids"]) == [3]
+        assert list(_with_ids(self._db(), cfg, "bib", {"id_range": (1, None)})["ids"]) == [2]
+
+    def test_incremental_keeps_records_updated_since_the_day_before(self):
+        cfg = {"pg_id_driven_tables": ["bib"]}
+        # 2024-06-15 is Julian day 2460477.
+        options = {"target_date": "2024-06-15T02:00:00+00:00"}
+        assert list(_with_ids(self._db(), cfg, "bib", options)["ids"]) == [1, 2]
+        options = {"target_date": "2024-06-17T02:00:00+00:00"}
+        assert list(_with_ids(self._db(), cfg, "bib", options)["ids"]) == [1]
+
+
+def _fake_extractor(n_rows, delay=0.0, fail=False):
+    """Return an extractor-shaped callable that ignores its connection."""
+
+    def extractor(pg, itersize, tuples=False, **options):
+        if tuples:
+            yield ("id",)
+        for i in range(n_rows):
+            if delay:
+                time.sleep(delay)
+            yield (i,) if tuples else {"id": i}
+        if fail:
+            raise RuntimeError("sierra went away")
+
+    return extractor
+
+
+def _parallel_cfg(**overrides):
+    cfg = {
+        "pg_max_connections": 3,
+        "pg_itersize": 2,
+        "pg_sleep_between_tables": 0.0,
+        "extract_limit": 0,
+        "pg_keyset_tables": [],
+    }
+    cfg.update(overrides)
+    return cfg
+
+
+class TestPrefetched:
+    def test_yields_every_row_in_order(self):
+        metrics = {}
+        rows = list(_prefetched(_fake_extractor(7)(None, 2), 0, 2, 2, metrics))
+        assert [r["id"] for r in rows] == list(range(7))
+        assert set(metrics) == {
+            "wait_for_fetch_seconds",
+            "wait_for_load_seconds",
+            "avg_queue_depth",
+        }
+
+    def test_slow_fetch_shows_as_loader_wait(self):
+        metrics = {}
+        list(_prefetched(_fake_extractor(4, delay=0.02)(None, 1), 0, 1, 2, metrics))
+        assert metrics["wait_for_fetch_seconds"] >= 0.05
+
+    def test_extract_limit_caps_rows(self):
+        rows = list(_prefetched(_fake_extractor(10)(None, 2), 3, 2, 2, {}))
+        assert len(rows) == 3
+
+    def test_fetch_error_propagates_and_closes(self):
+        gen = _fake_extractor(1, fail=True)(None, 2)
+        with pytest.raises(RuntimeError, match="sierra went away"):
+            list(_prefetched(gen, 0, 2, 2, {}))
+
+    def test_early_stop_closes_generator(self):
+        gen = _fake_extractor(100)(None, 2)
+        rows = _prefetched(gen, 0, 2, 1, {})
+        next(rows)
+        rows.close()
+        assert gen.gi_frame is None
+
+
+class TestExtractParallel:
+    def test_resume_skips_completed_and_continues_partial(self, monkeypatch):
+        def keyed(pg, itersize, id_range=None, **options):
+            after = id_range[0] if id_range else 0
+            yield ("hold_id",)
+            yield from ((i,) for i in range(after + 1, 6))
+
+        tables = [("hold", keyed), ("location", _fake_extractor(3))]
+        monkeypatch.setattr("collection_analysis.run._TABLES", tables)
+        db = sqlite3.connect(":memory:")
+        load.load_table(db, "hold", iter([{"hold_id": 1}, {"hold_id": 2}]))
+        load.load_table(db, "location", iter([{"id": 0}]))
+        stats = []
+        _extract_parallel(MagicMock(), db, _parallel_cfg(completed={"location"}), stats)
+        ids = [r[0] for r in db.execute("SELECT hold_id FROM hold ORDER BY 1")]
+        assert ids == [1, 2, 3, 4, 5]
+        assert db.execute("SELECT COUNT(*) FROM location").fetchone()[0] == 1
+        assert [s["stage"] for s in stats] == ["hold"]
+        db.close()
+
+    def test_reports_queue_metrics(self, monkeypatch):
+        monkeypatch.setattr("collection_analysis.run._TABLES", [("a", _fake_extractor(5))])
+        db = sqlite3.connect(":memory:")
+        stats = []
+        _extract_parallel(MagicMock(), db, _parallel_cfg(), stats)
+        assert stats[0]["wait_for_fetch_seconds"] >= 0
+        assert stats[0]["avg_queue_depth"] is not None
+        db.close()
+
+    def test_all_tables_loaded_by_single_writer(self, monkeypatch):
+        tables = [("a", _fake_extractor(5)), ("b", _fake_extractor(3)), ("c", _fake_extractor(0))]
+        monkeypatch.setattr("collection_analysis.run._TABLES", tables)
+        db = sqlite3.connect(":memory:")
+        stats = []
+        _extract_parallel(MagicMock(), db, _parallel_cfg(), stats)
+        assert db.execute("SELECT COUNT(*) FROM a").fetchone()[0] == 5
+        assert db.execute("SELECT COUNT(*) FROM b").fetchone()[0] == 3
+        assert {s["stage"]: s["rows"] for s in stats} == {"a": 5, "b": 3, "c": 0}
+        db.close()
+
+    def test_concurrency_capped_at_max_connections(self, monkeypatch):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+        engine = MagicMock()
+
+        def enter(*args):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+
+        def exit_(*args):
+            nonlocal active
+            with lock:
+                active -= 1
+
+        engine.connect.return_value.__enter__.side_effect = enter
+        engine.connect.return_value.__exit__.side_effect = exit_
+        tables = [(f"t{i}", _fake_extractor(2, delay=0.01)) for i in range(6)]
+        monkeypatch.setattr("collection_analysis.run._TABLES", tables)
+        db = sqlite3.connect(":memory:")
+        _extract_parallel(engine, db, _parallel_cfg(pg_max_connections=2), [])
+        assert 1 <= peak <= 2
+        assert engine.connect.call_count == 6
+        db.close()
+
+    def test_worker_error_propagates(self, monkeypatch):
+        tables = [("ok", _fake_extractor(4)), ("bad", _fake_extractor(1, fail=True))]
+        monkeypatch.setattr("collection_analysis.run._TABLES", tables)
+        db = sqlite3.connect(":memory:")
+        with pytest.raises(RuntimeError, match="sierra went away"):
+            _extract_parallel(MagicMock(), db, _parallel_cfg(), [])
+        db.close()
+
+    def test_extract_limit_applied_per_table(self, monkeypatch):
+        tables = [("a", _fake_extractor(10)), ("b", _fake_extractor(10))]
+        monkeypatch.setattr("collection_analysis.run._TABLES", tables)
+        db = sqlite3.connect(":memory:")
+        stats = []
+        _extract_parallel(MagicMock(), db, _parallel_cfg(extract_limit=3), stats)
+        assert {s["rows"] for s in stats} == {3}
+        db.close()
+
+    def test_id_driven_table_starts_after_record_metadata(self, monkeypatch):
+        seen = []
+
+        def record_metadata(pg, itersize, **options):
+            yield ("record_id", "record_type_code", "deletion_julianday")
+            for i in range(1, 6):
+                time.sleep(0.005)
+                yield (i, "b", None)
+
+        def bib(pg, itersize, ids=None, **options):
+            seen.append(list(ids))
+            yield ("bib_record_id",)
+            yield from ((i,) for i in ids)
+
+        tables = [("record_metadata", record_metadata), ("bib", bib)]
+        monkeypatch.setattr("collection_analysis.run._TABLES", tables)
+        db = sqlite3.connect(":memory:")
+        _extract_parallel(MagicMock(), db, _parallel_cfg(pg_id_driven_tables=["bib"]), [])
+        assert seen == [[1, 2, 3, 4, 5]]
+        assert db.execute("SELECT COUNT(*) FROM bib").fetchone()[0] == 5
+        db.close()
+
+    def test_workers_import_the_exported_snapshot(self, monkeypatch):
+        calls = []
+        lock = threading.Lock()
+
+        def begin_snapshot(pg, snapshot_id=None):
+            with lock:
+                calls.append(snapshot_id)
+            return snapshot_id or "00000003-0000001B-1"
+
+        monkeypatch.setattr("collection_analysis.extract.begin_snapshot", begin_snapshot)
+        tables = [("a", _fake_extractor(2)), ("b", _fake_extractor(2))]
+        monkeypatch.setattr("collection_analysis.run._TABLES", tables)
+        engine = MagicMock()
+        db = sqlite3.connect(":memory:")
+        _extract_parallel(engine, db, _parallel_cfg(pg_snapshot=True), [])
+        assert calls[0] is None
+        assert sorted(calls[1:]) == ["00000003-0000001B-1"] * 2
+        assert engine.connect.call_count == 3
+        engine.connect.return_value.close.assert_called_once()
+        db.close()
+
+    def test_partitioned_table_merged_into_one_sqlite_table(self, monkeypatch):
+        seen_ranges = []
+
+        def ranged(pg, itersize, id_range=None, **options):
+            seen_ranges.append(id_range)
+            after, upto = id_range
+            yield ("id",)
+            yield from ((i,) for i in range(after + 1, min(upto, 12) + 1))
+
+        monkeypatch.setattr("collection_analysis.run._TABLES", [("bib", ranged)])
+        monkeypatch.setattr(
+            "collection_analysis.extract.key_ranges",
+            lambda pg, name, n: [(0, 4), (4, 8), (8, 2**63 - 1)],
+        )
+        db = sqlite3.connect(":memory:")
+        stats = []
+        _extract_parallel(MagicMock(), db, _parallel_cfg(pg_partitions={"bib": 3}), stats)
+        ids = [r[0] for r in db.execute("SELECT id FROM bib ORDER BY id")]
+        assert ids == list(range(1, 13))
+        assert len(seen_ranges) == 3
+        assert stats == [stats[0]] and stats[0]["rows"] == 12
+        db.close()
+
+
+def _lost():
+    return DBAPIError(
+        "FETCH", {}, Exception("server closed the connection"), connection_invalidated=True
+    )
+
+
+def _dropping(name, key, n_rows, drops):
+    """Return (extractor, seen): yields rows 1..n_rows, dropping once after each of *drops*."""
+    seen = []
+    pending = list(drops)
+
+    def extractor(pg, itersize, id_range=None, **options):
+        seen.append(id_range)
+        yield (key,)
+        for i in range((id_range or (0, None))[0] + 1, n_rows + 1):
+            if pending and i > pending[0]:
+                pending.pop(0)
+                raise _lost()
+            yield (i,)
+
+    return extractor, seen
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr("collection_analysis.run._RECONNECT_DELAY", 0.0)
+
+
+def _engine():
+    engine = MagicMock()
+    engine.connect.side_effect = lambda: MagicMock()
+    return engine
+
+
+class TestResilient:
+    def test_reconnects_and_restarts_at_last_key(self, no_backoff):
+        extractor, seen = _dropping("hold", "hold_id", 5, drops=[2])
+        engine = _engine()
+        events = Counter()
+        with _Sierra(engine) as sierra:
+            first = sierra.conn
+            rows = list(_resilient(sierra, "hold", extractor, 10, {}, 3, events))
+        assert rows == [("hold_id",), *((i,) for i in range(1, 6))]
+        assert seen == [None, (1, None)]
+        assert events == {"reconnects": 1}
+        assert engine.connect.call_count == 2
+        first.invalidate.assert_called_once()
+
+    def test_streamed_tables_receive_events(self, no_backoff):
+        received = []
+
+        def extractor(pg, itersize, events=None, **options):
+            received.append(events)
+            yield ("id",)
+
+        events = Counter()
+        with _Sierra(_engine()) as sierra:
+            list(_resilient(sierra, "hold", extractor, 10, {}, 3, events))
+            list(
+                _resilient(sierra, "location", _fake_extractor(0), 10, {"tuples": True}, 3, events)
+            )
+        assert received == [events]
+
+    def test_gives_up_after_consecutive_attempts(self, no_backoff):
+        def extractor(pg, itersize, **options):
+            raise _lost()
+            yield
+
+        events = Counter()
+        with _Sierra(_engine()) as sierra, pytest.raises(DBAPIError):
+            list(_resilient(sierra, "hold", extractor, 10, {}, 2, events))
+        assert events == {"reconnects": 2}
+
+    def test_attempts_count_consecutive_drops_only(self, no_backoff):
+        extractor, seen = _dropping("hold", "hold_id", 6, drops=[1, 3, 5])
+        with _Sierra(_engine()) as sierra:
+            rows = list(_resilient(sierra, "hold", extractor, 10, {}, 1, Counter()))
+        assert len(rows) == 7
+        assert seen == [None, (0, None), (2, None), (4, None)]
+
+    def test_unkeyed_table_retried_only_before_its_first_row(self, no_backoff):
+        extractor, _ = _dropping("location", "code", 3, drops=[1])
+        with _Sierra(_engine()) as sierra, pytest.raises(DBAPIError):
+            list(_resilient(sierra, "location", extractor, 10, {}, 3, Counter()))
+        extractor, seen = _dropping("location", "code", 3, drops=[0])
+        with _Sierra(_engine()) as sierra:
+            rows = list(_resilient(sierra, "location", extractor, 10, {}, 3, Counter()))
+        assert len(rows) == 4 and len(seen) == 2
+
+    def test_other_errors_are_not_retried(self, no_backoff):
+        with _Sierra(_engine()) as sierra, pytest.raises(RuntimeError):
+            list(_resilient(sierra, "hold", _fake_extractor(1, fail=True), 10, {}, 3, Counter()))
+
+    def test_exporting_connection_is_not_replaced(self, no_backoff, monkeypatch):
+        monkeypatch.setattr(
+            "collection_analysis.extract.begin_snapshot", lambda pg, snapshot_id=None: "1-1"
+        )
+        extractor, _ = _dropping("hold", "hold_id", 3, drops=[1])
+        with _Sierra(_engine()) as sierra, pytest.raises(DBAPIError):
+            sierra.export_snapshot()
+            list(_resilient(sierra, "hold", extractor, 10, {}, 3, Counter()))
+
+    def test_replacement_imports_the_shared_snapshot(self, no_backoff, monkeypatch):
+        imported = []
+        monkeypatch.setattr(
+            "collection_analysis.extract.begin_snapshot",
+            lambda pg, snapshot_id=None: imported.append(snapshot_id),
+        )
+        extractor, _ = _dropping("hold", "hold_id", 3, drops=[1])
+        with _Sierra(_engine(), "00000003-0000001B-1") as sierra:
+            list(_resilient(sierra, "hold", extractor, 10, {}, 3, Counter()))
+        assert imported == ["00000003-0000001B-1"] * 2
+
+    def test_raw_psycopg_error_on_closed_connection_counts_as_lost(self):
+        with _Sierra(_engine()) as sierra:
+            sierra.conn.connection.driver_connection.closed = False
+            assert not sierra.lost(psycopg.OperationalError("statement timeout"))
+            sierra.conn.connection.driver_connection.closed = True
+            assert sierra.lost(psycopg.OperationalError("server closed the connection"))
+
+    def test_resumed_skips_ids_already_fetched(self):
+        options = {"id_range": (0, 10), "ids": array("q", [1, 2, 5, 9])}
+        resumed = _resumed(options, 2)
+        assert resumed["id_range"] == (1, 10)
+        assert list(resumed["ids"]) == [2, 5, 9]
+
+    def test_drop_inside_a_key_group_loses_and_repeats_nothing(self, no_backoff):
+        # Item 7 is linked to three bibs.  The connection drops after two of
+        # its rows, and the restarted query sends the group in another order.
+        seen = []
+
+        def extractor(pg, itersize, id_range=None, **options):
+            seen.append(id_range)
+            yield ("item_record_id", "bib")
+            if id_range is None:
+                yield from [(3, 1), (7, 1), (7, 2)]
+                raise _lost()
+            yield from [(7, 3), (7, 1), (7, 2), (9, 1)]
+
+        with _Sierra(_engine()) as sierra:
+            rows = list(_resilient(sierra, "item", extractor, 10, {}, 3, Counter()))
+        assert rows[1:] == [(3, 1), (7, 1), (7, 2), (7, 3), (9, 1)]
+        assert seen == [None, (6, None)]
+
+    def test_parallel_stats_sum_task_events(self, no_backoff, monkeypatch):
+        extractor, _ = _dropping("hold", "hold_id", 5, drops=[2])
+        monkeypatch.setattr("collection_analysis.run._TABLES", [("hold", extractor)])
+        db = sqlite3.connect(":memory:")
+        stats = []
+        _extract_parallel(_engine(), db, _parallel_cfg(pg_reconnect_attempts=3), stats)
+        assert stats[0]["rows"] == 5
+        assert stats[0]["reconnects"] == 1
+        db.close()
+
+
+_LOOKUP_RESULTS = {
+    "location": (("code", "name"), [("a", "Alpha"), ("b", "Beta")]),
+    "branch": (("code_num",), []),
+}
+
+
+class TestLookups:
+    def test_loaded_together_as_one_stage(self, monkeypatch):
+        calls = []
+
+        def extract_lookups(pg, names):
+            calls.append(names)
+            return {name: _LOOKUP_RESULTS[name] for name in names}
+
+        monkeypatch.setattr("collection_analysis.extract.extract_lookups", extract_lookups)
+        db = sqlite3.connect(":memory:")
+        with _Sierra(_engine()) as sierra:
+            stat = _load_lookups(sierra, db, {}, ["location", "branch"])
+        assert calls == [["location", "branch"]]
+        assert stat["stage"] == "lookup_tables" and stat["rows"] == 2
+        assert db.execute("SELECT COUNT(*) FROM location").fetchone()[0] == 2
+        assert checkpoint.completed(db) == {"location", "branch"}
+        db.close()
+
+    def test_extract_limit_caps_each_table(self, monkeypatch):
+        monkeypatch.setattr(
+            "collection_analysis.extract.extract_lookups",
+            lambda pg, names: {name: _LOOKUP_RESULTS[name] for name in names},
+        )
+        db = sqlite3.connect(":memory:")
+        with _Sierra(_engine()) as sierra:
+            assert _load_lookups(sierra, db, {"extract_limit": 1}, ["location"])["rows"] == 1
+        db.close()
+
+    def test_parallel_mode_fetches_lookups_as_one_task(self, monkeypatch):
+        calls = []
+
+        def extract_lookups(pg, names):
+            calls.append(sorted(names))
+            return {name: _LOOKUP_RESULTS[name] for name in names}
+
+        monkeypatch.setattr("collection_analysis.extract.extract_lookups", extract_lookups)
+        tables = [("location", None), ("a", _fake_extractor(3)), ("branch", None)]
+        monkeypatch.setattr("collection_analysis.run._TABLES", tables)
+        db = sqlite3.connect(":memory:")
+        stats = []
+        _extract_parallel(_engine(), db, _parallel_cfg(), stats)
+        assert calls == [["branch", "location"]]
+        assert {s["stage"]: s["rows"] for s in stats} == {"location": 2, "branch": 0, "a": 3}
+        db.close()
+
+
+class TestReuseLookups:
+    def test_unchanged_tables_are_copied_and_skipped(self, monkeypatch, tmp_output_dir):
+        live = load.open_build_db(tmp_output_dir)
+        load.load_table(live, "location", iter([{"code": "a"}, {"code": "b"}]))
+        load.write_state(live, lookup_cache.FINGERPRINT_PREFIX + "location", "same")
+        live.close()
+        load.swap_db(tmp_output_dir)
+        asked = []
+
+        def lookup_fingerprints(pg, names):
+            asked.extend(names)
+            return {name: "same" if name == "location" else "new" for name in names}
+
+        monkeypatch.setattr("collection_analysis.extract.lookup_fingerprints", lookup_fingerprints)
+        db = load.open_build_db(tmp_output_dir)
+        cfg = {"output_dir": tmp_output_dir, "completed": {"branch"}}
+        stat = _reuse_lookups(_engine(), db, cfg)
+        assert "branch" not in asked
+        assert stat["stage"] == "lookup_cache" and stat["rows"] == 2
+        assert cfg["completed"] == {"branch", "location"}
+        assert checkpoint.completed(db) == {"location"}
+        db.close()
+
+    def test_nothing_to_do_when_all_lookups_loaded(self):
+        engine = _engine()
+        assert _reuse_lookups(engine, None, {"completed": set(extract.LOOKUPS)}) is None
+        engine.connect.assert_not_called()
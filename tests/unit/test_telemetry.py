@@ -1,6 +1,14 @@
 """Unit tests for telemetry.py (no PostgreSQL required)."""
 
-from collection_analysis.telemetry import finish_run, open_telemetry_db, start_run
+import sqlite3
+
+from collection_analysis.telemetry import (
+    finish_run,
+    load_page_sizes,
+    open_telemetry_db,
+    save_page_sizes,
+    start_run,
+)
 
 
 def _open(tmp_path):
@@ -164,3 +172,66 @@ def test_v_recent_runs_failed_label(tmp_path):
     result = db.execute("SELECT result FROM v_recent_runs WHERE id = ?", (run_id,)).fetchone()[0]
     assert result == "failed"
     db.close()
+
+
+def test_finish_run_stores_queue_metrics(tmp_path):
+    db = _open(tmp_path)
+    run_id = start_run(db, "2026-01-01T00:00:00")
+    stats = [
+        {
+            "stage": "item",
+            "rows": 10,
+            "elapsed_seconds": 1.0,
+            "rows_per_sec": 10.0,
+            "wait_for_fetch_seconds": 0.7,
+            "wait_for_load_seconds": 0.1,
+            "avg_queue_depth": 0.5,
+        }
+    ]
+    finish_run(db, run_id, "2026-01-01T00:05:00", 300.0, True, stats)
+    row = db.execute(
+        "SELECT wait_for_fetch_seconds, wait_for_load_seconds, avg_queue_depth FROM stage"
+    ).fetchone()
+    assert row == (0.7, 0.1, 0.5)
+    db.close()
+
+
+def test_finish_run_stores_retry_events(tmp_path):
+    db = _open(tmp_path)
+    run_id = start_run(db, "2026-01-01T00:00:00")
+    stats = [
+        {"stage": "item", "rows": 10, "elapsed_seconds": 1.0, "page_splits": 2, "reconnects": 1},
+        {"stage": "bib", "rows": 5, "elapsed_seconds": 1.0},
+    ]
+    finish_run(db, run_id, "2026-01-01T00:05:00", 300.0, True, stats)
+    rows = db.execute("SELECT stage, page_splits, reconnects FROM stage ORDER BY id").fetchall()
+    assert rows == [("item", 2, 1), ("bib", None, None)]
+    db.close()
+
+
+def test_open_adds_metric_columns_to_old_schema(tmp_path):
+    old = sqlite3.connect(tmp_path / "pipeline_runs.db")
+    old.execute(
+        "CREATE TABLE stage (id INTEGER PRIMARY KEY, run_id INTEGER, stage TEXT, "
+        "rows INTEGER, elapsed_seconds REAL, rows_per_sec REAL)"
+    )
+    old.close()
+    db = _open(tmp_path)
+    columns = {r[1] for r in db.execute("PRAGMA table_info(stage)")}
+    assert {
+        "wait_for_fetch_seconds",
+        "wait_for_load_seconds",
+        "avg_queue_depth",
+        "page_splits",
+        "reconnects",
+    } <= columns
+    db.close()
+
+
+def test_page_sizes_round_trip(tmp_path):
+    db = _open(tmp_path)
+    assert load_page_sizes(db) == {}
+    save_page_sizes(db, {"bib": 8000, "item_message": 1500}, "2026-01-01T00:00:00")
+    save_page_sizes(db, {"bib": 12000}, "2026-01-02T00:00:00")
+    assert load_page_sizes(db) == {"bib": 12000, "item_message": 1500}
+    db.close()
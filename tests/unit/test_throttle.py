@@ -0,0 +1,136 @@
+"""Unit tests for collection_analysis/throttle.py."""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from collection_analysis import throttle
+
+DAY = (6 * 60, 22 * 60, 2.0)
+NIGHT = (22 * 60, 6 * 60, 50.0)
+
+
+class FakeClock:
+    """A monotonic clock that only moves when sleep() is called."""
+
+    def __init__(self):
+        self.t = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.t += seconds
+
+
+def _throttle(hour=12, profiles=(DAY, NIGHT), **kwargs):
+    clock = FakeClock()
+    governor = throttle.Throttle(
+        list(profiles),
+        clock=clock,
+        now=lambda: datetime(2024, 6, 15, hour, 0),
+        sleep=clock.sleep,
+        **kwargs,
+    )
+    return governor, clock
+
+
+def _probe_conn(active):
+    conn = MagicMock()
+    cur = conn.connection.driver_connection.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = (active,)
+    return conn
+
+
+class TestProfileRate:
+    def test_window_lookup(self):
+        assert throttle.profile_rate([DAY, NIGHT], 12 * 60) == 2.0
+        assert throttle.profile_rate([DAY, NIGHT], 22 * 60) == 50.0
+
+    def test_window_wraps_midnight(self):
+        assert throttle.profile_rate([NIGHT], 3 * 60) == 50.0
+        assert throttle.profile_rate([NIGHT], 12 * 60) is None
+
+    def test_no_window_is_unlimited(self):
+        assert throttle.profile_rate([], 0) is None
+
+
+class TestTokenBucket:
+    def test_paces_to_profile_rate(self):
+        governor, clock = _throttle(hour=12)
+        for _ in range(5):
+            governor.wait(None, "bib", 0.0)
+        # The first page uses the initial token; the rest wait 0.5s each at 2/s.
+        assert clock.slept == [0.5, 0.5, 0.5, 0.5]
+
+    def test_unlimited_outside_windows(self):
+        governor, clock = _throttle(hour=3, profiles=[DAY])
+        for _ in range(10):
+            governor.wait(None, "bib", 0.0)
+        assert clock.slept == []
+        assert governor.rate() is None
+
+    def test_slow_fetches_earn_tokens(self):
+        governor, clock = _throttle(hour=12)
+        governor.wait(None, "bib", 0.0)
+        clock.t += 1.0  # a page that took a second to fetch
+        governor.wait(None, "bib", 1.0)
+        assert clock.slept == []
+
+
+class TestHealthBackoff:
+    def test_busy_server_halves_then_recovers(self):
+        governor, clock = _throttle(max_active=4, sample_seconds=10)
+        clock.t = 10
+        governor.wait(_probe_conn(9), "bib", 0.1)
+        assert governor.factor == 0.5
+        assert governor.rate() == 1.0
+        clock.t += 10
+        governor.wait(_probe_conn(9), "bib", 0.1)
+        assert governor.factor == 0.25
+        clock.t += 10
+        governor.wait(_probe_conn(1), "bib", 0.1)
+        assert governor.factor == 0.5
+
+    def test_backoff_floor(self):
+        governor, clock = _throttle(max_active=1, sample_seconds=1)
+        for _ in range(10):
+            clock.t += 1
+            governor.wait(_probe_conn(5), "bib", 0.1)
+        assert governor.factor == throttle.MIN_FACTOR
+
+    def test_rising_latency_backs_off(self):
+        governor, clock = _throttle(sample_seconds=1000)
+        for _ in range(3):
+            governor.wait(None, "item", 0.5)
+        for _ in range(20):
+            governor.wait(None, "item", 5.0)
+        clock.t += 1000
+        governor.wait(None, "item", 5.0)
+        assert governor.factor == 0.5
+
+    def test_no_sample_before_interval(self):
+        governor, _ = _throttle(max_active=1, sample_seconds=30)
+        conn = _probe_conn(99)
+        governor.wait(conn, "bib", 0.1)
+        conn.connection.driver_connection.cursor.assert_not_called()
+        assert governor.factor == 1.0
+
+    def test_failed_probe_is_ignored(self):
+        governor, clock = _throttle(max_active=1, sample_seconds=1)
+        conn = MagicMock()
+        conn.connection.driver_connection.cursor.side_effect = RuntimeError("no access")
+        clock.t = 1
+        governor.wait(conn, "bib", 0.1)
+        assert governor.factor == 1.0
+
+    def test_probe_clears_cached_backend_status(self):
+        governor, clock = _throttle(max_active=1, sample_seconds=1)
+        conn = _probe_conn(0)
+        clock.t = 1
+        governor.wait(conn, "bib", 0.1)
+        cur = conn.connection.driver_connection.cursor.return_value.__enter__.return_value
+        assert "pg_stat_clear_snapshot" in cur.execute.call_args_list[0][0][0]
+        assert "pg_stat_activity" in cur.execute.call_args_list[1][0][0]
+        conn.connection.driver_connection.transaction.assert_called_once_with()
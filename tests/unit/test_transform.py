@@ -79,6 +79,77 @@ class TestCreateViews:
             assert len(statements) >= 0  # file loads and splits without error
 
 
+class TestEnrich:
+    def _db(self, empty_db):
+        empty_db.executescript(
+            """
+            CREATE TABLE record_metadata (record_id, record_num, record_type_code);
+            INSERT INTO record_metadata VALUES (1, 101, 'b'), (2, 202, 'i'), (3, 303, 'j');
+            CREATE TABLE bib_record_item_record_link (bib_record_num, item_record_num);
+            INSERT INTO bib_record_item_record_link VALUES (101, 202);
+            CREATE TABLE volume_record (volume_record_num, bib_record_num);
+            INSERT INTO volume_record VALUES (303, 101);
+            CREATE TABLE itype_property (itype_code, itype_name);
+            INSERT INTO itype_property VALUES (0, 'Book'), (1, 'DVD');
+            CREATE TABLE hold (
+                hold_id, bib_record_num, record_type_on_hold, item_record_num, volume_record_num
+            );
+            INSERT INTO hold VALUES
+                (1, 101, 'b', NULL, NULL), (2, NULL, 'i', 202, NULL), (3, NULL, 'j', NULL, 303);
+            CREATE TABLE item (
+                item_record_id, item_record_num, bib_record_num, barcode, item_status_code,
+                agency_code_num, location_code, item_format, itype_code_num,
+                checkout_date, due_date
+            );
+            INSERT INTO item VALUES
+                (2, 202, 101, 'b202', 't', 1, 'ra', NULL, 1, '2000-01-01', '2000-01-22'),
+                (5, 203, NULL, NULL, '-', 1, 'ra', 'Kept', 0, NULL, NULL),
+                (6, 204, NULL, NULL, '-', 1, 'ra', NULL, 9, NULL, NULL);
+            CREATE TABLE bib (bib_record_num, publish_year, best_title, best_author);
+            INSERT INTO bib VALUES (101, 1999, 'Title', 'Author');
+            CREATE TABLE item_status_property (item_status_code, item_status_name);
+            INSERT INTO item_status_property VALUES ('t', 'IN TRANSIT');
+            CREATE TABLE item_message (
+                item_barcode, item_record_id, varfield_id, item_status_code, item_status_name,
+                agency_code_num, location_code, itype_code_num, item_format,
+                checkout_julianday, due_julianday, publish_year, best_title, best_author
+            );
+            INSERT INTO item_message (item_record_id, varfield_id, checkout_julianday)
+                VALUES (2, 1, 2460000), (9, 2, NULL);
+            """
+        )
+        return empty_db
+
+    def test_real_enrich_files(self, empty_db):
+        db = self._db(empty_db)
+        transform.enrich(db)
+        assert db.execute("SELECT bib_record_num FROM hold ORDER BY hold_id").fetchall() == [
+            (101,),
+            (101,),
+            (101,),
+        ]
+        assert db.execute("SELECT item_format FROM item ORDER BY item_record_num").fetchall() == [
+            ("DVD",),
+            ("Kept",),
+            (None,),
+        ]
+        assert db.execute(
+            "SELECT item_barcode, item_status_name, item_format, checkout_julianday, "
+            "due_julianday, best_title FROM item_message ORDER BY varfield_id"
+        ).fetchall() == [
+            ("b202", "IN TRANSIT", "DVD", 2460000, None, "Title"),
+            (None, None, None, None, None, None),
+        ]
+
+    def test_enrich_from_custom_dir(self, empty_db, tmp_sql_dir):
+        (tmp_sql_dir / "enrich").mkdir()
+        (tmp_sql_dir / "enrich" / "01_fill.sql").write_text("UPDATE t SET v = id * 2")
+        empty_db.execute("CREATE TABLE t (id, v)")
+        empty_db.execute("INSERT INTO t VALUES (3, NULL)")
+        transform.enrich(empty_db, sql_dir=tmp_sql_dir)
+        assert empty_db.execute("SELECT v FROM t").fetchone() == (6,)
+
+
 class TestCreateIndexes:
     def test_create_indexes_single_file(self, empty_db, tmp_sql_dir):
         empty_db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")